@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Consultas concurrentes con asyncio para los reportes de análisis.
+
+Los reportes (analizar_2022.py, analizar_cursos_ciclo.py,
+verificar_cobertura_bfi01.py, ...) hacen varias consultas independientes.
+consultar_concurrente() las ejecuta a la vez sobre un pool asyncpg pequeño:
+
+- La concurrencia está acotada por el tamaño del pool (CONCURRENCIA_MAX
+  conexiones); las consultas restantes esperan una conexión libre
+- Cada consulta tiene su propio timeout (TIMEOUT_CONSULTA segundos, sin
+  contar la espera por conexión); si se vence, la consulta se cancela en el
+  servidor y se lanza TimeoutError
+- El reporte tarda lo que su consulta más lenta, no la suma de todas
+
+Las consultas usan %s como en psycopg2 (se convierten a $1, $2, ... con
+acceso_datos.posicionales) y la configuración es la de acceso_datos
+(DATABASE_URL o DB_*). Las filas se leen por nombre: fila['columna'].
+
+Requiere asyncpg (pip install asyncpg). Sin asyncpg, las mismas consultas se
+envían juntas en un solo viaje con acceso_datos.LoteConsultas (el timeout se
+aplica al lote completo).
+
+Uso:
+    from acceso_async import consultar_concurrente
+    totales, por_semestre = consultar_concurrente([
+        "SELECT COUNT(*) as total FROM alumno",
+        ("SELECT ... WHERE semestre = %s", ('2022-1',)),
+    ])
+"""
+
+import asyncio
+
+try:
+    import asyncpg
+except ImportError:
+    asyncpg = None
+
+from acceso_datos import LoteConsultas, conectar, configuracion, posicionales
+
+CONCURRENCIA_MAX = 4
+TIMEOUT_CONSULTA = 30.0  # segundos
+
+def _separar(consulta):
+    """Una consulta es el SQL solo (params None) o una tupla (sql, params)."""
+    if isinstance(consulta, str):
+        return consulta, None
+    sql, params = consulta
+    return sql, tuple(params)
+
+def _configuracion_asyncpg():
+    config = configuracion()
+    if 'port' in config:
+        config['port'] = int(config['port'])
+    return config
+
+async def consultar_todas(consultas, concurrencia=CONCURRENCIA_MAX, timeout=TIMEOUT_CONSULTA):
+    """
+    Ejecuta las consultas a la vez sobre un pool de `concurrencia` conexiones.
+
+    Returns:
+        Lista con las filas (asyncpg.Record) de cada consulta, en el mismo orden
+
+    Raises:
+        TimeoutError: si alguna consulta supera `timeout` segundos (las
+            demás se cancelan)
+    """
+    consultas = [_separar(consulta) for consulta in consultas]
+    if not consultas:
+        return []
+    concurrencia = max(1, min(concurrencia, len(consultas)))
+
+    async with asyncpg.create_pool(min_size=1, max_size=concurrencia, **_configuracion_asyncpg()) as pool:
+        async def ejecutar(numero, sql, params):
+            # Sin parámetros psycopg2 no interpreta los %: se envía tal cual
+            if params is None:
+                texto, params = sql, ()
+            else:
+                texto = posicionales(sql)[0]
+            try:
+                return await pool.fetch(texto, *params, timeout=timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"La consulta {numero} superó el timeout de {timeout:g}s") from None
+
+        tareas = [asyncio.ensure_future(ejecutar(i + 1, sql, params)) for i, (sql, params) in enumerate(consultas)]
+        try:
+            return await asyncio.gather(*tareas)
+        except BaseException:
+            for tarea in tareas:
+                tarea.cancel()
+            await asyncio.gather(*tareas, return_exceptions=True)
+            raise
+
+def _consultar_en_lote(consultas, timeout):
+    """Alternativa sin asyncpg: un solo viaje con LoteConsultas."""
+    conn = conectar()
+    try:
+        with conn.cursor() as cur:
+            # SET LOCAL: close() hace rollback y el pool recibe la sesión sin timeout
+            cur.execute("SET LOCAL statement_timeout = %s", (int(timeout * 1000),))
+        lote = LoteConsultas(conn)
+        for consulta in consultas:
+            lote.agregar(*_separar(consulta))
+        return lote.ejecutar()
+    finally:
+        conn.close()
+
+def consultar_concurrente(consultas, concurrencia=CONCURRENCIA_MAX, timeout=TIMEOUT_CONSULTA):
+    """
+    Versión síncrona de consultar_todas() para los scripts.
+
+    Args:
+        consultas: SQL o tuplas (sql, params), independientes entre sí
+        concurrencia: Consultas simultáneas como máximo (conexiones del pool)
+        timeout: Segundos por consulta
+
+    Returns:
+        Lista con las filas de cada consulta, en el mismo orden
+    """
+    consultas = list(consultas)
+    if asyncpg is None:
+        return _consultar_en_lote(consultas, timeout)
+    return asyncio.run(consultar_todas(consultas, concurrencia, timeout))
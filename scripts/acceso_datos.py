@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Acceso a la base de datos compartido por todos los scripts.
+
+- Configuración desde el entorno, con las mismas variables de .env.example:
+  DATABASE_URL, o DB_HOST / DB_PORT / DB_NAME / DB_USER / DB_PASSWORD (cada
+  una reemplaza el valor de CONFIG_POR_DEFECTO, el servidor de siempre).
+- Pool de conexiones por proceso (ThreadedConnectionPool, se crea con la
+  primera conexión): conectar() toma una conexión del pool y close() la
+  devuelve en lugar de cerrarla, así que abrir varias veces en un mismo
+  proceso (hilos de verificar_calidad, consultas repetidas) no repite el
+  handshake con el servidor remoto.
+- Cursores de tuplas por defecto; conectar(diccionarios=True) da cursores
+  RealDictCursor para el código que accede a las filas por nombre.
+- Sentencias preparadas del lado del servidor: conn.ejecutar_preparada(cur,
+  sql, params) hace PREPARE la primera vez en cada conexión y después solo
+  EXECUTE, sin volver a parsear ni planificar la consulta. La caché vive con
+  la conexión, así que se reutiliza entre usos del pool.
+- Lotes de consultas independientes (LoteConsultas): se encolan con sus
+  parámetros y se envían juntas como un solo SELECT, de a CONSULTAS_POR_VIAJE,
+  sin esperar la respuesta de cada una. Con el servidor remoto el costo es
+  la latencia de cada viaje, así que pasa a depender del número de lotes y
+  no del número de consultas.
+
+Uso:
+    from acceso_datos import conectar
+
+    conn = conectar()                       # cursores de tuplas
+    with conn.cursor() as cur:
+        conn.ejecutar_preparada(cur, "SELECT ... WHERE semestre = %s", (semestre,))
+    conn.close()                            # vuelve al pool
+
+    lote = LoteConsultas(conn)
+    totales = lote.agregar("SELECT COUNT(*) as n FROM alumno")
+    por_semestre = lote.agregar("SELECT ... WHERE semestre = %s", (semestre,))
+    resultados = lote.ejecutar()            # un viaje; resultados[totales] -> filas
+"""
+
+import atexit
+import json
+import os
+import threading
+from decimal import Decimal
+from functools import partial
+
+import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
+from psycopg2.extras import RealDictCursor, register_default_json
+
+CONFIG_POR_DEFECTO = {
+    'host': '172.232.188.183',
+    'port': 5435,
+    'database': 'schedule_db',
+    'user': 'admin',
+    'password': 'admin123'
+}
+
+# Variable de entorno -> parámetro de psycopg2.connect
+VARIABLES_ENTORNO = {
+    'DB_HOST': 'host',
+    'DB_PORT': 'port',
+    'DB_NAME': 'database',
+    'DB_USER': 'user',
+    'DB_PASSWORD': 'password',
+}
+
+POOL_MIN = 1
+POOL_MAX = 8
+
+# Consultas de un LoteConsultas que viajan juntas en un mismo SELECT
+CONSULTAS_POR_VIAJE = 50
+
+def configuracion():
+    """
+    Parámetros de conexión según el entorno.
+
+    Returns:
+        {'dsn': DATABASE_URL} si está definida; si no, CONFIG_POR_DEFECTO con
+        los DB_* definidos reemplazando sus valores
+    """
+    url = os.getenv('DATABASE_URL')
+    if url:
+        return {'dsn': url}
+    config = dict(CONFIG_POR_DEFECTO)
+    for variable, parametro in VARIABLES_ENTORNO.items():
+        valor = os.getenv(variable)
+        if valor:
+            config[parametro] = valor
+    return config
+
+def describir(config=None):
+    """Destino de la conexión para mostrar (sin contraseña)."""
+    config = config or configuracion()
+    if 'dsn' in config:
+        config = psycopg2.extensions.parse_dsn(config['dsn'])
+    base = config.get('database') or config.get('dbname', '')
+    return f"{config.get('host', 'localhost')}:{config.get('port', 5432)}/{base}"
+
+def posicionales(sql):
+    """Convierte los %s de psycopg2 en $1, $2, ... para PREPARE (%% queda como %)."""
+    partes = sql.split('%%')
+    numero = 0
+    for i, parte in enumerate(partes):
+        trozos = parte.split('%s')
+        for j in range(1, len(trozos)):
+            numero += 1
+            trozos[j] = f"${numero}" + trozos[j]
+        partes[i] = ''.join(trozos)
+    return '%'.join(partes), numero
+
+class Conexion(psycopg2.extensions.connection):
+    """Conexión con caché de sentencias preparadas; close() la devuelve al pool."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.preparadas = {}
+        self.pool = None
+
+    def ejecutar_preparada(self, cur, sql, params=()):
+        """
+        Ejecuta `sql` (con %s) como sentencia preparada: PREPARE la primera vez
+        en esta conexión, EXECUTE en las siguientes. Las filas quedan en `cur`.
+        """
+        preparada = self.preparadas.get(sql)
+        if preparada is None:
+            texto, num_parametros = posicionales(sql)
+            nombre = f"consulta_{len(self.preparadas) + 1}"
+            # PREPARE no es transaccional: sigue vigente aunque la transacción se deshaga
+            cur.execute(f"PREPARE {nombre} AS {texto}")
+            preparada = self.preparadas[sql] = (nombre, num_parametros)
+
+        nombre, num_parametros = preparada
+        if num_parametros != len(params):
+            raise ValueError(f"{nombre} espera {num_parametros} parámetros y recibió {len(params)}")
+        if num_parametros:
+            cur.execute(f"EXECUTE {nombre} ({', '.join(['%s'] * num_parametros)})", params)
+        else:
+            cur.execute(f"EXECUTE {nombre}")
+
+    def close(self):
+        pool, self.pool = self.pool, None
+        # Sin pool, o con el pool ya retirado por cerrar_pool (que cierra con su
+        # candado tomado: putconn se bloquearía), se cierra de verdad
+        if pool is None or pool is not _pool or self.closed:
+            super().close()
+            return
+        # Se deja la sesión como nueva sin DISCARD ALL (borraría las preparadas)
+        try:
+            self.rollback()
+            self.autocommit = False
+            self.set_session(isolation_level='DEFAULT', readonly='DEFAULT', deferrable='DEFAULT')
+        except psycopg2.Error:
+            pool.putconn(self, close=True)
+            return
+        pool.putconn(self)
+
+class LoteConsultas:
+    """
+    Consultas independientes que se envían juntas al servidor.
+
+    Cada consulta se convierte en una columna COALESCE(json_agg(q), '[]') de
+    un único SELECT (de a `tamano` consultas), así que un viaje devuelve los
+    resultados de todas. Las filas llegan como diccionarios (como
+    RealDictCursor): los números conservan su tipo (int, o Decimal para
+    numeric y float), textos y fechas llegan como texto. El orden de las
+    filas es el del ORDER BY de cada consulta.
+
+    Es para consultas chicas (conteos, agregados, catálogos): cada resultado
+    se arma en el servidor como un solo valor JSON y se decodifica completo en
+    el cliente, así que las cargas masivas van con cursores normales.
+    """
+
+    def __init__(self, conn, tamano=CONSULTAS_POR_VIAJE):
+        self.conn = conn
+        self.tamano = tamano
+        self.consultas = []
+        self.viajes = 0
+
+    def agregar(self, sql, params=None):
+        """Encola una consulta (con %s como en cursor.execute); devuelve su índice en ejecutar()."""
+        with self.conn.cursor() as cur:
+            # mogrify interpola en el cliente, igual que execute: no hay viaje al servidor
+            self.consultas.append(cur.mogrify(sql, params).decode(psycopg2.extensions.encodings[self.conn.encoding]))
+        return len(self.consultas) - 1
+
+    def __len__(self):
+        return len(self.consultas)
+
+    def ejecutar(self):
+        """
+        Envía las consultas encoladas y vacía el lote.
+
+        Returns:
+            Lista con las filas de cada consulta, en el orden de agregar()
+        """
+        consultas, self.consultas = self.consultas, []
+        resultados = []
+        with self.conn.cursor(cursor_factory=psycopg2.extensions.cursor) as cur:
+            register_default_json(cur, loads=partial(json.loads, parse_float=Decimal))
+            for inicio in range(0, len(consultas), self.tamano):
+                columnas = ",\n".join(
+                    f"(SELECT COALESCE(json_agg(q), '[]') FROM (\n{sql}\n) q)"
+                    for sql in consultas[inicio:inicio + self.tamano]
+                )
+                cur.execute(f"SELECT {columnas}")
+                resultados.extend(cur.fetchone())
+                self.viajes += 1
+        return resultados
+
+_pool = None
+_candado_pool = threading.Lock()
+
+def _obtener_pool():
+    global _pool
+    with _candado_pool:
+        if _pool is None:
+            _pool = psycopg2.pool.ThreadedConnectionPool(
+                POOL_MIN, POOL_MAX, connection_factory=Conexion, **configuracion()
+            )
+        return _pool
+
+def conectar(diccionarios=False):
+    """
+    Conexión del pool del proceso. close() la devuelve al pool.
+
+    Args:
+        diccionarios: Si es True, los cursores son RealDictCursor
+
+    Raises:
+        psycopg2.Error: si no se puede conectar
+        psycopg2.pool.PoolError: si ya hay POOL_MAX conexiones en uso
+    """
+    pool = _obtener_pool()
+    conn = pool.getconn()
+    conn.pool = pool
+    conn.cursor_factory = RealDictCursor if diccionarios else None
+    return conn
+
+@atexit.register
+def cerrar_pool():
+    """Cierra todas las conexiones del pool (se llama también al salir)."""
+    global _pool
+    with _candado_pool:
+        pool, _pool = _pool, None
+    if pool is not None and not pool.closed:
+        pool.closeall()
@@ -1,22 +1,10 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import psycopg2
-from psycopg2.extras import RealDictCursor
+from acceso_async import consultar_concurrente
 
-DB_CONFIG = {
-    'host': '172.232.188.183',
-    'port': 5435,
-    'database': 'schedule_db',
-    'user': 'admin',
-    'password': 'admin123'
-}
-
-conn = psycopg2.connect(**DB_CONFIG, cursor_factory=RealDictCursor)
-cur = conn.cursor()
-
-# Prerrequisitos de ciclo 2
-cur.execute("""
+# Prerrequisitos de ciclo 2 (con el timeout por consulta de acceso_async)
+rows, = consultar_concurrente(["""
     SELECT 
         c.codigo, 
         c.nombre,
@@ -28,9 +16,7 @@ cur.execute("""
     LEFT JOIN curso c2 ON p.prereq_id = c2.id
     WHERE c.ciclo = '2'
     ORDER BY c.codigo
-""")
-
-rows = cur.fetchall()
+"""])
 
 print("\n" + "=" * 100)
 print("PRERREQUISITOS DE CURSOS DE CICLO 2")
@@ -44,5 +30,4 @@ for r in rows:
     prereq_ciclo = r['prereq_ciclo'] or '-'
     print(f"{r['codigo']:<10} {r['nombre']:<45} {prereq:<10} {prereq_nombre:<30} {prereq_ciclo}")
 
-conn.close()
 print("=" * 100)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de memoria: matrículas como dict vs tipos compactos de modelos.py.
+
+Genera N matrículas sintéticas con la misma forma que las de
+generar_matriculas_alumno y mide con tracemalloc la memoria retenida por:
+- list de dict (como antes)
+- list de Matricula (__slots__, fecha/nota/estado codificados)
+- TablaMatriculas (columnas en array)
+
+No requiere base de datos.
+
+Uso:
+    python benchmark_memoria.py [--matriculas N]
+"""
+
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+from modelos import Matricula, TablaMatriculas
+
+SEMESTRES = [
+    "2020-2", "2021-1", "2021-2", "2022-1", "2022-2", "2023-1",
+    "2023-2", "2024-1", "2024-2", "2025-1", "2025-2"
+]
+
+def filas_sinteticas(n, semilla=0):
+    """Tuplas (alumno_id, curso_ofertado_id, fecha, nota, estado) al estilo del generador."""
+    rng = random.Random(semilla)
+    for i in range(n):
+        semestre = SEMESTRES[i % len(SEMESTRES)]
+        año, periodo = semestre.split('-')
+        fecha = f"{año}-{'03' if periodo == '1' else '09'}-01"
+        if semestre == "2025-2":
+            nota, estado = None, "Matriculado"
+        else:
+            nota = round(rng.uniform(7.0, 16.0), 2)
+            estado = "Aprobado" if nota >= 10 else "Desaprobado"
+        yield i // 70 + 1, rng.randint(1, 5000), fecha, nota, estado
+
+def como_dict(filas):
+    return [
+        {'alumno_id': a, 'curso_ofertado_id': c, 'fecha_matricula': f, 'nota_final': n, 'estado': e}
+        for a, c, f, n, e in filas
+    ]
+
+def como_slots(filas):
+    return [Matricula(a, c, f, n, e) for a, c, f, n, e in filas]
+
+def como_tabla(filas):
+    return TablaMatriculas(Matricula(a, c, f, n, e) for a, c, f, n, e in filas)
+
+def medir(construir, n):
+    """Bytes retenidos y segundos para construir n matrículas."""
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    datos = construir(filas_sinteticas(n))
+    segundos = time.perf_counter() - inicio
+    retenidos, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del datos
+    return retenidos, segundos
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara la memoria de matrículas como dict y tipos compactos")
+    parser.add_argument('--matriculas', type=int, default=500_000,
+                        help="Número de matrículas sintéticas (por defecto 500000)")
+    args = parser.parse_args()
+    n = args.matriculas
+
+    print("=" * 80)
+    print(f"BENCHMARK DE MEMORIA - {n:,} MATRÍCULAS")
+    print("=" * 80)
+    print()
+
+    resultados = [
+        ("list[dict]", *medir(como_dict, n)),
+        ("list[Matricula]", *medir(como_slots, n)),
+        ("TablaMatriculas", *medir(como_tabla, n)),
+    ]
+    base = resultados[0][1]
+
+    print(f"{'Representación':<18} {'MB':>10} {'bytes/fila':>12} {'vs dict':>9} {'seg':>7}")
+    print("-" * 60)
+    for nombre, retenidos, segundos in resultados:
+        print(f"{nombre:<18} {retenidos / 2**20:>10.1f} {retenidos / n:>12.1f} "
+              f"{retenidos / base:>8.1%} {segundos:>7.2f}")
+
+    # Extrapolación al escenario de 100k alumnos x 11 semestres x 7 cursos
+    escenario = 100_000 * 11 * 7
+    print()
+    print(f"Estimado para {escenario:,} matrículas (100k alumnos x 11 semestres x 7 cursos):")
+    for nombre, retenidos, _ in resultados:
+        print(f"  {nombre:<18} {retenidos / n * escenario / 2**30:>6.2f} GB")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Carga masiva de matrículas con COPY ... FROM STDIN en formato binario.
+
+En lugar de escribir generar_matriculas.sql (un INSERT con miles de tuplas
+literales que Postgres debe parsear de una vez), las filas generadas se
+codifican al formato binario de COPY a medida que Postgres las lee, así que
+la memoria no crece con el número de matrículas.
+
+Todo ocurre en una sola transacción, igual que el archivo SQL:
+    TRUNCATE log_ciclo_relativo, log_creditos, matricula
+    reset de créditos de alumno con trigger_actualizar_ciclo_relativo desactivado
+    COPY matricula (...) FROM STDIN (FORMAT binary)
+Los triggers de matricula se disparan igual que con el INSERT: fila a fila, o
+una sola vez por COPY con los triggers por sentencia de verificar_triggers.py.
+Con reemplazar=False (modo incremental) solo se hace el COPY, agregando filas.
+
+Con un HistorialAlumnos (generar_matriculas.py --historial) los triggers de
+usuario de matricula y alumno se desactivan durante la carga: después de las
+matrículas se cargan log_creditos y log_ciclo_relativo con COPY y los
+créditos, ciclo y promedio finales con un COPY a una tabla temporal y un
+UPDATE ... FROM.
+
+Uso:
+    from carga_binaria import cargar_matriculas
+    filas, segundos = cargar_matriculas(conn, matriculas)
+"""
+
+import struct
+import time
+from datetime import date, datetime
+from decimal import Decimal, ROUND_HALF_UP
+from functools import lru_cache
+
+COLUMNAS_MATRICULA = ('alumno_id', 'curso_ofertado_id', 'fecha_matricula', 'nota_final', 'estado')
+
+# Cabecera y fin del formato binario de COPY
+FIRMA_COPY = b'PGCOPY\n\xff\r\n\x00' + struct.pack('>ii', 0, 0)
+FIN_COPY = struct.pack('>h', -1)
+
+EPOCA_POSTGRES = date(2000, 1, 1).toordinal()
+EPOCA_TIMESTAMP = datetime(2000, 1, 1)
+
+NULO = struct.pack('>i', -1)
+
+def _con_longitud(datos):
+    return struct.pack('>i', len(datos)) + datos
+
+def _entero(formato):
+    empaquetado = struct.Struct(formato)
+    return lambda valor: _con_longitud(empaquetado.pack(int(valor)))
+
+def _flotante(formato):
+    empaquetado = struct.Struct(formato)
+    return lambda valor: _con_longitud(empaquetado.pack(float(valor)))
+
+def _texto(valor):
+    return _con_longitud(str(valor).encode('utf-8'))
+
+# Fechas y notas toman pocos valores distintos: se cachea su codificación
+@lru_cache(maxsize=4096)
+def _fecha(valor):
+    if isinstance(valor, str):
+        valor = date.fromisoformat(valor)
+    return _con_longitud(struct.pack('>i', valor.toordinal() - EPOCA_POSTGRES))
+
+@lru_cache(maxsize=4096)
+def _timestamp(valor):
+    if isinstance(valor, str):
+        valor = datetime.fromisoformat(valor)
+    elif not isinstance(valor, datetime):
+        valor = datetime.combine(valor, datetime.min.time())
+    delta = valor - EPOCA_TIMESTAMP
+    microsegundos = (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+    return _con_longitud(struct.pack('>q', microsegundos))
+
+def _numeric(escala):
+    """Codificador de numeric con `escala` decimales (dígitos en base 10000)."""
+    @lru_cache(maxsize=65536)
+    def codificar(valor):
+        # Redondeo decimal (mitad hacia arriba), no el de float al par
+        n = int(Decimal(str(valor)).quantize(Decimal(1).scaleb(-escala), ROUND_HALF_UP).scaleb(escala))
+        signo = 0x4000 if n < 0 else 0x0000
+        entero, fraccion = divmod(abs(n), 10 ** escala)
+
+        # Grupos de 4 dígitos decimales alineados al punto decimal
+        grupos_enteros = []
+        while entero:
+            entero, grupo = divmod(entero, 10000)
+            grupos_enteros.insert(0, grupo)
+        grupos_fraccion = []
+        fraccion *= 10 ** (-escala % 4)
+        for _ in range((escala + 3) // 4):
+            fraccion, grupo = divmod(fraccion, 10000)
+            grupos_fraccion.insert(0, grupo)
+
+        peso = len(grupos_enteros) - 1
+        digitos = grupos_enteros + grupos_fraccion
+        while digitos and digitos[-1] == 0:
+            digitos.pop()
+        while digitos and digitos[0] == 0:
+            digitos.pop(0)
+            peso -= 1
+        if not digitos:
+            peso, signo = 0, 0x0000
+
+        datos = struct.pack(f'>hhHH{len(digitos)}h', len(digitos), peso, signo, escala, *digitos)
+        return _con_longitud(datos)
+    return codificar
+
+def _codificador(tipo, escala):
+    """Codificador binario según el tipo de la columna en Postgres."""
+    if tipo == 'int2':
+        return _entero('>h')
+    if tipo == 'int4':
+        return _entero('>i')
+    if tipo == 'int8':
+        return _entero('>q')
+    if tipo == 'float4':
+        return _flotante('>f')
+    if tipo == 'float8':
+        return _flotante('>d')
+    if tipo == 'numeric':
+        return _numeric(escala)
+    if tipo == 'date':
+        return _fecha
+    if tipo == 'timestamp':
+        return _timestamp
+    if tipo in ('text', 'varchar', 'bpchar'):
+        return _texto
+    raise ValueError(f"Tipo de columna no soportado para COPY binario: {tipo}")
+
+def obtener_codificadores(conn, tabla, columnas):
+    """Consulta el tipo de cada columna y devuelve su codificador binario."""
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT a.attname, t.typname, a.atttypmod
+            FROM pg_attribute a
+            JOIN pg_type t ON a.atttypid = t.oid
+            WHERE a.attrelid = %s::regclass
+            AND a.attnum > 0
+            AND NOT a.attisdropped
+        """, (tabla,))
+        tipos = {nombre: (tipo, typmod) for nombre, tipo, typmod in cur.fetchall()}
+
+    codificadores = []
+    for columna in columnas:
+        tipo, typmod = tipos[columna]
+        # numeric(p, s): typmod = ((p << 16) | s) + 4; sin precisión se usan 2 decimales
+        escala = (typmod - 4) & 0xFFFF if tipo == 'numeric' and typmod >= 4 else 2
+        codificadores.append(_codificador(tipo, escala))
+    return codificadores
+
+class FlujoCopyBinario:
+    """
+    Objeto tipo archivo que produce el formato binario de COPY a demanda.
+
+    copy_expert llama a read(n) repetidamente; cada llamada codifica solo las
+    filas necesarias para llenar n bytes.
+    """
+
+    def __init__(self, filas, columnas, codificadores):
+        self._filas = iter(filas)
+        self._columnas = columnas
+        self._codificadores = codificadores
+        self._num_campos = struct.pack('>h', len(columnas))
+        self._buffer = bytearray(FIRMA_COPY)
+        self._terminado = False
+        self.filas_escritas = 0
+        self.error = None
+
+    def _codificar(self, fila):
+        partes = [self._num_campos]
+        for columna, codificar in zip(self._columnas, self._codificadores):
+            valor = fila[columna]
+            partes.append(NULO if valor is None else codificar(valor))
+        return b''.join(partes)
+
+    def read(self, size=-1):
+        while not self._terminado and (size < 0 or len(self._buffer) < size):
+            try:
+                fila = next(self._filas, None)
+            except Exception as e:
+                # copy_expert lo reemplaza por QueryCanceled: se guarda el original
+                self.error = e
+                raise
+            if fila is None:
+                self._buffer += FIN_COPY
+                self._terminado = True
+                break
+            self._buffer += self._codificar(fila)
+            self.filas_escritas += 1
+
+        if size < 0:
+            size = len(self._buffer)
+        datos = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return datos
+
+def copiar(cur, tabla, columnas, filas, tamano_bloque=1 << 16):
+    """COPY binario de `filas` (diccionarios) a `tabla`; devuelve las filas copiadas."""
+    flujo = FlujoCopyBinario(filas, columnas, obtener_codificadores(cur.connection, tabla, columnas))
+    try:
+        cur.copy_expert(
+            f"COPY {tabla} ({', '.join(columnas)}) FROM STDIN WITH (FORMAT binary)",
+            flujo,
+            size=tamano_bloque
+        )
+    except Exception:
+        # Un error al generar las filas (p. ej. MatriculasInvalidas) se propaga tal cual
+        if flujo.error is not None:
+            raise flujo.error from None
+        raise
+    return flujo.filas_escritas
+
+def cargar_historial(cur, historial, tamano_bloque=1 << 16):
+    """Carga los logs y los agregados finales de un HistorialAlumnos (triggers ya desactivados)."""
+    for tabla, columnas, filas in historial.tablas_log():
+        copiar(cur, tabla, columnas, filas, tamano_bloque)
+
+    columnas = historial.COLUMNAS_AGREGADOS
+    cur.execute(f"""
+        CREATE TEMP TABLE alumno_final ON COMMIT DROP AS
+        SELECT {', '.join(columnas)} FROM alumno WITH NO DATA
+    """)
+    copiar(cur, 'alumno_final', columnas, historial.filas_agregados(), tamano_bloque)
+    cur.execute("""
+        UPDATE alumno a
+        SET creditos_aprobados = f.creditos_aprobados,
+            ciclo_relativo = f.ciclo_relativo,
+            promedio = f.promedio
+        FROM alumno_final f
+        WHERE a.id = f.id
+    """)
+
+def cargar_matriculas(conn, matriculas, tamano_bloque=1 << 16, reemplazar=True, historial=None):
+    """
+    Reemplaza las matrículas de la BD por las generadas, en una sola transacción.
+
+    Args:
+        conn: Conexión psycopg2
+        matriculas: Iterable de diccionarios con COLUMNAS_MATRICULA (puede ser un generador)
+        tamano_bloque: Bytes que se envían a Postgres en cada lectura
+        reemplazar: Si es False, no se hace TRUNCATE ni reset de créditos:
+            las matrículas se agregan a las existentes
+        historial: HistorialAlumnos opcional; si se pasa, las matrículas se cargan
+            con los triggers desactivados y después se carga el historial
+
+    Returns:
+        (filas, segundos) de la carga por COPY
+    """
+    try:
+        with conn.cursor() as cur:
+            if reemplazar:
+                cur.execute("TRUNCATE TABLE log_ciclo_relativo, log_creditos, matricula RESTART IDENTITY CASCADE")
+
+                # Resetear créditos de alumnos SIN TRIGGERS (se recalcularán con las matrículas)
+                cur.execute("ALTER TABLE alumno DISABLE TRIGGER trigger_actualizar_ciclo_relativo")
+                cur.execute("UPDATE alumno SET creditos_aprobados = 0, ciclo_relativo = 1, promedio = 0")
+                cur.execute("ALTER TABLE alumno ENABLE TRIGGER trigger_actualizar_ciclo_relativo")
+
+            if historial is not None:
+                cur.execute("ALTER TABLE matricula DISABLE TRIGGER USER")
+                cur.execute("ALTER TABLE alumno DISABLE TRIGGER USER")
+                matriculas = historial.observar(matriculas)
+
+            inicio = time.perf_counter()
+            filas = copiar(cur, 'matricula', COLUMNAS_MATRICULA, matriculas, tamano_bloque)
+            segundos = time.perf_counter() - inicio
+
+            if historial is not None:
+                cargar_historial(cur, historial, tamano_bloque)
+                cur.execute("ALTER TABLE matricula ENABLE TRIGGER USER")
+                cur.execute("ALTER TABLE alumno ENABLE TRIGGER USER")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    return filas, segundos
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Salida columnar del dataset del predictor: Parquet particionado por semestre.
+
+Estructura (particionado estilo Hive):
+    matriculas_por_curso_generado/
+        semestre=2020-2/part-0.parquet
+        semestre=2021-1/part-0.parquet
+        ...
+
+Cada archivo tiene un esquema tipado (enteros de ancho fijo, float64 para las
+tasas) y codigo_curso/tipo_curso codificados como diccionario. El lector usa
+memory-map y poda de particiones, de modo que solo se leen los semestres pedidos.
+
+Requiere pyarrow (pip install pyarrow); el CSV sigue siendo la salida por defecto.
+
+Uso desde el predictor:
+    from dataset_parquet import leer_parquet
+    tabla = leer_parquet(directorio, semestres=['2024-1', '2024-2'])
+    df = tabla.to_pandas()
+"""
+
+import os
+import shutil
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pyarrow import fs
+
+# Esquema de cada archivo (sin 'semestre', que va en la ruta de la partición)
+ESQUEMA = pa.schema([
+    ('curso_ofertado_id', pa.int32()),
+    ('nombre_seccion', pa.string()),
+    ('codigo_curso', pa.dictionary(pa.int16(), pa.string())),
+    ('creditos', pa.int8()),
+    ('tipo_curso', pa.dictionary(pa.int8(), pa.string())),
+    ('profesor_id', pa.int32()),
+    ('profesor_popularidad', pa.float64()),
+    ('alumnos_previos', pa.int32()),
+    ('variacion_matricula', pa.float64()),
+    ('num_prerrequisitos', pa.int16()),
+    ('tasa_aprobacion', pa.float64()),
+    ('franja_horaria', pa.int8()),
+    ('alumnos_elegibles', pa.int32()),
+    ('cupo_maximo', pa.int32()),
+    ('alumnos_matriculados', pa.int32()),
+])
+
+PARTICIONADO = ds.partitioning(pa.schema([('semestre', pa.string())]), flavor='hive')
+
+def _directorio_semestre(directorio, semestre):
+    return os.path.join(directorio, f"semestre={semestre}")
+
+class EscritorParquet:
+    """
+    Escritor incremental: recibe filas ordenadas por semestre y escribe cada
+    partición apenas termina su semestre, sin acumular todo el dataset.
+    """
+
+    def __init__(self, directorio, desde_semestre=None):
+        """
+        Args:
+            directorio: Directorio raíz del dataset
+            desde_semestre: Si se indica, solo se reemplazan las particiones
+                >= desde_semestre (exportación incremental); si no, se reescribe todo
+        """
+        self.directorio = directorio
+        self.desde_semestre = desde_semestre
+        self.particiones = 0
+        self._semestre = None
+        self._filas = []
+
+        os.makedirs(directorio, exist_ok=True)
+
+        # Eliminar particiones que se van a reemplazar
+        for nombre in os.listdir(directorio):
+            if not nombre.startswith('semestre='):
+                continue
+            semestre = nombre.split('=', 1)[1]
+            if desde_semestre is None or semestre >= desde_semestre:
+                shutil.rmtree(os.path.join(directorio, nombre))
+
+    def agregar(self, fila):
+        """Agrega una fila; al cambiar de semestre se escribe la partición anterior."""
+        if self.desde_semestre is not None and fila['semestre'] < self.desde_semestre:
+            return
+        if fila['semestre'] != self._semestre:
+            self._escribir_particion()
+            self._semestre = fila['semestre']
+        self._filas.append(fila)
+
+    def cerrar(self):
+        """Escribe la última partición y devuelve cuántas se escribieron."""
+        self._escribir_particion()
+        return self.particiones
+
+    def _escribir_particion(self):
+        if not self._filas:
+            return
+        tabla = pa.Table.from_pydict(
+            {columna: [fila[columna] for fila in self._filas] for columna in ESQUEMA.names},
+            schema=ESQUEMA
+        )
+        destino = _directorio_semestre(self.directorio, self._semestre)
+        os.makedirs(destino, exist_ok=True)
+        pq.write_table(
+            tabla,
+            os.path.join(destino, 'part-0.parquet'),
+            use_dictionary=['codigo_curso', 'tipo_curso'],
+            compression='snappy'
+        )
+        self.particiones += 1
+        self._filas = []
+
+def semestres_escritos(directorio):
+    """Semestres con partición escrita en el dataset (vacío si el directorio no existe)."""
+    if not os.path.isdir(directorio):
+        return set()
+    return {
+        nombre.split('=', 1)[1]
+        for nombre in os.listdir(directorio)
+        if nombre.startswith('semestre=') and
+        os.path.exists(os.path.join(directorio, nombre, 'part-0.parquet'))
+    }
+
+def escribir_parquet(datos, directorio, desde_semestre=None):
+    """
+    Escribe las filas del dataset (ordenadas por semestre) como Parquet particionado.
+
+    Returns:
+        Número de particiones escritas
+    """
+    escritor = EscritorParquet(directorio, desde_semestre)
+    for fila in datos:
+        escritor.agregar(fila)
+    return escritor.cerrar()
+
+def leer_parquet(directorio, semestres=None, columnas=None):
+    """
+    Lee el dataset con memory-map, cargando solo las particiones necesarias.
+
+    Args:
+        directorio: Directorio raíz del dataset
+        semestres: Lista de semestres a cargar (todos si es None)
+        columnas: Columnas a cargar (todas si es None)
+
+    Returns:
+        pyarrow.Table con la columna 'semestre' reconstruida desde la partición
+    """
+    dataset = ds.dataset(
+        os.path.abspath(directorio),
+        format='parquet',
+        partitioning=PARTICIONADO,
+        filesystem=fs.LocalFileSystem(use_mmap=True)
+    )
+    filtro = ds.field('semestre').isin(list(semestres)) if semestres else None
+    return dataset.to_table(columns=columnas, filter=filtro)
@@ -1,90 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ejecuta un archivo SQL generado (por defecto generar_matriculas.sql) sentencia
+por sentencia, sin cargarlo completo en memoria.
+
+- Las sentencias se leen de forma perezosa (sentencias_sql.LectorSQL)
+- Los INSERT ... VALUES gigantes se dividen en lotes de --lote filas
+- Todo corre en una transacción; con --continuar cada sentencia/lote va en un
+  SAVEPOINT y los que fallan se deshacen y reportan sin abortar el resto
+- Se muestra el avance (porcentaje del archivo, filas y filas/s)
+- Acepta archivos comprimidos con gzip (.sql.gz)
+
+Uso:
+    python ejecutar_sql.py [archivo.sql[.gz]] [--lote N] [--continuar]
+"""
+
+import argparse
+import gzip
+import io
+import os
+import time
+
 import psycopg2
 import sys
 
-# Configuración de la base de datos
-DB_CONFIG = {
-    'host': '172.232.188.183',
-    'port': 5435,
-    'user': 'admin',
-    'password': 'admin123',
-    'database': 'schedule_db'
-}
-
-print("=" * 80)
-print("EJECUTOR DE SQL - MATRÍCULAS")
-print("=" * 80)
-print()
-
-# Leer el archivo SQL
-sql_file = r"d:\Estudios\Universidad Nacional de Ingeniería\8. Octavo Ciclo\Ingeniería de Software (CIB02)\Proyecto\modelo_predictor_demanda\scripts\generar_matriculas.sql"
-
-print(f"📄 Leyendo archivo SQL: {sql_file}")
-try:
-    with open(sql_file, 'r', encoding='utf-8') as f:
-        sql_content = f.read()
-    print("✓ Archivo leído correctamente")
-except Exception as e:
-    print(f"✗ Error al leer archivo: {e}")
-    sys.exit(1)
-
-# Conectar a la base de datos
-print()
-print("🔌 Conectando a la base de datos...")
-try:
-    conn = psycopg2.connect(**DB_CONFIG)
-    cur = conn.cursor()
-    print("✓ Conexión exitosa")
-except Exception as e:
-    print(f"✗ Error de conexión: {e}")
-    sys.exit(1)
-
-# Ejecutar el SQL
-print()
-print("⚙️  Ejecutando SQL...")
-print("   Esto puede tardar varios segundos...")
-try:
-    cur.execute(sql_content)
-    conn.commit()
-    print("✓ SQL ejecutado exitosamente")
-    print(f"✓ {cur.rowcount} filas afectadas")
-except Exception as e:
-    conn.rollback()
-    print(f"✗ Error al ejecutar SQL: {e}")
-    cur.close()
-    conn.close()
-    sys.exit(1)
-
-# Verificar resultados
-print()
-print("🔍 Verificando resultados...")
-try:
-    # Contar matrículas
-    cur.execute("SELECT COUNT(*) FROM matricula")
-    total_matriculas = cur.fetchone()[0]
-    print(f"✓ Total matrículas: {total_matriculas}")
-    
-    # Verificar ciclo relativo de algunos alumnos
-    cur.execute("""
-        SELECT codigo, ciclo_relativo, creditos_aprobados, promedio
-        FROM alumno
-        WHERE codigo IN ('20170001H', '20190001J', '20220001V', '20250001P')
-        ORDER BY codigo
-    """)
-    alumnos = cur.fetchall()
+from acceso_datos import conectar, describir
+from sentencias_sql import LectorSQL, InsertValues, ErrorSQL
+
+ARCHIVO_POR_DEFECTO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'generar_matriculas.sql')
+TAMANO_LOTE = 1000
+INTERVALO_PROGRESO = 2.0  # segundos
+
+def abrir_sql(ruta):
+    """
+    Abre el archivo SQL como texto, descomprimiendo al vuelo si es .gz.
+
+    Returns:
+        (texto, crudo): el archivo de texto y el archivo binario subyacente,
+        cuya posición sirve para medir el avance
+    """
+    crudo = open(ruta, 'rb')
+    contenido = gzip.GzipFile(fileobj=crudo) if ruta.endswith('.gz') else crudo
+    return io.TextIOWrapper(contenido, encoding='utf-8'), crudo
+
+def resumir(sentencia, largo=80):
+    """Primera línea con código de la sentencia, para mensajes."""
+    for linea in sentencia.splitlines():
+        if linea.strip() and not linea.lstrip().startswith('--'):
+            return linea.strip()[:largo]
+    return sentencia.strip()[:largo]
+
+def ejecutar_archivo(conn, ruta, tamano_lote=TAMANO_LOTE, continuar=False):
+    """
+    Ejecuta el archivo en una sola transacción.
+
+    Args:
+        conn: Conexión psycopg2
+        ruta: Archivo .sql o .sql.gz
+        tamano_lote: Filas por INSERT al dividir INSERT ... VALUES
+        continuar: Si es True, cada sentencia/lote va en un SAVEPOINT y los
+            errores se deshacen y reportan sin abortar la transacción
+
+    Returns:
+        Diccionario con sentencias, filas, errores y segundos
+
+    Raises:
+        psycopg2.Error / ErrorSQL: si falla una sentencia y continuar es False
+            (la transacción se deshace completa)
+    """
+    total_bytes = os.path.getsize(ruta)
+    estadisticas = {'sentencias': 0, 'filas': 0, 'errores': [], 'segundos': 0.0}
+    inicio = time.perf_counter()
+    ultimo_reporte = inicio
+    hay_savepoint = False
+
+    texto, crudo = abrir_sql(ruta)
+    try:
+        with texto, conn.cursor() as cur:
+
+            def ejecutar(sentencia):
+                nonlocal hay_savepoint, ultimo_reporte
+                if continuar:
+                    # Un solo viaje a la BD: liberar el savepoint anterior y abrir uno nuevo
+                    prefijo = "RELEASE SAVEPOINT sentencia; " if hay_savepoint else ""
+                    try:
+                        cur.execute(prefijo + "SAVEPOINT sentencia; " + sentencia)
+                    except psycopg2.Error as e:
+                        cur.execute("ROLLBACK TO SAVEPOINT sentencia")
+                        estadisticas['errores'].append((estadisticas['sentencias'] + 1, resumir(sentencia), str(e).strip()))
+                        print(f"   ✗ Sentencia {estadisticas['sentencias'] + 1} deshecha: {str(e).strip().splitlines()[0]}")
+                        hay_savepoint = True
+                        estadisticas['sentencias'] += 1
+                        return
+                    hay_savepoint = True
+                else:
+                    cur.execute(sentencia)
+
+                estadisticas['sentencias'] += 1
+                if cur.rowcount > 0:
+                    estadisticas['filas'] += cur.rowcount
+
+                ahora = time.perf_counter()
+                if ahora - ultimo_reporte >= INTERVALO_PROGRESO:
+                    ultimo_reporte = ahora
+                    transcurrido = ahora - inicio
+                    print(f"   {100 * crudo.tell() / max(total_bytes, 1):5.1f}% | "
+                          f"{estadisticas['sentencias']} sentencias | {estadisticas['filas']:,} filas | "
+                          f"{estadisticas['filas'] / transcurrido:,.0f} filas/s")
+
+            for sentencia in LectorSQL(texto):
+                if isinstance(sentencia, InsertValues):
+                    for lote in sentencia.lotes(tamano_lote):
+                        ejecutar(lote)
+                else:
+                    ejecutar(sentencia)
+
+            if hay_savepoint:
+                cur.execute("RELEASE SAVEPOINT sentencia")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    estadisticas['segundos'] = time.perf_counter() - inicio
+    return estadisticas
+
+def main():
+    """Función principal."""
+    parser = argparse.ArgumentParser(description="Ejecuta un archivo SQL generado, por lotes")
+    parser.add_argument('archivo', nargs='?', default=ARCHIVO_POR_DEFECTO,
+                        help="Archivo .sql o .sql.gz (por defecto generar_matriculas.sql)")
+    parser.add_argument('--lote', type=int, default=TAMANO_LOTE,
+                        help=f"Filas por INSERT al dividir INSERT ... VALUES (por defecto {TAMANO_LOTE})")
+    parser.add_argument('--continuar', action='store_true',
+                        help="Deshacer solo las sentencias que fallen (SAVEPOINT) y continuar")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("EJECUTOR DE SQL - MATRÍCULAS")
+    print("=" * 80)
+    print()
+
+    print(f"📄 Archivo SQL: {args.archivo}")
+    if not os.path.exists(args.archivo):
+        print(f"✗ No existe el archivo: {args.archivo}")
+        sys.exit(1)
+
+    # Conectar a la base de datos
+    print()
+    print(f"🔌 Conectando a la base de datos ({describir()})...")
+    try:
+        conn = conectar()
+        cur = conn.cursor()
+        print("✓ Conexión exitosa")
+    except Exception as e:
+        print(f"✗ Error de conexión: {e}")
+        sys.exit(1)
+
+    # Ejecutar el SQL
+    print()
+    print(f"⚙️  Ejecutando SQL (lotes de {args.lote} filas)...")
+    try:
+        estadisticas = ejecutar_archivo(conn, args.archivo, args.lote, args.continuar)
+        print("✓ SQL ejecutado exitosamente")
+        print(f"✓ {estadisticas['sentencias']} sentencias, {estadisticas['filas']:,} filas afectadas "
+              f"en {estadisticas['segundos']:.2f}s "
+              f"({estadisticas['filas'] / max(estadisticas['segundos'], 1e-9):,.0f} filas/s)")
+        if estadisticas['errores']:
+            print(f"⚠️  {len(estadisticas['errores'])} sentencias deshechas:")
+            for numero, sentencia, error in estadisticas['errores']:
+                print(f"   #{numero}: {sentencia}")
+                print(f"      {error.splitlines()[0]}")
+    except (psycopg2.Error, ErrorSQL) as e:
+        print(f"✗ Error al ejecutar SQL (transacción deshecha): {e}")
+        cur.close()
+        conn.close()
+        sys.exit(1)
+
+    # Verificar resultados
+    print()
+    print("🔍 Verificando resultados...")
+    try:
+        # Contar matrículas
+        cur.execute("SELECT COUNT(*) FROM matricula")
+        total_matriculas = cur.fetchone()[0]
+        print(f"✓ Total matrículas: {total_matriculas}")
+
+        # Verificar ciclo relativo de algunos alumnos
+        cur.execute("""
+            SELECT codigo, ciclo_relativo, creditos_aprobados, promedio
+            FROM alumno
+            WHERE codigo IN ('20170001H', '20190001J', '20220001V', '20250001P')
+            ORDER BY codigo
+        """)
+        alumnos = cur.fetchall()
+        print()
+        print("Ejemplos de alumnos:")
+        print(f"{'Código':<15} {'Ciclo':<6} {'Créditos':<10} {'Promedio':<8}")
+        print("-" * 45)
+        for alumno in alumnos:
+            print(f"{alumno[0]:<15} {alumno[1]:<6} {alumno[2]:<10} {alumno[3]:<8.2f}")
+
+    except Exception as e:
+        print(f"✗ Error al verificar: {e}")
+    finally:
+        cur.close()
+        conn.close()
+
     print()
-    print("Ejemplos de alumnos:")
-    print(f"{'Código':<15} {'Ciclo':<6} {'Créditos':<10} {'Promedio':<8}")
-    print("-" * 45)
-    for alumno in alumnos:
-        print(f"{alumno[0]:<15} {alumno[1]:<6} {alumno[2]:<10} {alumno[3]:<8.2f}")
-    
-except Exception as e:
-    print(f"✗ Error al verificar: {e}")
-finally:
-    cur.close()
-    conn.close()
-
-print()
-print("=" * 80)
-print("PROCESO COMPLETADO")
-print("=" * 80)
+    print("=" * 80)
+    print("PROCESO COMPLETADO")
+    print("=" * 80)
+
+if __name__ == '__main__':
+    main()
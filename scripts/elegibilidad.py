@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Motor de elegibilidad histórica: alumnos que podían llevar cada curso en cada semestre.
+
+Un alumno es elegible para el curso C en el semestre S si:
+- Ya había ingresado (semestre de ingreso según su código <= S)
+- No había aprobado C antes de S
+- Había aprobado todos los prerrequisitos de C (curso_prerrequisito) antes de S
+
+Las aprobaciones se reproducen semestre a semestre sobre matrices booleanas
+alumnos x cursos, y el cumplimiento de prerrequisitos de todos los cursos se
+obtiene con un producto matricial contra la matriz de prerrequisitos. Así se
+calculan todas las celdas curso x semestre en una pasada vectorizada.
+
+Uso:
+    motor = MotorElegibilidad.desde_bd(conn)
+    motor.alumnos_elegibles(curso_id, '2023-1')
+"""
+
+from bisect import bisect_left
+
+import numpy as np
+from psycopg2.extras import RealDictCursor
+
+from generar_alumnos import PERIODO_POR_DIGITO
+from indice_curricular import IndiceCurricular
+
+SQL_ALUMNOS = "SELECT id, codigo FROM alumno ORDER BY id"
+SQL_SEMESTRES = "SELECT DISTINCT semestre FROM curso_ofertado"
+SQL_APROBACIONES = """
+    SELECT m.alumno_id, co.curso_id, MIN(co.semestre) as semestre
+    FROM matricula m
+    JOIN curso_ofertado co ON m.curso_ofertado_id = co.id
+    WHERE m.estado = 'Aprobado'
+    GROUP BY m.alumno_id, co.curso_id
+"""
+
+def semestre_de_ingreso(codigo):
+    """
+    Semestre de ingreso según el código del alumno: YYYY + modalidad + secuencia.
+    El periodo sale del dígito de modalidad (generar_alumnos.PERIODO_POR_DIGITO).
+    """
+    return f"{codigo[:4]}-{PERIODO_POR_DIGITO.get(codigo[4], '2')}"
+
+class MotorElegibilidad:
+    """Conteo de alumnos elegibles por curso y semestre."""
+
+    def __init__(self, indice_curricular, semestres, ingresos, aprobaciones):
+        """
+        Args:
+            indice_curricular: IndiceCurricular con todos los cursos
+            semestres: Semestres a evaluar ('YYYY-N')
+            ingresos: Semestre de ingreso de cada alumno (uno por alumno)
+            aprobaciones: Iterable de (indice_alumno, curso_id, semestre) con la
+                primera aprobación de cada alumno en cada curso
+        """
+        self.semestres = sorted(set(semestres))
+        self._indice_curso = {
+            curso_id: posicion for curso_id, posicion in indice_curricular.posicion.items()
+            if posicion < indice_curricular.num_cursos
+        }
+        self._indice_semestre = {semestre: t for t, semestre in enumerate(self.semestres)}
+
+        num_cursos = len(self._indice_curso)
+        num_semestres = len(self.semestres)
+
+        # Matriz de prerrequisitos: fila = curso, columna = prerrequisito
+        matriz_prereq, num_prereqs = indice_curricular.matriz_prerrequisitos()
+
+        # Primer semestre evaluado en el que el alumno ya cuenta con el curso aprobado
+        # (aprobado antes de semestres[t] <=> desde <= t)
+        nunca = num_semestres + 1
+        aprobado_desde = np.full((len(ingresos), num_cursos), nunca, dtype=np.int16)
+        filas, columnas, desde = [], [], []
+        for indice_alumno, curso_id, semestre in aprobaciones:
+            c = self._indice_curso.get(curso_id)
+            if c is not None:
+                filas.append(indice_alumno)
+                columnas.append(c)
+                desde.append(semestre)
+        if filas:
+            desde = np.searchsorted(self.semestres, desde, side='right').astype(np.int16)
+            np.minimum.at(aprobado_desde, (filas, columnas), desde)
+
+        # Primer semestre evaluado en el que el alumno ya ingresó
+        activo_desde = np.array(
+            [bisect_left(self.semestres, ingreso) for ingreso in ingresos], dtype=np.int16
+        )
+
+        self._conteos = np.zeros((num_cursos, num_semestres), dtype=np.int64)
+        for t in range(num_semestres):
+            aprobado = aprobado_desde <= t
+            activos = activo_desde <= t
+            prereqs_aprobados = aprobado.astype(np.float32) @ matriz_prereq.T
+            elegible = (prereqs_aprobados >= num_prereqs) & ~aprobado & activos[:, None]
+            self._conteos[:, t] = elegible.sum(axis=0)
+
+    @classmethod
+    def desde_bd(cls, conn):
+        """Carga alumnos, índice curricular, semestres y aprobaciones."""
+        indice_curricular = IndiceCurricular.desde_bd(conn)
+
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(SQL_ALUMNOS)
+            alumnos = cur.fetchall()
+
+            cur.execute(SQL_SEMESTRES)
+            semestres = cur.fetchall()
+
+            cur.execute(SQL_APROBACIONES)
+            aprobaciones = cur.fetchall()
+
+        return cls.desde_filas(indice_curricular, alumnos, semestres, aprobaciones)
+
+    @classmethod
+    def desde_filas(cls, indice_curricular, alumnos, semestres, aprobaciones):
+        """Construye el motor a partir de las filas de SQL_ALUMNOS, SQL_SEMESTRES y SQL_APROBACIONES."""
+        indice_alumno = {alumno['id']: i for i, alumno in enumerate(alumnos)}
+        aprobaciones = [
+            (indice_alumno[row['alumno_id']], row['curso_id'], row['semestre'])
+            for row in aprobaciones
+            if row['alumno_id'] in indice_alumno
+        ]
+        semestres = [row['semestre'] for row in semestres]
+        ingresos = [semestre_de_ingreso(alumno['codigo']) for alumno in alumnos]
+        return cls(indice_curricular, semestres, ingresos, aprobaciones)
+
+    def alumnos_elegibles(self, curso_id, semestre):
+        """Alumnos que cumplían los prerrequisitos del curso al inicio del semestre."""
+        c = self._indice_curso.get(curso_id)
+        t = self._indice_semestre.get(semestre)
+        if c is None or t is None:
+            return 0
+        return int(self._conteos[c, t])
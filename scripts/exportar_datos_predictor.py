@@ -11,34 +11,68 @@ Genera un archivo CSV con el mismo formato que matriculas_por_curso.csv:
 - creditos
 - tipo_curso
 - profesor_id
-- profesor_popularidad
+- profesor_popularidad (solo con notas de semestres anteriores)
 - alumnos_previos
 - variacion_matricula
 - num_prerrequisitos
 - tasa_aprobacion
 - franja_horaria
-- alumnos_elegibles
+- alumnos_elegibles (cumplían prerrequisitos al inicio del semestre)
 - cupo_maximo
 - alumnos_matriculados
+
+Uso:
+    python exportar_datos_predictor.py [--incremental] [--parquet]
+
+Con --incremental se guarda una marca de agua (último semestre exportado y un
+checksum de matricula/curso_ofertado por semestre) junto al CSV, y en las
+siguientes ejecuciones solo se recalculan los semestres desde el primero que
+cambió. Las filas anteriores se conservan del CSV existente y sirven para
+calcular alumnos_previos/variacion_matricula del primer semestre recalculado.
+
+Con --parquet se escribe además una copia columnar particionada por semestre
+(ver dataset_parquet.py, requiere pyarrow). El CSV se sigue generando siempre.
+Con --incremental --parquet, si al Parquet le falta alguna partición del CSV
+(no existe o se exportó antes sin --parquet) se hace la exportación completa.
+
+La exportación es en streaming: las secciones se leen con un cursor del lado
+del servidor en lotes de TAMANO_LOTE filas, cada fila se escribe apenas se
+calcula y las estadísticas finales se acumulan en la misma pasada, de modo que
+la memoria no crece con la cantidad de semestres y secciones. Las consultas
+chicas del catálogo (cursos, prerrequisitos, semestres) se envían juntas
+(acceso_datos.LoteConsultas); las cargas masivas (popularidad, alumnos y
+aprobaciones) se leen con cursores normales.
 """
 
-import psycopg2
 from psycopg2.extras import RealDictCursor
+import argparse
 import csv
+import json
 import os
-from collections import defaultdict
 
-# Configuración de conexión
-DB_CONFIG = {
-    'host': '172.232.188.183',
-    'port': 5435,
-    'database': 'schedule_db',
-    'user': 'admin',
-    'password': 'admin123'
-}
+from acceso_datos import conectar, LoteConsultas
+from elegibilidad import SQL_ALUMNOS, SQL_APROBACIONES, SQL_SEMESTRES, MotorElegibilidad
+from indice_curricular import SQL_CURSOS, SQL_PRERREQUISITOS, IndiceCurricular
+from popularidad_profesor import HistorialPopularidad
 
 # Archivo de salida
 OUTPUT_FILE = '../predictor_demanda_api/data/matriculas_por_curso_generado.csv'
+WATERMARK_FILE = '../predictor_demanda_api/data/matriculas_por_curso_generado.watermark.json'
+PARQUET_DIR = '../predictor_demanda_api/data/matriculas_por_curso_generado'
+
+# Solo se exporta el histórico completo (semestres con notas cerradas)
+SEMESTRE_LIMITE = '2025-2'
+
+# Filas por lote del cursor del lado del servidor
+TAMANO_LOTE = 2000
+
+FIELDNAMES = [
+    'curso_ofertado_id', 'nombre_seccion', 'codigo_curso', 'semestre',
+    'creditos', 'tipo_curso', 'profesor_id', 'profesor_popularidad',
+    'alumnos_previos', 'variacion_matricula', 'num_prerrequisitos',
+    'tasa_aprobacion', 'franja_horaria', 'alumnos_elegibles',
+    'cupo_maximo', 'alumnos_matriculados'
+]
 
 def calcular_franja_horaria(turno):
     """Calcula la franja horaria basada en el turno."""
@@ -56,100 +90,165 @@ def calcular_franja_horaria(turno):
     else:
         return 1  # Por defecto
 
-def calcular_popularidad_profesor(conn, profesor_id):
-    """Calcula la popularidad de un profesor basada en notas promedio y tasa de aprobación."""
-    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+def calcular_checksums(conn):
+    """
+    Calcula un checksum por semestre de las filas de curso_ofertado y matricula.
+    
+    Returns:
+        Diccionario semestre -> md5
+    """
+    with conn.cursor() as cur:
         cur.execute("""
             SELECT 
-                AVG(m.nota_final) as promedio_notas,
-                COUNT(CASE WHEN m.estado = 'Aprobado' THEN 1 END)::float / 
-                NULLIF(COUNT(CASE WHEN m.estado IN ('Aprobado', 'Desaprobado') THEN 1 END), 0) as tasa_aprobacion
-            FROM matricula m
-            JOIN curso_ofertado co ON m.curso_ofertado_id = co.id
-            WHERE co.profesor_id = %s
-            AND m.estado IN ('Aprobado', 'Desaprobado')
-        """, (profesor_id,))
-        
-        result = cur.fetchone()
-        
-        if result['promedio_notas'] is None or result['tasa_aprobacion'] is None:
-            return 0.75  # Valor por defecto
-        
-        # Normalizar: nota promedio (escala 7-16 a 0-1) + tasa aprobación, dividido entre 2
-        nota_norm = (float(result['promedio_notas']) - 7) / 9  # 7-16 -> 0-1
-        popularidad = (nota_norm + float(result['tasa_aprobacion'])) / 2
-        
-        return round(max(0.5, min(1.0, popularidad)), 2)
+                co.semestre,
+                md5(string_agg(
+                    concat_ws('|', co.id, co.curso_id, co.profesor_id, co.codigo_seccion,
+                              co.turno, co.cupos_disponibles, m.id, m.alumno_id,
+                              m.nota_final, m.estado),
+                    ',' ORDER BY co.id, m.id
+                )) as checksum
+            FROM curso_ofertado co
+            LEFT JOIN matricula m ON co.id = m.curso_ofertado_id
+            WHERE co.semestre < %s
+            GROUP BY co.semestre
+        """, (SEMESTRE_LIMITE,))
+        return dict(cur.fetchall())
 
-def contar_prerrequisitos(conn, curso_id):
-    """Cuenta cuántos prerrequisitos tiene un curso."""
-    with conn.cursor() as cur:
-        cur.execute("""
-            SELECT COUNT(*) 
-            FROM curso_prerrequisito 
-            WHERE curso_id = %s
-        """, (curso_id,))
-        return cur.fetchone()[0]
+def cargar_watermark():
+    """Lee la marca de agua de la última exportación (None si no existe)."""
+    if not os.path.exists(WATERMARK_FILE) or not os.path.exists(OUTPUT_FILE):
+        return None
+    with open(WATERMARK_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
 
-def calcular_tasa_aprobacion(conn, curso_id, semestre_hasta):
-    """Calcula la tasa de aprobación histórica de un curso."""
-    with conn.cursor() as cur:
-        cur.execute("""
-            SELECT 
-                COUNT(CASE WHEN m.estado = 'Aprobado' THEN 1 END)::float / 
-                NULLIF(COUNT(CASE WHEN m.estado IN ('Aprobado', 'Desaprobado') THEN 1 END), 0) as tasa
-            FROM matricula m
-            JOIN curso_ofertado co ON m.curso_ofertado_id = co.id
-            WHERE co.curso_id = %s
-            AND co.semestre < %s
-            AND m.estado IN ('Aprobado', 'Desaprobado')
-        """, (curso_id, semestre_hasta))
-        
-        result = cur.fetchone()[0]
-        return round(result if result else 0.75, 2)
+def guardar_watermark(checksums):
+    """Guarda el último semestre exportado y los checksums por semestre."""
+    watermark = {
+        'ultimo_semestre': max(checksums) if checksums else None,
+        'checksums': checksums
+    }
+    with open(WATERMARK_FILE, 'w', encoding='utf-8') as f:
+        json.dump(watermark, f, indent=2, sort_keys=True)
+
+def semestres_modificados(checksums, watermark):
+    """Semestres nuevos, modificados o eliminados respecto a la marca de agua."""
+    anteriores = watermark['checksums']
+    return sorted(
+        semestre for semestre in set(checksums) | set(anteriores)
+        if checksums.get(semestre) != anteriores.get(semestre)
+    )
+
+def leer_csv_existente(hasta_semestre):
+    """Genera las filas del CSV ya exportado con semestre anterior a `hasta_semestre`."""
+    with open(OUTPUT_FILE, 'r', newline='', encoding='utf-8') as f:
+        for fila in csv.DictReader(f):
+            if fila['semestre'] < hasta_semestre:
+                yield fila
 
-def calcular_alumnos_elegibles(conn, curso_id, ciclo_curso, semestre):
+def parquet_completo():
+    """True si el Parquet tiene una partición por cada semestre del CSV exportado."""
+    # Import diferido: pyarrow solo es necesario para la salida columnar
+    from dataset_parquet import semestres_escritos
+    with open(OUTPUT_FILE, 'r', newline='', encoding='utf-8') as f:
+        semestres_csv = {fila['semestre'] for fila in csv.DictReader(f)}
+    return semestres_csv <= semestres_escritos(PARQUET_DIR)
+
+def calcular_semestre_anterior(semestre):
+    """Semestre inmediatamente anterior: 2023-1 -> 2022-2, 2023-2 -> 2023-1."""
+    año, periodo = semestre.split('-')
+    if periodo == '1':
+        return f"{int(año) - 1}-2"
+    return f"{año}-1"
+
+class AlumnosPrevios:
     """
-    Estima cuántos alumnos son elegibles para tomar el curso.
-    - Si es ciclo 1: todos los alumnos de ciclo 1+
-    - Si es ciclo N: alumnos de ciclo N+ que cumplan prerrequisitos
+    Matriculados por curso en el semestre anterior, para alumnos_previos.
+    
+    Las filas llegan ordenadas por semestre, así que basta con guardar el semestre
+    en curso y el anterior (memoria acotada por el tamaño del catálogo).
     """
-    try:
-        ciclo_num = int(ciclo_curso)
-    except:
-        ciclo_num = 1
     
-    with conn.cursor() as cur:
-        # Contar alumnos en el ciclo adecuado al momento del semestre
-        cur.execute("""
-            SELECT COUNT(DISTINCT a.id)
-            FROM alumno a
-            WHERE a.ciclo_relativo >= %s
-        """, (ciclo_num,))
+    def __init__(self):
+        self.semestre = None
+        self.actual = {}
+        self.anterior = {}
+    
+    def registrar(self, codigo_curso, semestre, alumnos_matriculados):
+        """Guarda la matrícula de una sección y devuelve la del semestre anterior."""
+        if semestre != self.semestre:
+            if self.semestre == calcular_semestre_anterior(semestre):
+                self.anterior = self.actual
+            else:
+                self.anterior = {}
+            self.actual = {}
+            self.semestre = semestre
         
-        return cur.fetchone()[0]
+        # Si hay varias secciones, queda la última (mismo criterio que antes)
+        self.actual[codigo_curso] = alumnos_matriculados
+        return self.anterior.get(codigo_curso, alumnos_matriculados)
 
-def exportar_datos():
-    """Función principal que exporta los datos."""
-    print("=" * 80)
-    print("EXPORTADOR DE DATOS PARA PREDICTOR DE DEMANDA")
-    print("=" * 80)
-    print()
-    
-    # Conectar a la base de datos
-    try:
-        conn = psycopg2.connect(**DB_CONFIG)
-        print("✓ Conexión exitosa a la base de datos\n")
-    except Exception as e:
-        print(f"✗ Error al conectar: {e}")
-        return
+def calcular_filas(conn, desde_semestre, alumnos_previos_por_curso):
+    """
+    Genera las filas del CSV para los semestres >= desde_semestre (todos si es None).
     
-    # Obtener datos de cursos ofertados
-    print("📊 Extrayendo datos de cursos ofertados...")
+    Las métricas agregadas (popularidad, elegibles) se cargan una vez: las
+    consultas chicas del catálogo en un solo viaje al servidor y las masivas
+    con cursores normales (sin pasar por json_agg); las secciones se leen de
+    un cursor del lado del servidor en lotes de TAMANO_LOTE.
+    """
+    lote = LoteConsultas(conn)
+    consulta_cursos = lote.agregar(SQL_CURSOS)
+    consulta_prerrequisitos = lote.agregar(SQL_PRERREQUISITOS)
+    consulta_semestres = lote.agregar(SQL_SEMESTRES)
+    resultados = lote.ejecutar()
     
     with conn.cursor(cursor_factory=RealDictCursor) as cur:
-        # Solo cursos con matrículas completadas (no 2025-2) y con al menos 1 alumno
+        cur.execute(SQL_ALUMNOS)
+        alumnos = cur.fetchall()
+        cur.execute(SQL_APROBACIONES)
+        aprobaciones = cur.fetchall()
+    
+    # Popularidad "a la fecha": solo notas de semestres anteriores a cada sección
+    historial_popularidad = HistorialPopularidad.desde_bd(conn)
+    # Elegibles reales por curso y semestre (prerrequisitos aprobados antes del semestre)
+    indice_curricular = IndiceCurricular.desde_filas(resultados[consulta_cursos], resultados[consulta_prerrequisitos])
+    motor_elegibilidad = MotorElegibilidad.desde_filas(
+        indice_curricular, alumnos, resultados[consulta_semestres], aprobaciones
+    )
+    
+    # Solo cursos con matrículas completadas (no 2025-2) y con al menos 1 alumno.
+    # Prerrequisitos y tasa de aprobación histórica se resuelven en la misma
+    # consulta (CTEs agrupadas + ventana acumulada por curso) en lugar de
+    # una consulta por sección.
+    with conn.cursor(name='exportar_cursos_ofertados', cursor_factory=RealDictCursor) as cur:
+        cur.itersize = TAMANO_LOTE
         cur.execute("""
+            WITH prerrequisitos AS (
+                SELECT curso_id, COUNT(*) as num_prerrequisitos
+                FROM curso_prerrequisito
+                GROUP BY curso_id
+            ),
+            resultados_semestre AS (
+                SELECT 
+                    co.curso_id,
+                    co.semestre,
+                    COUNT(CASE WHEN m.estado = 'Aprobado' THEN 1 END) as aprobados,
+                    COUNT(CASE WHEN m.estado IN ('Aprobado', 'Desaprobado') THEN 1 END) as evaluados
+                FROM curso_ofertado co
+                LEFT JOIN matricula m ON co.id = m.curso_ofertado_id
+                GROUP BY co.curso_id, co.semestre
+            ),
+            tasas AS (
+                -- Acumulado de semestres estrictamente anteriores al actual
+                SELECT 
+                    curso_id,
+                    semestre,
+                    (SUM(aprobados) OVER w)::float / 
+                    NULLIF(SUM(evaluados) OVER w, 0)::float as tasa_aprobacion
+                FROM resultados_semestre
+                WINDOW w AS (PARTITION BY curso_id ORDER BY semestre
+                             ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING)
+            )
             SELECT 
                 co.id as curso_ofertado_id,
                 co.codigo_seccion,
@@ -163,119 +262,208 @@ def exportar_datos():
                 co.turno,
                 co.cupos_disponibles as cupo_maximo,
                 c.id as curso_id,
+                COALESCE(pr.num_prerrequisitos, 0) as num_prerrequisitos,
+                t.tasa_aprobacion,
                 COUNT(m.id) as alumnos_matriculados
             FROM curso_ofertado co
             JOIN curso c ON co.curso_id = c.id
             INNER JOIN matricula m ON co.id = m.curso_ofertado_id
-            WHERE co.semestre < '2025-2'  -- Solo histórico completo
+            LEFT JOIN prerrequisitos pr ON pr.curso_id = c.id
+            LEFT JOIN tasas t ON t.curso_id = c.id AND t.semestre = co.semestre
+            WHERE co.semestre < %s  -- Solo histórico completo
+            AND (%s IS NULL OR co.semestre >= %s)
             GROUP BY co.id, co.codigo_seccion, c.codigo, c.nombre, co.semestre, 
                      c.creditos, c.tipo, c.ciclo, co.profesor_id, co.turno, 
-                     co.cupos_disponibles, c.id
+                     co.cupos_disponibles, c.id, pr.num_prerrequisitos, t.tasa_aprobacion
             HAVING COUNT(m.id) > 0  -- Solo secciones con al menos 1 alumno
             ORDER BY co.semestre, c.codigo, co.codigo_seccion
-        """)
+        """, (SEMESTRE_LIMITE, desde_semestre, desde_semestre))
         
-        cursos = cur.fetchall()
+        for curso in cur:
+            # Calcular métricas
+            profesor_popularidad = historial_popularidad.popularidad(curso['profesor_id'], curso['semestre'])
+            num_prerrequisitos = curso['num_prerrequisitos']
+            tasa_aprobacion = round(curso['tasa_aprobacion'] if curso['tasa_aprobacion'] else 0.75, 2)
+            franja_horaria = calcular_franja_horaria(curso['turno'])
+            alumnos_elegibles = motor_elegibilidad.alumnos_elegibles(curso['curso_id'], curso['semestre'])
+            
+            # Obtener alumnos previos (del semestre anterior)
+            alumnos_previos = alumnos_previos_por_curso.registrar(
+                curso['codigo_curso'], curso['semestre'], curso['alumnos_matriculados']
+            )
+            
+            # Calcular variación
+            if alumnos_previos > 0:
+                variacion_matricula = round((curso['alumnos_matriculados'] - alumnos_previos) / alumnos_previos, 3)
+            else:
+                variacion_matricula = 0.0
+            
+            # Nombre de sección
+            nombre_seccion = f"{curso['codigo_curso']}-{curso['semestre']}-{curso['codigo_seccion']}"
+            
+            # Cupo máximo (si es NULL, usar el 120% de matriculados)
+            cupo_maximo = curso['cupo_maximo'] if curso['cupo_maximo'] else int(curso['alumnos_matriculados'] * 1.2)
+            
+            yield {
+                'curso_ofertado_id': curso['curso_ofertado_id'],
+                'nombre_seccion': nombre_seccion,
+                'codigo_curso': curso['codigo_curso'],
+                'semestre': curso['semestre'],
+                'creditos': curso['creditos'],
+                'tipo_curso': curso['tipo_curso'],
+                'profesor_id': curso['profesor_id'],
+                'profesor_popularidad': profesor_popularidad,
+                'alumnos_previos': alumnos_previos,
+                'variacion_matricula': variacion_matricula,
+                'num_prerrequisitos': num_prerrequisitos,
+                'tasa_aprobacion': tasa_aprobacion,
+                'franja_horaria': franja_horaria,
+                'alumnos_elegibles': alumnos_elegibles,
+                'cupo_maximo': cupo_maximo,
+                'alumnos_matriculados': curso['alumnos_matriculados']
+            }
+
+def extraer_filas(conn, desde_semestre=None, filas_previas=()):
+    """
+    Genera todas las filas del dataset en orden de semestre.
     
-    print(f"✓ Obtenidos {len(cursos)} registros de cursos ofertados\n")
+    Args:
+        conn: Conexión a la base de datos
+        desde_semestre: Primer semestre a recalcular (todos si es None)
+        filas_previas: Filas ya exportadas de semestres anteriores; se emiten tal
+            cual y alimentan alumnos_previos del primer semestre recalculado
+    """
+    alumnos_previos_por_curso = AlumnosPrevios()
     
-    # Preparar datos para CSV
-    print("🔄 Procesando datos...")
-    datos_csv = []
+    for fila in filas_previas:
+        alumnos_previos_por_curso.registrar(fila['codigo_curso'], fila['semestre'],
+                                            int(fila['alumnos_matriculados']))
+        yield fila
     
-    # Diccionario para almacenar alumnos previos por curso
-    alumnos_por_curso_semestre = defaultdict(int)
+    yield from calcular_filas(conn, desde_semestre, alumnos_previos_por_curso)
+
+class EstadisticasExportacion:
+    """Estadísticas del dataset acumuladas en línea, en la misma pasada de escritura."""
     
-    for i, curso in enumerate(cursos):
-        # Calcular métricas
-        profesor_popularidad = calcular_popularidad_profesor(conn, curso['profesor_id'])
-        num_prerrequisitos = contar_prerrequisitos(conn, curso['curso_id'])
-        tasa_aprobacion = calcular_tasa_aprobacion(conn, curso['curso_id'], curso['semestre'])
-        franja_horaria = calcular_franja_horaria(curso['turno'])
-        alumnos_elegibles = calcular_alumnos_elegibles(conn, curso['curso_id'], 
-                                                       curso['ciclo_curso'], curso['semestre'])
-        
-        # Obtener alumnos previos (del semestre anterior)
-        key_actual = f"{curso['codigo_curso']}_{curso['semestre']}"
-        
-        # Buscar semestre anterior
-        año, periodo = curso['semestre'].split('-')
-        if periodo == '1':
-            semestre_anterior = f"{int(año) - 1}-2"
-        else:
-            semestre_anterior = f"{año}-1"
-        
-        key_anterior = f"{curso['codigo_curso']}_{semestre_anterior}"
-        alumnos_previos = alumnos_por_curso_semestre.get(key_anterior, curso['alumnos_matriculados'])
-        
-        # Guardar valor actual para futuros cálculos
-        alumnos_por_curso_semestre[key_actual] = curso['alumnos_matriculados']
-        
-        # Calcular variación
-        if alumnos_previos > 0:
-            variacion_matricula = round((curso['alumnos_matriculados'] - alumnos_previos) / alumnos_previos, 3)
-        else:
-            variacion_matricula = 0.0
-        
-        # Nombre de sección
-        nombre_seccion = f"{curso['codigo_curso']}-{curso['semestre']}-{curso['codigo_seccion']}"
-        
-        # Cupo máximo (si es NULL, usar el 120% de matriculados)
-        cupo_maximo = curso['cupo_maximo'] if curso['cupo_maximo'] else int(curso['alumnos_matriculados'] * 1.2)
-        
-        datos_csv.append({
-            'curso_ofertado_id': curso['curso_ofertado_id'],
-            'nombre_seccion': nombre_seccion,
-            'codigo_curso': curso['codigo_curso'],
-            'semestre': curso['semestre'],
-            'creditos': curso['creditos'],
-            'tipo_curso': curso['tipo_curso'],
-            'profesor_id': curso['profesor_id'],
-            'profesor_popularidad': profesor_popularidad,
-            'alumnos_previos': alumnos_previos,
-            'variacion_matricula': variacion_matricula,
-            'num_prerrequisitos': num_prerrequisitos,
-            'tasa_aprobacion': tasa_aprobacion,
-            'franja_horaria': franja_horaria,
-            'alumnos_elegibles': alumnos_elegibles,
-            'cupo_maximo': cupo_maximo,
-            'alumnos_matriculados': curso['alumnos_matriculados']
-        })
-        
-        if (i + 1) % 100 == 0:
-            print(f"  Procesados {i + 1}/{len(cursos)} cursos...")
+    def __init__(self):
+        self.total_registros = 0
+        self.total_matriculas = 0
+        self.semestre_min = None
+        self.semestre_max = None
+        self.cursos = set()
+        self.profesores = set()
     
-    print(f"✓ Procesamiento completado\n")
+    def agregar(self, fila):
+        self.total_registros += 1
+        self.total_matriculas += int(fila['alumnos_matriculados'])
+        if self.semestre_min is None or fila['semestre'] < self.semestre_min:
+            self.semestre_min = fila['semestre']
+        if self.semestre_max is None or fila['semestre'] > self.semestre_max:
+            self.semestre_max = fila['semestre']
+        self.cursos.add(fila['codigo_curso'])
+        self.profesores.add(str(fila['profesor_id']))
     
-    # Escribir CSV
+    def imprimir(self):
+        print("📈 Estadísticas de los datos exportados:")
+        if self.total_registros == 0:
+            print("   • Sin registros")
+            return
+        print(f"   • Semestres: {self.semestre_min} a {self.semestre_max}")
+        print(f"   • Cursos únicos: {len(self.cursos)}")
+        print(f"   • Profesores: {len(self.profesores)}")
+        print(f"   • Total matrículas: {self.total_matriculas:,}")
+        print(f"   • Promedio por curso: {self.total_matriculas / self.total_registros:.1f}")
+
+def escribir_csv(filas, estadisticas, escritor_parquet=None):
+    """
+    Escribe el CSV fila a fila a medida que se generan.
+    
+    Se escribe en un archivo temporal que reemplaza al final al CSV anterior,
+    porque en modo incremental las filas conservadas se leen de ese mismo CSV.
+    """
     print(f"💾 Escribiendo archivo: {OUTPUT_FILE}")
     
     # Crear directorio si no existe
     os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
     
-    with open(OUTPUT_FILE, 'w', newline='', encoding='utf-8') as f:
-        fieldnames = [
-            'curso_ofertado_id', 'nombre_seccion', 'codigo_curso', 'semestre',
-            'creditos', 'tipo_curso', 'profesor_id', 'profesor_popularidad',
-            'alumnos_previos', 'variacion_matricula', 'num_prerrequisitos',
-            'tasa_aprobacion', 'franja_horaria', 'alumnos_elegibles',
-            'cupo_maximo', 'alumnos_matriculados'
-        ]
-        
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
+    temporal = OUTPUT_FILE + '.tmp'
+    with open(temporal, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
         writer.writeheader()
-        writer.writerows(datos_csv)
+        
+        for fila in filas:
+            writer.writerow(fila)
+            estadisticas.agregar(fila)
+            if escritor_parquet is not None:
+                escritor_parquet.agregar(fila)
+            
+            if estadisticas.total_registros % 1000 == 0:
+                print(f"  Procesados {estadisticas.total_registros} cursos...")
+    
+    os.replace(temporal, OUTPUT_FILE)
     
     print(f"✓ Archivo generado exitosamente")
-    print(f"✓ Total de registros: {len(datos_csv)}\n")
+    print(f"✓ Total de registros: {estadisticas.total_registros}\n")
+
+def exportar_datos(incremental=False, parquet=False):
+    """Función principal que exporta los datos."""
+    print("=" * 80)
+    print("EXPORTADOR DE DATOS PARA PREDICTOR DE DEMANDA")
+    print("=" * 80)
+    print()
+    
+    # Conectar a la base de datos
+    try:
+        conn = conectar()
+        print("✓ Conexión exitosa a la base de datos\n")
+    except Exception as e:
+        print(f"✗ Error al conectar: {e}")
+        return
+    
+    desde_semestre = None
+    filas_previas = ()
+    checksums = None
+    
+    if incremental:
+        checksums = calcular_checksums(conn)
+        watermark = cargar_watermark()
+        
+        if watermark is None:
+            print("⚠️  Sin marca de agua previa: se realiza la exportación completa\n")
+        elif parquet and not parquet_completo():
+            print(f"⚠️  Faltan particiones en {PARQUET_DIR}: se realiza la exportación completa\n")
+        else:
+            modificados = semestres_modificados(checksums, watermark)
+            if not modificados:
+                print(f"✓ Sin cambios desde la última exportación (hasta {watermark['ultimo_semestre']})")
+                conn.close()
+                return
+            
+            # Las métricas dependen de semestres anteriores: se recalcula desde el primer cambio
+            desde_semestre = modificados[0]
+            filas_previas = leer_csv_existente(desde_semestre)
+            print(f"🔁 Semestres modificados: {', '.join(modificados)}")
+            print(f"   Recalculando desde {desde_semestre} (se conservan los semestres anteriores)\n")
+    
+    escritor_parquet = None
+    if parquet:
+        # Import diferido: pyarrow solo es necesario para la salida columnar
+        from dataset_parquet import EscritorParquet
+        escritor_parquet = EscritorParquet(PARQUET_DIR, desde_semestre)
+    
+    # Extraer, calcular y escribir en una sola pasada
+    print("📊 Extrayendo y procesando cursos ofertados...")
+    estadisticas = EstadisticasExportacion()
+    escribir_csv(extraer_filas(conn, desde_semestre, filas_previas), estadisticas, escritor_parquet)
+    
+    if escritor_parquet is not None:
+        particiones = escritor_parquet.cerrar()
+        print(f"✓ Parquet actualizado: {particiones} particiones en {PARQUET_DIR}\n")
+    if incremental:
+        guardar_watermark(checksums)
+        print(f"✓ Marca de agua actualizada: {WATERMARK_FILE}\n")
     
-    # Estadísticas
-    print("📈 Estadísticas de los datos exportados:")
-    print(f"   • Semestres: {min(d['semestre'] for d in datos_csv)} a {max(d['semestre'] for d in datos_csv)}")
-    print(f"   • Cursos únicos: {len(set(d['codigo_curso'] for d in datos_csv))}")
-    print(f"   • Profesores: {len(set(d['profesor_id'] for d in datos_csv))}")
-    print(f"   • Total matrículas: {sum(d['alumnos_matriculados'] for d in datos_csv):,}")
-    print(f"   • Promedio por curso: {sum(d['alumnos_matriculados'] for d in datos_csv) / len(datos_csv):.1f}")
+    estadisticas.imprimir()
     
     conn.close()
     
@@ -288,4 +476,10 @@ def exportar_datos():
     print("=" * 80)
 
 if __name__ == "__main__":
-    exportar_datos()
+    parser = argparse.ArgumentParser(description="Exporta el dataset del predictor de demanda")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Recalcular solo los semestres modificados desde la última exportación")
+    parser.add_argument('--parquet', action='store_true',
+                        help="Escribir también Parquet particionado por semestre (requiere pyarrow)")
+    args = parser.parse_args()
+    exportar_datos(incremental=args.incremental, parquet=args.parquet)
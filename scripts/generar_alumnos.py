@@ -53,6 +53,21 @@ MODALIDADES = {
     }
 }
 
+# Dígito de modalidad (quinto carácter) de los códigos de generar_alumnos_masivo
+# según (modalidad, periodo de ingreso). semestre_de_ingreso (elegibilidad.py)
+# lee el periodo de este mismo dígito con PERIODO_POR_DIGITO: 0/1 = marzo
+# (semestre 1) y 2/4 = agosto (semestre 2) como en los códigos existentes, y
+# 3/5/6 para las combinaciones que esos códigos no tenían.
+DIGITOS_INGRESO = {
+    ('ordinario', '1'): '0',
+    ('ordinario', '2'): '3',
+    ('cepre', '1'): '5',
+    ('cepre', '2'): '2',
+    ('top2', '1'): '6',
+    ('top2', '2'): '4',
+}
+PERIODO_POR_DIGITO = {'1': '1', **{digito: periodo for (_, periodo), digito in DIGITOS_INGRESO.items()}}
+
 # Letras para código (A-Z)
 LETRAS = list('ABCDEFGHIJKLMNOPQRSTUVWXYZ')
 
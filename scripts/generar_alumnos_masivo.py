@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Generador masivo de alumnos ficticios para pruebas de carga.
+
+A diferencia de generar_alumnos.py (30 alumnos por semestre, letra aleatoria
+y reintentos contra un set de códigos usados), los códigos se asignan de
+forma determinista y sin reintentos:
+
+    YYYY + dígito de modalidad + secuencia (6 dígitos) + letra de control
+
+- Dígito de modalidad según modalidad y periodo de ingreso
+  (generar_alumnos.DIGITOS_INGRESO): Ordinario 0/3, CEPRE 5/2, Top 2 6/4
+  para el semestre 1/2; semestre_de_ingreso lee el periodo de la misma tabla
+- La secuencia es un contador por (año, dígito): nunca se repite un código,
+  y hay hasta 999999 alumnos por año y dígito
+- La letra de control se calcula a partir de año, dígito y secuencia
+- Los códigos tienen 12 caracteres (alumno.codigo es varchar(12)), así que
+  no chocan con los códigos de 9 caracteres de generar_alumnos.py
+
+Nombres y apellidos se sortean con NumPy por lotes, y las filas se escriben
+como CSV para COPY a medida que se generan (o se cargan directamente con
+COPY binario usando carga_binaria), sin armar la lista completa en memoria.
+
+Uso:
+    python generar_alumnos_masivo.py [--por-semestre N] [--semilla S]
+                                     [--gzip] [--copy]
+
+Por defecto genera 30 alumnos por semestre (18 Ordinario, 9 CEPRE, 3 Top 2,
+en la misma proporción para cualquier N) en generar_alumnos_masivo.csv.
+Con --copy los alumnos se agregan a la tabla alumno con COPY binario.
+"""
+
+import argparse
+import csv
+import gzip
+import sys
+import time
+
+import numpy as np
+
+from generar_alumnos import SEMESTRES, MODALIDADES, DIGITOS_INGRESO, LETRAS, NOMBRES, APELLIDOS
+
+COLUMNAS_ALUMNO = ('codigo', 'nombres', 'apellidos', 'ciclo_relativo', 'creditos_aprobados', 'promedio', 'estado')
+
+SECUENCIA_MAX = 999_999
+
+# Filas que se sortean y escriben de una vez
+TAMANO_LOTE = 100_000
+
+def digito_modalidad(modalidad, periodo):
+    """Dígito de modalidad del código para la modalidad y el periodo ('1'/'2') de ingreso."""
+    return DIGITOS_INGRESO[(modalidad, periodo)]
+
+def letra_control(año, digito, secuencia):
+    """Letra final del código, determinada por año, dígito y secuencia."""
+    return LETRAS[(año * 31 + int(digito) * 7 + secuencia) % len(LETRAS)]
+
+def codigo_alumno(año, digito, secuencia):
+    """
+    Código de 12 caracteres: YYYY + dígito + secuencia (6 dígitos) + letra.
+
+    Returns:
+        Código de alumno (ej: '20222000042K')
+    """
+    return f"{año}{digito}{secuencia:06d}{letra_control(año, digito, secuencia)}"
+
+def reparto_por_modalidad(por_semestre):
+    """
+    Alumnos de cada modalidad en un semestre, en la proporción de MODALIDADES
+    (18/9/3 sobre 30). El resto del redondeo va a Ordinario.
+    """
+    total_base = sum(config['cantidad'] for config in MODALIDADES.values())
+    reparto = {
+        modalidad: por_semestre * config['cantidad'] // total_base
+        for modalidad, config in MODALIDADES.items()
+    }
+    reparto['ordinario'] += por_semestre - sum(reparto.values())
+    return reparto
+
+def asignar_codigos(semestres, por_semestre):
+    """
+    Rangos de secuencia de cada (semestre, modalidad).
+
+    Las secuencias se asignan con un contador por (año, dígito), así que los
+    códigos son únicos por construcción.
+
+    Returns:
+        Lista de (semestre, año, digito, primera_secuencia, cantidad)
+
+    Raises:
+        ValueError: si algún (año, dígito) supera SECUENCIA_MAX alumnos
+    """
+    reparto = reparto_por_modalidad(por_semestre)
+    siguiente = {}
+    rangos = []
+    for semestre in semestres:
+        año, periodo = semestre.split('-')
+        año = int(año)
+        for modalidad, cantidad in reparto.items():
+            if cantidad == 0:
+                continue
+            digito = digito_modalidad(modalidad, periodo)
+            inicio = siguiente.get((año, digito), 1)
+            if inicio + cantidad - 1 > SECUENCIA_MAX:
+                raise ValueError(
+                    f"Más de {SECUENCIA_MAX} alumnos con año={año} y dígito={digito}: "
+                    f"reducir --por-semestre"
+                )
+            siguiente[(año, digito)] = inicio + cantidad
+            rangos.append((semestre, año, digito, inicio, cantidad))
+    return rangos
+
+_NOMBRES = np.array(NOMBRES, dtype=object)
+_APELLIDOS = np.array(APELLIDOS, dtype=object)
+
+def sortear_nombres(rng, n):
+    """Sortea n nombres y n pares de apellidos con un Generator de NumPy."""
+    nombres = _NOMBRES[rng.integers(len(NOMBRES), size=n)]
+    apellidos = _APELLIDOS[rng.integers(len(APELLIDOS), size=n)] + ' ' + \
+        _APELLIDOS[rng.integers(len(APELLIDOS), size=n)]
+    return nombres, apellidos
+
+def generar_alumnos(semestres, por_semestre, semilla=None):
+    """
+    Genera los alumnos como tuplas en el orden de COLUMNAS_ALUMNO (flujo).
+
+    Nombres y apellidos se sortean con NumPy en lotes de TAMANO_LOTE.
+    """
+    rng = np.random.default_rng(semilla)
+
+    for _, año, digito, inicio, cantidad in asignar_codigos(semestres, por_semestre):
+        for desde in range(inicio, inicio + cantidad, TAMANO_LOTE):
+            hasta = min(desde + TAMANO_LOTE, inicio + cantidad)
+            lote_nombres, lote_apellidos = sortear_nombres(rng, hasta - desde)
+            for secuencia, nombre, apellido in zip(range(desde, hasta), lote_nombres, lote_apellidos):
+                yield (codigo_alumno(año, digito, secuencia), nombre, apellido, 1, 0, 0.00, 'A')
+
+def generar_csv_copy(alumnos, output_file, comprimir=False):
+    """
+    Escribe los alumnos en un CSV con cabecera para COPY alumno (...) FROM ... CSV HEADER.
+
+    Returns:
+        Número de alumnos escritos
+    """
+    abrir = gzip.open if comprimir else open
+    total = 0
+    with abrir(output_file, 'wt', encoding='utf-8', newline='') as f:
+        escritor = csv.writer(f)
+        escritor.writerow(COLUMNAS_ALUMNO)
+        for alumno in alumnos:
+            escritor.writerow(alumno)
+            total += 1
+    return total
+
+def cargar_alumnos(conn, alumnos):
+    """
+    Agrega los alumnos a la tabla alumno con COPY binario (sin borrar los existentes).
+
+    Returns:
+        (filas, segundos) de la carga por COPY
+    """
+    from carga_binaria import FlujoCopyBinario, obtener_codificadores
+
+    try:
+        with conn.cursor() as cur:
+            codificadores = obtener_codificadores(conn, 'alumno', COLUMNAS_ALUMNO)
+            filas = (dict(zip(COLUMNAS_ALUMNO, alumno)) for alumno in alumnos)
+            flujo = FlujoCopyBinario(filas, COLUMNAS_ALUMNO, codificadores)
+
+            inicio = time.perf_counter()
+            cur.copy_expert(
+                f"COPY alumno ({', '.join(COLUMNAS_ALUMNO)}) FROM STDIN WITH (FORMAT binary)",
+                flujo,
+                size=1 << 16
+            )
+            segundos = time.perf_counter() - inicio
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    return flujo.filas_escritas, segundos
+
+def main():
+    """Función principal."""
+    parser = argparse.ArgumentParser(description="Genera alumnos ficticios en volumen para pruebas de carga")
+    parser.add_argument('--por-semestre', type=int, default=30,
+                        help="Alumnos por semestre de ingreso (por defecto 30)")
+    parser.add_argument('--semilla', type=int, default=None,
+                        help="Semilla para el sorteo de nombres y apellidos")
+    parser.add_argument('--gzip', action='store_true',
+                        help="Comprimir el CSV generado con gzip")
+    parser.add_argument('--copy', action='store_true',
+                        help="Cargar los alumnos en la BD con COPY binario en lugar de generar el CSV")
+    args = parser.parse_args()
+
+    total_esperado = args.por_semestre * len(SEMESTRES)
+
+    print("=" * 80)
+    print("GENERADOR MASIVO DE ALUMNOS FICTICIOS - TELECOMUNICACIONES")
+    print("=" * 80)
+    print()
+    print(f"Semestres: {SEMESTRES[0]} a {SEMESTRES[-1]} ({len(SEMESTRES)})")
+    print(f"Distribución por semestre:")
+    for modalidad, cantidad in reparto_por_modalidad(args.por_semestre).items():
+        print(f"  - {modalidad.capitalize()}: {cantidad} alumnos")
+    print(f"  - Total general: {total_esperado:,} alumnos")
+    print()
+
+    try:
+        asignar_codigos(SEMESTRES, args.por_semestre)
+    except ValueError as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+
+    alumnos = generar_alumnos(SEMESTRES, args.por_semestre, args.semilla)
+
+    if args.copy:
+        import psycopg2
+        from acceso_datos import conectar, describir
+
+        try:
+            conn = conectar()
+            print(f"✓ Conexión exitosa a la base de datos ({describir()})")
+        except Exception as e:
+            print(f"✗ Error al conectar a la base de datos: {e}")
+            sys.exit(1)
+
+        try:
+            print("\n📥 Generando y cargando alumnos con COPY binario...")
+            filas, segundos = cargar_alumnos(conn, alumnos)
+            print(f"✓ {filas:,} alumnos cargados en {segundos:.2f}s "
+                  f"({filas / max(segundos, 1e-9):,.0f} filas/s)")
+        except psycopg2.IntegrityError as e:
+            print(f"✗ Ya existen alumnos con estos códigos (¿se cargaron antes?): {e.pgerror.splitlines()[0]}")
+            sys.exit(1)
+        finally:
+            conn.close()
+        return
+
+    output_file = 'generar_alumnos_masivo.csv' + ('.gz' if args.gzip else '')
+    inicio = time.perf_counter()
+    total = generar_csv_copy(alumnos, output_file, comprimir=args.gzip)
+    segundos = time.perf_counter() - inicio
+
+    print(f"✓ {total:,} alumnos escritos en {segundos:.2f}s")
+    print(f"📄 Archivo generado: {output_file}")
+    print()
+    print("Siguiente paso:")
+    print("  Cargar el CSV con COPY:")
+    origen = f"PROGRAM 'gzip -dc {output_file}'" if args.gzip else f"'{output_file}'"
+    print(f"  \\copy alumno ({', '.join(COLUMNAS_ALUMNO)}) FROM {origen} WITH (FORMAT csv, HEADER)")
+    print("=" * 80)
+
+if __name__ == '__main__':
+    main()
@@ -14,25 +14,83 @@ Reglas:
 - Respetar orden de ciclos (electivos desde ciclo 6)
 - Alumnos tardan 11-12 ciclos en egresar
 - 2025-2: matrículas sin nota final
+
+Uso:
+    python generar_matriculas.py [--popularidad-historica] [--vectorizado] [--semilla N]
+                                 [--procesos N] [--alumno CODIGO] [--copy]
+                                 [--formato sql|csv] [--bloque N] [--gzip]
+                                 [--incremental [SEMESTRE]] [--estado ARCHIVO]
+                                 [--historial] [--validar]
+
+Con --popularidad-historica, la nota de cada sección usa la popularidad del
+profesor calculada con las matrículas ya cargadas de semestres anteriores
+(ver popularidad_profesor.py) en lugar de profesor.popularidad. Solo se usa
+con --incremental: sin él la carga reemplaza esas mismas matrículas.
+
+Con --vectorizado la simulación se hace con el motor por lotes de
+simulacion_vectorizada.py (NumPy): todos los alumnos avanzan un semestre a la
+vez. Genera datos estadísticamente equivalentes y escala a 100k+ alumnos.
+
+Con --procesos N los alumnos se reparten en un pool de N procesos (0 = todos
+los núcleos). Cada alumno y semestre usa su propio flujo aleatorio derivado de
+(semilla, alumno_id, semestre), así que para una misma --semilla el SQL
+generado es idéntico byte a byte con cualquier número de procesos.
+Con --alumno CODIGO se regenera e imprime solo el historial de ese alumno
+(el mismo que produce la generación completa con esa semilla).
+
+Con --copy las matrículas no se escriben en generar_matriculas.sql sino que se
+cargan directamente en la tabla matricula con COPY binario (carga_binaria.py),
+incluido el TRUNCATE y el reset de créditos, en una sola transacción.
+
+Las matrículas se generan como flujo y se escriben a medida que se producen,
+sin acumularlas: --formato sql escribe bloques INSERT de --bloque filas y
+--formato csv un CSV para COPY; --gzip comprime la salida (.gz).
+
+Con --incremental [SEMESTRE] no se regenera la historia: se lee el estado
+actual de cada alumno (créditos, ciclo_relativo, cursos aprobados y cursos en
+curso) de la BD, o de un snapshot JSON con --estado, se simula solo SEMESTRE
+(por defecto el siguiente de SEMESTRES_DISPONIBLES sin matrículas) y se
+agregan solo esas filas, sin TRUNCATE. El semestre simulado queda como semestre
+en curso (sin nota) y las matrículas que estaban en curso reciben su nota en
+la misma carga. Con --estado el snapshot se actualiza al terminar, para
+encadenar semestres sin volver a consultar la BD.
+
+Con --historial el generador calcula además lo que producirían los triggers
+por sentencia al cargar las matrículas semestre a semestre (un log_creditos
+por alumno y semestre en que aprobó créditos, un log_ciclo_relativo por alumno
+y semestre en que cambió su ciclo) y los créditos, ciclo relativo y promedio
+finales de cada alumno, y los carga junto con las matrículas con los triggers
+de usuario de matricula y alumno desactivados. Con --historial-resumido se
+escribe en cambio un solo cambio por alumno (0 -> total), como al cargar toda
+la historia en una sola sentencia. No hace falta correr
+recalcular_promedios.py después. Con --formato csv se escriben un CSV por
+tabla y generar_matriculas_carga.sql para cargarlos con psql.
+
+Con --validar las matrículas se validan en memoria mientras se generan
+(validar_matriculas.py: duplicados, prerrequisitos, notas, créditos, ...) y,
+si alguna invariante falla, el COPY se revierte o el archivo se descarta.
 """
 
 import os
 import sys
-import psycopg2
+import argparse
+import csv
+import gzip
+import io
+from concurrent.futures import ProcessPoolExecutor
 from psycopg2.extras import RealDictCursor
 import random
 from datetime import datetime, date
-from collections import defaultdict
+from collections import defaultdict, deque
 import json
+from array import array
+from decimal import Decimal, ROUND_HALF_UP
 
-# Configuración de conexión a la base de datos
-DB_CONFIG = {
-    'host': '172.232.188.183',
-    'port': 5435,
-    'database': 'schedule_db',
-    'user': 'admin',
-    'password': 'admin123'
-}
+from acceso_datos import conectar, describir
+from elegibilidad import semestre_de_ingreso
+from indice_curricular import IndiceCurricular
+from modelos import Alumno, Curso, CursoOfertado, Matricula, codificar_fecha, decodificar_fecha
+from popularidad_profesor import HistorialPopularidad
 
 # Semestres disponibles en la base de datos
 SEMESTRES_DISPONIBLES = [
@@ -42,13 +100,25 @@ SEMESTRES_DISPONIBLES = [
     "2025-1", "2025-2"
 ]
 
+# Semestre en curso: matrículas sin nota final
+SEMESTRE_EN_CURSO = "2025-2"
+
 # Configuración de simulación
 CURSOS_POR_SEMESTRE_MIN = 5
 CURSOS_POR_SEMESTRE_MAX = 7
 TASA_APROBACION_BASE = 0.80
-CICLOS_PARA_EGRESAR = random.randint(11, 12)  # 11-12 ciclos
+CICLOS_PARA_EGRESAR = (11, 12)  # 11-12 ciclos
 NOTA_APROBATORIA = 10.0
 
+# Filas por sentencia INSERT en el archivo SQL generado
+TAMANO_BLOQUE_INSERT = 1000
+
+# Generación en paralelo (--procesos): alumnos por lote y lotes enviados por proceso
+ALUMNOS_POR_LOTE_MAX = 500
+LOTES_EN_VUELO_POR_PROCESO = 2
+
+COLUMNAS_MATRICULA = ('alumno_id', 'curso_ofertado_id', 'fecha_matricula', 'nota_final', 'estado')
+
 # Rangos de créditos por ciclo relativo
 CREDITOS_POR_CICLO = {
     1: (0, 21),    # Hasta 21 créditos = ciclo 1
@@ -67,8 +137,8 @@ CREDITOS_POR_CICLO = {
 def conectar_db():
     """Establece conexión con la base de datos."""
     try:
-        conn = psycopg2.connect(**DB_CONFIG)
-        print("✓ Conexión exitosa a la base de datos")
+        conn = conectar()
+        print(f"✓ Conexión exitosa a la base de datos ({describir()})")
         return conn
     except Exception as e:
         print(f"✗ Error al conectar a la base de datos: {e}")
@@ -83,7 +153,7 @@ def obtener_alumnos(conn):
             FROM alumno
             ORDER BY codigo
         """)
-        alumnos = cur.fetchall()
+        alumnos = [Alumno.desde_fila(fila) for fila in cur]
         print(f"✓ Obtenidos {len(alumnos)} alumnos")
         return alumnos
 
@@ -95,7 +165,7 @@ def obtener_cursos(conn):
             FROM curso
             ORDER BY ciclo, codigo
         """)
-        cursos = cur.fetchall()
+        cursos = [Curso.desde_fila(fila) for fila in cur]
         print(f"✓ Obtenidos {len(cursos)} cursos")
         return cursos
 
@@ -116,8 +186,18 @@ def obtener_prerrequisitos(conn):
         print(f"✓ Obtenidos prerrequisitos para {len(prereqs)} cursos")
         return dict(prereqs)
 
-def obtener_cursos_ofertados(conn):
-    """Obtiene los cursos ofertados por semestre."""
+def obtener_cursos_ofertados(conn, historial_popularidad=None):
+    """
+    Obtiene los cursos ofertados por semestre, indexados para filtrar candidatos:
+    
+        semestre -> ciclo (int, 0 si no es numérico) -> tipo -> curso_id -> [secciones]
+    
+    Cada sección lleva 'ciclo_num' (ciclo ya convertido a entero) y 'orden' (su
+    posición en la consulta), para que los filtros no recorran toda la oferta.
+    
+    Si se pasa un HistorialPopularidad, la popularidad de cada sección es la del
+    profesor "a la fecha" del semestre (con profesor.popularidad como respaldo).
+    """
     with conn.cursor(cursor_factory=RealDictCursor) as cur:
         cur.execute("""
             SELECT co.id, co.curso_id, co.profesor_id, co.semestre, 
@@ -130,17 +210,44 @@ def obtener_cursos_ofertados(conn):
             LEFT JOIN profesor p ON co.profesor_id = p.id
             ORDER BY co.semestre, c.ciclo, c.codigo
         """)
-        cursos_ofertados = cur.fetchall()
+        cursos_ofertados = [CursoOfertado(**fila, orden=orden) for orden, fila in enumerate(cur)]
         
-        # Organizar por semestre
-        ofertados_por_semestre = defaultdict(list)
-        for co in cursos_ofertados:
-            ofertados_por_semestre[co['semestre']].append(co)
+        if historial_popularidad is not None:
+            for co in cursos_ofertados:
+                co.popularidad = historial_popularidad.popularidad(
+                    co.profesor_id, co.semestre, por_defecto=co.popularidad
+                )
         
         print(f"✓ Obtenidos {len(cursos_ofertados)} cursos ofertados")
-        return dict(ofertados_por_semestre)
+        return indexar_cursos_ofertados(cursos_ofertados)
+
+def indexar_cursos_ofertados(cursos_ofertados):
+    """Organiza secciones CursoOfertado por semestre -> ciclo -> tipo -> curso."""
+    ofertados_por_semestre = {}
+    for co in cursos_ofertados:
+        por_ciclo = ofertados_por_semestre.setdefault(co.semestre, {})
+        por_tipo = por_ciclo.setdefault(co.ciclo_num, {})
+        por_curso = por_tipo.setdefault(co.tipo, {})
+        por_curso.setdefault(co.curso_id, []).append(co)
+    return ofertados_por_semestre
+
+def secciones_ofertadas(cursos_ofertados_por_semestre):
+    """Recorre todas las secciones CursoOfertado del índice por semestre."""
+    for por_ciclo in cursos_ofertados_por_semestre.values():
+        for por_tipo in por_ciclo.values():
+            for por_curso in por_tipo.values():
+                for secciones in por_curso.values():
+                    yield from secciones
+
+def flujo_aleatorio(semilla, alumno_id, etiqueta):
+    """
+    Generador aleatorio propio de (semilla, alumno, semestre/etiqueta).
+    El mismo triple produce siempre la misma secuencia, en cualquier proceso
+    y sin importar el orden en que se procesen los alumnos.
+    """
+    return random.Random(f"{semilla}:{alumno_id}:{etiqueta}")
 
-def calcular_creditos_iniciales(año_ingreso, semestre_inicio="2020-2"):
+def calcular_creditos_iniciales(año_ingreso, semestre_inicio="2020-2", rng=random):
     """
     Calcula los créditos aprobados iniciales para alumnos que ingresaron antes de 2020-2.
     Esto representa los cursos que ya aprobaron antes de nuestros registros.
@@ -162,7 +269,7 @@ def calcular_creditos_iniciales(año_ingreso, semestre_inicio="2020-2"):
     # Estimar créditos: ~22 créditos por semestre (considerando tasa de aprobación)
     # Con variación aleatoria ±15%
     creditos_teoricos = semestres_cursados * 22
-    variacion = random.uniform(0.85, 1.15)
+    variacion = rng.uniform(0.85, 1.15)
     creditos = int(creditos_teoricos * variacion)
     
     # No puede exceder 206 créditos (máximo antes de egresar)
@@ -181,58 +288,75 @@ def determinar_ciclo_relativo(creditos):
     
     return 1  # Por defecto
 
-def verificar_prerrequisitos_cumplidos(curso_id, cursos_aprobados, prerrequisitos):
-    """Verifica si un alumno ha aprobado todos los prerrequisitos de un curso."""
-    if curso_id not in prerrequisitos:
-        return True  # No tiene prerrequisitos
-    
-    prereqs_requeridos = prerrequisitos[curso_id]
-    return all(prereq_id in cursos_aprobados for prereq_id in prereqs_requeridos)
+def sql_ciclo_por_creditos(columna):
+    """Expresión SQL (CASE) equivalente a determinar_ciclo_relativo sobre `columna`."""
+    casos = [f"WHEN {columna} >= {CREDITOS_POR_CICLO['egresado']} THEN 11"]
+    for ciclo, rango in CREDITOS_POR_CICLO.items():
+        if isinstance(ciclo, int):
+            casos.append(f"WHEN {columna} BETWEEN {rango[0]} AND {rango[1]} THEN {ciclo}")
+    return "CASE " + " ".join(casos) + " ELSE 1 END"
+
+def verificar_prerrequisitos_cumplidos(curso_id, mascara_aprobados, indice_curricular):
+    """
+    Verifica si un alumno ha aprobado todos los prerrequisitos de un curso.
+    Los aprobados son una máscara de bits del IndiceCurricular (un AND + comparación).
+    """
+    return indice_curricular.cumple_prerrequisitos(curso_id, mascara_aprobados)
 
-def filtrar_cursos_disponibles(cursos_ofertados, ciclo_alumno, cursos_aprobados, 
-                                cursos_matriculados_semestre, prerrequisitos):
+def filtrar_cursos_disponibles(oferta_semestre, ciclo_alumno, mascara_aprobados, 
+                                cursos_matriculados_semestre, indice_curricular):
     """
     Filtra los cursos que un alumno puede tomar en un semestre.
-    - Ciclos 1-5: solo cursos de su ciclo
-    - Ciclos 6+: cursos de su ciclo + electivos
+    - Ciclos 1-5: solo cursos de su ciclo o anteriores
+    - Ciclos 6+: cursos de su ciclo o anteriores + electivos
+    
+    Recorre solo los ciclos/tipos relevantes del índice de oferta del semestre
+    (ver obtener_cursos_ofertados) y toma una sección por curso.
+    
+    Returns:
+        (obligatorios_ciclo, otros): obligatorios del ciclo del alumno y el resto
+        de cursos disponibles, ambos en el orden de la oferta
     """
-    disponibles = []
+    obligatorios_ciclo = []
+    otros = []
     
-    for curso in cursos_ofertados:
-        curso_id = curso['curso_id']
-        ciclo_curso = curso['ciclo']
-        tipo_curso = curso['tipo']
-        
-        # Ya aprobó este curso
-        if curso_id in cursos_aprobados:
-            continue
-        
-        # Ya está matriculado en este curso este semestre
-        if curso_id in cursos_matriculados_semestre:
-            continue
-        
-        # Verificar prerrequisitos
-        if not verificar_prerrequisitos_cumplidos(curso_id, cursos_aprobados, prerrequisitos):
+    for ciclo_curso, por_tipo in oferta_semestre.items():
+        # Antes del ciclo 6: cursos de su ciclo o ciclos anteriores
+        # Ciclo 6+: cursos de su ciclo o anteriores, o electivos de cualquier ciclo
+        if ciclo_curso <= ciclo_alumno and (ciclo_curso > 0 or ciclo_alumno >= 6):
+            tipos = por_tipo.items()
+        elif ciclo_alumno >= 6 and 'E' in por_tipo:
+            tipos = [('E', por_tipo['E'])]
+        else:
             continue
         
-        # Filtrar por ciclo
-        try:
-            ciclo_curso_num = int(ciclo_curso) if ciclo_curso.isdigit() else 0
-        except:
-            ciclo_curso_num = 0
-        
-        # Antes del ciclo 6: puede tomar cursos de su ciclo o ciclos anteriores
-        if ciclo_alumno < 6:
-            if ciclo_curso_num <= ciclo_alumno and ciclo_curso_num > 0:
-                disponibles.append(curso)
-        else:
-            # Ciclo 6+: puede tomar cursos de su ciclo o anteriores, o electivos
-            if ciclo_curso_num <= ciclo_alumno or tipo_curso == 'E':
-                disponibles.append(curso)
+        for tipo_curso, por_curso in tipos:
+            if tipo_curso == 'O' and ciclo_curso == ciclo_alumno:
+                destino = obligatorios_ciclo
+            else:
+                destino = otros
+            
+            for curso_id, secciones in por_curso.items():
+                # Ya aprobó este curso
+                if indice_curricular.aprobado(curso_id, mascara_aprobados):
+                    continue
+                
+                # Ya está matriculado en este curso este semestre
+                if curso_id in cursos_matriculados_semestre:
+                    continue
+                
+                # Verificar prerrequisitos
+                if not verificar_prerrequisitos_cumplidos(curso_id, mascara_aprobados, indice_curricular):
+                    continue
+                
+                # Una sola sección por curso (la primera ofertada)
+                destino.append(secciones[0])
     
-    return disponibles
+    obligatorios_ciclo.sort(key=lambda curso: curso['orden'])
+    otros.sort(key=lambda curso: curso['orden'])
+    return obligatorios_ciclo, otros
 
-def generar_nota(popularidad_profesor):
+def generar_nota(popularidad_profesor, rng=random):
     """
     Genera una nota realista según la popularidad del profesor.
     - Popularidad alta: mejor distribución de notas
@@ -247,33 +371,149 @@ def generar_nota(popularidad_profesor):
     probabilidad_aprobar = TASA_APROBACION_BASE + (popularidad_profesor - 0.5) * 0.2
     probabilidad_aprobar = max(0.6, min(0.95, probabilidad_aprobar))
     
-    if random.random() < probabilidad_aprobar:
+    if rng.random() < probabilidad_aprobar:
         # Aprobado: nota entre 10 y 16, mayoría entre 10-12
-        if random.random() < 0.7:
-            nota = random.uniform(10.0, 12.5)
+        if rng.random() < 0.7:
+            nota = rng.uniform(10.0, 12.5)
         else:
-            nota = random.uniform(12.5, 16.0)
+            nota = rng.uniform(12.5, 16.0)
     else:
         # Desaprobado: nota entre 7 y 9.9
-        nota = random.uniform(7.0, 9.9)
+        nota = rng.uniform(7.0, 9.9)
     
     return round(nota, 2)
 
-def generar_matriculas_alumno(alumno, cursos_ofertados_por_semestre, prerrequisitos, todos_cursos, conn):
+class EstadoAlumno:
+    """Estado de un alumno entre semestres."""
+    
+    __slots__ = ('creditos', 'ciclo', 'mascara_aprobados', 'en_curso')
+    
+    def __init__(self, creditos=0, ciclo=1, mascara_aprobados=0, en_curso=()):
+        self.creditos = creditos
+        self.ciclo = ciclo
+        self.mascara_aprobados = mascara_aprobados  # Máscara de bits del IndiceCurricular
+        self.en_curso = dict(en_curso)  # curso_id -> curso_ofertado_id matriculados sin nota
+
+def simular_semestre_alumno(alumno_id, semestre, oferta_semestre, estado, indice_curricular, rng=random,
+                            semestre_en_curso=SEMESTRE_EN_CURSO):
+    """
+    Simula la matrícula de un alumno en un semestre y actualiza su estado
+    (créditos, cursos aprobados y ciclo relativo). Si `semestre` es
+    `semestre_en_curso` las matrículas quedan sin nota.
+    
+    Returns:
+        Lista de Matricula del semestre (vacía si no pudo matricularse)
+    """
+    # Filtrar cursos que puede tomar (una sección por curso), ya separados:
+    # PRIORIZACIÓN de los obligatorios del ciclo actual
+    cursos_matriculados_semestre = set(estado.en_curso)
+    # Lo matriculado sin nota solo bloquea esos cursos en el semestre siguiente
+    estado.en_curso = {}
+    cursos_obligatorios_ciclo, cursos_otros = filtrar_cursos_disponibles(
+        oferta_semestre, 
+        estado.ciclo, 
+        estado.mascara_aprobados, 
+        cursos_matriculados_semestre,
+        indice_curricular
+    )
+    
+    # Si no hay cursos disponibles, saltar este semestre
+    if not cursos_obligatorios_ciclo and not cursos_otros:
+        return []
+    
+    # SELECCIÓN: Priorizar obligatorios del ciclo actual
+    cursos_seleccionados = []
+    
+    # 1. Matricular TODOS los cursos obligatorios del ciclo actual
+    cursos_seleccionados.extend(cursos_obligatorios_ciclo)
+    
+    # 2. Rellenar con otros cursos hasta alcanzar 5-7 cursos totales
+    num_obligatorios = len(cursos_obligatorios_ciclo)
+    espacios_restantes = CURSOS_POR_SEMESTRE_MAX - num_obligatorios
+    
+    if espacios_restantes > 0 and cursos_otros:
+        # Calcular cuántos cursos adicionales tomar
+        if len(cursos_otros) >= espacios_restantes:
+            num_adicionales = rng.randint(
+                max(1, CURSOS_POR_SEMESTRE_MIN - num_obligatorios),
+                espacios_restantes
+            )
+        else:
+            # Tomar todos los disponibles si no hay suficientes
+            num_adicionales = len(cursos_otros)
+        
+        if num_adicionales > 0:
+            cursos_adicionales = rng.sample(cursos_otros, num_adicionales)
+            cursos_seleccionados.extend(cursos_adicionales)
+    
+    # Si no se seleccionó ningún curso, saltar
+    if not cursos_seleccionados:
+        return []
+    
+    año_semestre = int(semestre.split('-')[0])
+    mes = "03" if semestre.endswith('1') else "09"
+    
+    # Generar matrículas
+    matriculas = []
+    for curso_ofertado in cursos_seleccionados:
+        curso_id = curso_ofertado['curso_id']
+        curso_ofertado_id = curso_ofertado['id']
+        creditos = curso_ofertado['creditos']
+        popularidad = curso_ofertado['popularidad']
+        
+        # Marcar curso como matriculado en este semestre para evitar duplicados
+        cursos_matriculados_semestre.add(curso_id)
+        
+        # Generar nota (excepto para el semestre en curso)
+        if semestre == semestre_en_curso:
+            nota_final = None  # Sin nota aún
+            estado_matricula = "Matriculado"
+            estado.en_curso[curso_id] = curso_ofertado_id
+        else:
+            nota_final = generar_nota(popularidad, rng)
+            estado_matricula = "Aprobado" if nota_final >= NOTA_APROBATORIA else "Desaprobado"
+            
+            # Si aprobó, actualizar créditos y cursos aprobados
+            if nota_final >= NOTA_APROBATORIA:
+                estado.creditos += creditos
+                estado.mascara_aprobados |= indice_curricular.bit(curso_id)
+        
+        # Crear registro de matrícula
+        matriculas.append(Matricula(
+            alumno_id,
+            curso_ofertado_id,
+            f"{año_semestre}-{mes}-01",
+            nota_final,
+            estado_matricula
+        ))
+    
+    # Actualizar ciclo relativo después de cada semestre
+    estado.ciclo = determinar_ciclo_relativo(estado.creditos)
+    
+    return matriculas
+
+def generar_matriculas_alumno(alumno, cursos_ofertados_por_semestre, indice_curricular, todos_cursos, conn,
+                              semilla=None, mostrar_progreso=True):
     """
     Genera el historial de matrículas para un alumno desde 2020-2 hasta 2025-2.
     Para alumnos antiguos (2017-2019), asigna créditos iniciales arbitrarios.
+    
+    Sin semilla se usa el módulo random global (el resultado depende del orden
+    en que se procesan los alumnos). Con semilla, el estado inicial y cada
+    semestre usan su propio flujo_aleatorio, así que el historial del alumno
+    es reproducible por sí solo.
     """
     alumno_id = alumno['id']
     codigo_alumno = alumno['codigo']
     año_ingreso = int(codigo_alumno[:4])
+    rng = random if semilla is None else flujo_aleatorio(semilla, alumno_id, 'inicial')
     
     # Calcular créditos iniciales para alumnos que ingresaron antes de 2020-2
-    creditos_acumulados = calcular_creditos_iniciales(año_ingreso)
+    creditos_acumulados = calcular_creditos_iniciales(año_ingreso, rng=rng)
     
     # Determinar qué cursos de ciclos inferiores "ya aprobó" (aproximación)
     # Para simplificar, asumimos que aprobó los cursos básicos según sus créditos
-    cursos_aprobados = set()
+    mascara_aprobados = 0  # Máscara de bits del IndiceCurricular
     ciclo_actual = determinar_ciclo_relativo(creditos_acumulados)
     
     # Marcar cursos de ciclos anteriores como "aprobados" para validar prerrequisitos
@@ -281,188 +521,807 @@ def generar_matriculas_alumno(alumno, cursos_ofertados_por_semestre, prerrequisi
         cursos_basicos = [c for c in todos_cursos if c['ciclo'].isdigit() and int(c['ciclo']) < ciclo_actual]
         # Seleccionar aleatoriamente cursos que sumarían aproximadamente los créditos
         creditos_simulados = 0
-        random.shuffle(cursos_basicos)
+        rng.shuffle(cursos_basicos)
         for curso in cursos_basicos:
             if creditos_simulados < creditos_acumulados:
-                cursos_aprobados.add(curso['id'])
+                mascara_aprobados |= indice_curricular.bit(curso['id'])
                 creditos_simulados += curso['creditos']
     
+    estado = EstadoAlumno(creditos_acumulados, ciclo_actual, mascara_aprobados)
     matriculas = []
     
-    print(f"  Procesando alumno {codigo_alumno} (año {año_ingreso}, créditos iniciales: {creditos_acumulados}, ciclo: {ciclo_actual})")
-    
-    # Determinar semestre de ingreso del alumno
-    # Formato: YYYY (año) + 0/1/2/4 (modalidad) + secuencia
-    mes_ingreso = codigo_alumno[4]  # 0/1 = marzo (semestre 1), 2/4 = agosto (semestre 2)
-    if mes_ingreso in ['0', '1']:
-        semestre_ingreso = f"{año_ingreso}-1"
-    else:
-        semestre_ingreso = f"{año_ingreso}-2"
+    if mostrar_progreso:
+        print(f"  Procesando alumno {codigo_alumno} (año {año_ingreso}, créditos iniciales: {creditos_acumulados}, ciclo: {ciclo_actual})")
     
     # Solo generar matrículas para semestres disponibles en BD (2020-2 a 2025-2)
     # Y solo desde el semestre en que ingresó el alumno
+    ingreso = semestre_de_ingreso(codigo_alumno)
     for semestre in SEMESTRES_DISPONIBLES:
-        año_semestre = int(semestre.split('-')[0])
-        periodo_semestre = int(semestre.split('-')[1])
-        
-        # Validar que el alumno ya haya ingresado
-        año_ingreso_efectivo = int(semestre_ingreso.split('-')[0])
-        periodo_ingreso = int(semestre_ingreso.split('-')[1])
-        
-        if año_semestre < año_ingreso_efectivo:
-            continue  # Semestre anterior al ingreso
-        if año_semestre == año_ingreso_efectivo and periodo_semestre < periodo_ingreso:
-            continue  # Mismo año pero periodo anterior
+        # Validar que el alumno ya haya ingresado (formato YYYY-N: se comparan como texto)
+        if semestre < ingreso:
+            continue
         
         # Si ya egresó, no se matricula más
-        if creditos_acumulados >= 208:
+        if estado.creditos >= 208:
             break
         
+        if semilla is not None:
+            rng = flujo_aleatorio(semilla, alumno_id, semestre)
+        
         # Obtener cursos disponibles para este semestre
-        cursos_ofertados = cursos_ofertados_por_semestre.get(semestre, [])
-        if not cursos_ofertados:
+        oferta_semestre = cursos_ofertados_por_semestre.get(semestre)
+        if not oferta_semestre:
             continue
         
-        # Filtrar cursos que puede tomar
-        cursos_matriculados_semestre = set()
-        cursos_disponibles = filtrar_cursos_disponibles(
-            cursos_ofertados, 
-            ciclo_actual, 
-            cursos_aprobados, 
-            cursos_matriculados_semestre,
-            prerrequisitos
+        matriculas.extend(
+            simular_semestre_alumno(alumno_id, semestre, oferta_semestre, estado, indice_curricular, rng)
         )
-        
-        if not cursos_disponibles:
+    
+    return matriculas
+
+def obtener_estado_alumnos(conn, indice_curricular):
+    """
+    Estado actual de cada alumno según la BD: créditos y ciclo relativo
+    (mantenidos por los triggers), cursos aprobados y cursos matriculados sin nota.
+    
+    Returns:
+        Diccionario alumno_id -> EstadoAlumno
+    """
+    with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute("""
+            SELECT a.id, a.creditos_aprobados, a.ciclo_relativo,
+                   COALESCE(array_agg(DISTINCT co.curso_id) FILTER (WHERE m.estado = 'Aprobado'), '{}') as aprobados,
+                   COALESCE(array_agg(ARRAY[co.curso_id, co.id]) FILTER (WHERE m.estado = 'Matriculado'), '{}') as en_curso
+            FROM alumno a
+            LEFT JOIN matricula m ON m.alumno_id = a.id
+            LEFT JOIN curso_ofertado co ON m.curso_ofertado_id = co.id
+            GROUP BY a.id
+        """)
+        estados = {
+            fila['id']: EstadoAlumno(
+                fila['creditos_aprobados'] or 0,
+                fila['ciclo_relativo'] or 1,
+                indice_curricular.mascara(fila['aprobados']),
+                fila['en_curso']
+            )
+            for fila in cur
+        }
+    print(f"✓ Estado de {len(estados)} alumnos leído de la base de datos")
+    return estados
+
+def ultimo_semestre_con_matriculas(conn):
+    """Semestre más reciente con matrículas en la BD (None si no hay)."""
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT MAX(co.semestre)
+            FROM matricula m
+            JOIN curso_ofertado co ON m.curso_ofertado_id = co.id
+        """)
+        return cur.fetchone()[0]
+
+def contar_matriculas_semestre(conn, semestre):
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT COUNT(*)
+            FROM matricula m
+            JOIN curso_ofertado co ON m.curso_ofertado_id = co.id
+            WHERE co.semestre = %s
+        """, (semestre,))
+        return cur.fetchone()[0]
+
+def guardar_estado_alumnos(ruta, semestre, estados, indice_curricular):
+    """Guarda un snapshot JSON del estado de los alumnos al terminar `semestre`."""
+    snapshot = {
+        'semestre': semestre,
+        'alumnos': {
+            str(alumno_id): {
+                'creditos': estado.creditos,
+                'ciclo': estado.ciclo,
+                'aprobados': indice_curricular.cursos(estado.mascara_aprobados),
+                'en_curso': sorted(estado.en_curso.items())
+            }
+            for alumno_id, estado in estados.items()
+        }
+    }
+    with open(ruta + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f)
+    os.replace(ruta + '.tmp', ruta)
+
+def cargar_estado_alumnos(ruta, indice_curricular):
+    """
+    Lee un snapshot de guardar_estado_alumnos.
+    
+    Returns:
+        (semestre, estados): último semestre simulado y alumno_id -> EstadoAlumno
+    """
+    with open(ruta, 'r', encoding='utf-8') as f:
+        snapshot = json.load(f)
+    estados = {
+        int(alumno_id): EstadoAlumno(
+            datos['creditos'], datos['ciclo'], indice_curricular.mascara(datos['aprobados']), datos['en_curso']
+        )
+        for alumno_id, datos in snapshot['alumnos'].items()
+    }
+    print(f"✓ Estado de {len(estados)} alumnos leído de {ruta} (hasta {snapshot['semestre']})")
+    return snapshot['semestre'], estados
+
+def iterar_matriculas_semestre(alumnos, semestre, oferta_semestre, estados, indice_curricular, semilla=None):
+    """
+    Simula solo `semestre` a partir del estado de cada alumno (flujo de matrículas).
+    Los estados se actualizan a medida que se consume el flujo.
+    
+    `semestre` es el último simulado, así que queda como semestre en curso
+    (matrículas sin nota); las pendientes de antes se cierran con cerrar_en_curso.
+    """
+    for alumno in alumnos:
+        if semestre_de_ingreso(alumno['codigo']) > semestre:
             continue
-        
-        # Eliminar duplicados por curso_id (múltiples secciones del mismo curso)
-        # Mantener solo una sección por curso
-        cursos_unicos = {}
-        for curso in cursos_disponibles:
-            curso_id = curso['curso_id']
-            if curso_id not in cursos_unicos:
-                cursos_unicos[curso_id] = curso
-        cursos_disponibles = list(cursos_unicos.values())
-        
-        # Si no hay cursos disponibles, saltar este semestre
-        if not cursos_disponibles:
+        estado = estados.setdefault(alumno['id'], EstadoAlumno())
+        if estado.creditos >= 208:
             continue
         
-        # PRIORIZACIÓN: Separar cursos obligatorios del ciclo actual
-        cursos_obligatorios_ciclo = []
-        cursos_otros = []
+        rng = random if semilla is None else flujo_aleatorio(semilla, alumno['id'], semestre)
+        yield from simular_semestre_alumno(
+            alumno['id'], semestre, oferta_semestre, estado, indice_curricular, rng,
+            semestre_en_curso=semestre
+        )
+
+def cerrar_en_curso(estados, cursos_ofertados_por_semestre, indice_curricular, semilla=None):
+    """
+    Pone nota a las matrículas sin nota (estado 'Matriculado') de los alumnos
+    antes de simular un semestre nuevo, y actualiza créditos, cursos aprobados
+    y ciclo relativo de cada estado.
+    
+    Returns:
+        Lista de (alumno_id, curso_ofertado_id, nota_final, estado) para
+        actualizar esas matrículas (ver escribir_cierre_sql)
+    """
+    secciones = {co.id: co for co in secciones_ofertadas(cursos_ofertados_por_semestre)}
+    cierre = []
+    for alumno_id, estado in estados.items():
+        if not estado.en_curso:
+            continue
+        rng = random if semilla is None else flujo_aleatorio(semilla, alumno_id, 'cierre')
+        for curso_id, curso_ofertado_id in sorted(estado.en_curso.items()):
+            curso_ofertado = secciones[curso_ofertado_id]
+            nota_final = generar_nota(curso_ofertado.popularidad, rng)
+            if nota_final >= NOTA_APROBATORIA:
+                estado_matricula = "Aprobado"
+                estado.creditos += curso_ofertado.creditos
+                estado.mascara_aprobados |= indice_curricular.bit(curso_id)
+            else:
+                estado_matricula = "Desaprobado"
+            cierre.append((alumno_id, curso_ofertado_id, nota_final, estado_matricula))
+        estado.en_curso = {}
+        estado.ciclo = determinar_ciclo_relativo(estado.creditos)
+    return cierre
+
+def iterar_matriculas(alumnos, cursos_ofertados_por_semestre, indice_curricular, todos_cursos, conn,
+                      semilla=None):
+    """
+    Genera las matrículas alumno por alumno como flujo, sin acumularlas.
+    
+    Con `semilla` cada alumno usa los mismos flujos aleatorios que
+    generar_matriculas_paralelo, así que la salida no depende del modo.
+    """
+    for i, alumno in enumerate(alumnos, 1):
+        if i % 50 == 0:
+            print(f"  Progreso: {i}/{len(alumnos)} alumnos procesados...")
         
-        for curso in cursos_disponibles:
-            tipo_curso = curso['tipo']
-            ciclo_curso = curso['ciclo']
+        yield from generar_matriculas_alumno(
+            alumno, 
+            cursos_ofertados_por_semestre, 
+            indice_curricular,
+            todos_cursos,
+            conn,
+            semilla=semilla
+        )
+
+# Datos compartidos por cada proceso del pool (se cargan una vez por proceso)
+_contexto_proceso = {}
+
+def _inicializar_proceso(cursos_ofertados_por_semestre, indice_curricular, todos_cursos, semilla):
+    _contexto_proceso.update(
+        cursos_ofertados_por_semestre=cursos_ofertados_por_semestre,
+        indice_curricular=indice_curricular,
+        todos_cursos=todos_cursos,
+        semilla=semilla
+    )
+
+def _generar_matriculas_en_proceso(alumno):
+    return generar_matriculas_alumno(
+        alumno,
+        _contexto_proceso['cursos_ofertados_por_semestre'],
+        _contexto_proceso['indice_curricular'],
+        _contexto_proceso['todos_cursos'],
+        None,
+        semilla=_contexto_proceso['semilla'],
+        mostrar_progreso=False
+    )
+
+def _generar_lote_en_proceso(lote):
+    matriculas = []
+    for alumno in lote:
+        matriculas.extend(_generar_matriculas_en_proceso(alumno))
+    return len(lote), matriculas
+
+def resultados_en_ventana(executor, funcion, tareas, ventana):
+    """
+    Aplica `funcion` a cada tarea en `executor` y entrega los resultados en el
+    orden de `tareas`, con a lo sumo `ventana` tareas enviadas sin entregar:
+    una nueva solo cuando se entrega la más antigua, así que los resultados en
+    memoria no dependen del número de tareas.
+    """
+    pendientes = deque()
+    try:
+        for tarea in tareas:
+            pendientes.append(executor.submit(funcion, tarea))
+            if len(pendientes) >= ventana:
+                yield pendientes.popleft().result()
+        while pendientes:
+            yield pendientes.popleft().result()
+    finally:
+        # Si el consumidor deja el flujo a medias no se ejecutan las tareas restantes
+        for futuro in pendientes:
+            futuro.cancel()
+
+def generar_matriculas_paralelo(alumnos, cursos_ofertados_por_semestre, indice_curricular, todos_cursos,
+                                semilla, procesos=None):
+    """
+    Genera las matrículas de todos los alumnos en un pool de procesos.
+    
+    Cada alumno usa flujos aleatorios derivados de (semilla, alumno_id, semestre)
+    y los resultados se entregan como flujo en el orden de `alumnos`, de modo
+    que la salida es la misma con cualquier número de procesos.
+    
+    Los lotes se envían en una ventana de LOTES_EN_VUELO_POR_PROCESO lotes por
+    proceso (resultados_en_ventana), así que las matrículas en memoria no
+    dependen del número de alumnos. Los procesos no imprimen nada: el
+    progreso se informa aquí a medida que se entregan los lotes.
+    """
+    procesos = procesos or os.cpu_count()
+    # Lotes grandes para amortizar la comunicación entre procesos, con tope
+    # para que la ventana no acumule demasiadas matrículas
+    tamano_lote = max(1, min(len(alumnos) // (procesos * 8), ALUMNOS_POR_LOTE_MAX))
+    ventana = procesos * LOTES_EN_VUELO_POR_PROCESO
+    
+    with ProcessPoolExecutor(
+        max_workers=procesos,
+        initializer=_inicializar_proceso,
+        initargs=(cursos_ofertados_por_semestre, indice_curricular, todos_cursos, semilla)
+    ) as executor:
+        lotes = (alumnos[inicio:inicio + tamano_lote] for inicio in range(0, len(alumnos), tamano_lote))
+        procesados = 0
+        for num_alumnos, matriculas in resultados_en_ventana(executor, _generar_lote_en_proceso, lotes, ventana):
+            procesados += num_alumnos
+            print(f"  Progreso: {procesados}/{len(alumnos)} alumnos procesados...")
+            yield from matriculas
+
+# Columnas del historial que se carga junto con las matrículas (--historial)
+COLUMNAS_LOG_CREDITOS = ('alumno_id', 'creditos_anteriores', 'creditos_nuevos', 'fecha')
+COLUMNAS_LOG_CICLO = ('alumno_id', 'ciclo_anterior', 'ciclo_nuevo', 'fecha')
+COLUMNAS_AGREGADOS = ('id', 'creditos_aprobados', 'ciclo_relativo', 'promedio')
+
+class HistorialAlumnos:
+    """
+    Historial de créditos y ciclo relativo, y agregados finales de cada alumno,
+    calculados a partir del flujo de matrículas.
+    
+    Reproduce lo que hacen los triggers por sentencia de verificar_triggers.py
+    al cargar las matrículas de cada semestre en una sentencia sobre alumnos
+    recién reseteados (créditos 0, ciclo 1): un log_creditos por alumno y
+    semestre en que aprobó créditos y un log_ciclo_relativo por alumno y
+    semestre en que cambió su ciclo, con la fecha de ese semestre. Con
+    resumido=True se registra un solo cambio por alumno (0 -> total, con la
+    fecha del último semestre con créditos), como al cargarlo todo en una sola
+    sentencia. El promedio es el de recalcular_promedios.py (notas aprobadas
+    >= 10). Así la carga puede hacerse con los triggers desactivados y sin
+    post-proceso.
+    
+    Las matrículas de cada alumno deben llegar en orden de semestre (todas las
+    de un semestre comparten fecha_matricula). Los logs se guardan por columnas
+    en array('i') (fecha en días desde 2000-01-01).
+    """
+    
+    COLUMNAS_AGREGADOS = COLUMNAS_AGREGADOS
+    
+    def __init__(self, cursos_ofertados_por_semestre, resumido=False):
+        self.creditos_por_oferta = {
+            co.id: co.creditos for co in secciones_ofertadas(cursos_ofertados_por_semestre)
+        }
+        self.resumido = resumido
+        # alumno_id -> [créditos, fecha del último semestre con créditos (días), créditos ya
+        #               registrados en log_creditos, suma de notas aprobadas (centésimas),
+        #               aprobadas con nota]
+        self.alumnos = {}
+        self.log_creditos = tuple(array('i') for _ in COLUMNAS_LOG_CREDITOS)
+        self.log_ciclo = tuple(array('i') for _ in COLUMNAS_LOG_CICLO)
+    
+    def observar(self, matriculas):
+        """
+        Registra el historial a medida que pasan las matrículas (que se devuelven
+        sin cambios). Los logs quedan completos al agotarse el flujo.
+        """
+        for m in matriculas:
+            estado = self.alumnos.get(m['alumno_id'])
+            if estado is None:
+                estado = self.alumnos[m['alumno_id']] = [0, 0, 0, 0, 0]
             
-            try:
-                ciclo_curso_num = int(ciclo_curso) if ciclo_curso and str(ciclo_curso).isdigit() else 0
-            except:
-                ciclo_curso_num = 0
+            if m['estado'] == 'Aprobado':
+                creditos = self.creditos_por_oferta[m['curso_ofertado_id']]
+                if creditos:
+                    fecha = codificar_fecha(m['fecha_matricula'])
+                    if fecha != estado[1]:
+                        # Primer crédito de un semestre nuevo: cerrar el anterior
+                        if not self.resumido:
+                            self._registrar_cambio(m['alumno_id'], estado)
+                        estado[1] = fecha
+                    estado[0] += creditos
+                
+                nota = m['nota_final']
+                if nota is not None and nota >= NOTA_APROBATORIA:
+                    estado[3] += round(nota * 100)
+                    estado[4] += 1
+            yield m
+        
+        for alumno_id, estado in self.alumnos.items():
+            self._registrar_cambio(alumno_id, estado)
+    
+    def _registrar_cambio(self, alumno_id, estado):
+        """Registra en los logs el cambio desde el último registrado, si lo hay."""
+        creditos, fecha, registrados = estado[0], estado[1], estado[2]
+        if creditos == registrados:
+            return
+        _agregar_fila(self.log_creditos, (alumno_id, registrados, creditos, fecha))
+        ciclo_anterior = determinar_ciclo_relativo(registrados)
+        ciclo = determinar_ciclo_relativo(creditos)
+        if ciclo != ciclo_anterior:
+            _agregar_fila(self.log_ciclo, (alumno_id, ciclo_anterior, ciclo, fecha))
+        estado[2] = creditos
+    
+    def filas_log_creditos(self):
+        """Una fila por alumno y semestre en que cambiaron sus créditos."""
+        return _filas_log(self.log_creditos, COLUMNAS_LOG_CREDITOS)
+    
+    def filas_log_ciclo(self):
+        """Una fila por alumno y semestre en que cambió su ciclo relativo."""
+        return _filas_log(self.log_ciclo, COLUMNAS_LOG_CICLO)
+    
+    def tablas_log(self):
+        """(tabla, columnas, filas) de cada log, en el orden de carga; las filas son diccionarios."""
+        return (
+            ('log_creditos', COLUMNAS_LOG_CREDITOS, self.filas_log_creditos()),
+            ('log_ciclo_relativo', COLUMNAS_LOG_CICLO, self.filas_log_ciclo()),
+        )
+    
+    def filas_agregados(self):
+        """Créditos, ciclo y promedio final (Decimal de 2 decimales) de cada alumno con matrículas."""
+        for alumno_id, (creditos, _, _, suma_notas, aprobadas) in self.alumnos.items():
+            promedio = Decimal(0)
+            if aprobadas:
+                promedio = Decimal(suma_notas) / aprobadas / 100
+            yield {
+                'id': alumno_id,
+                'creditos_aprobados': creditos,
+                'ciclo_relativo': determinar_ciclo_relativo(creditos),
+                'promedio': promedio.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+            }
+
+def _agregar_fila(columnas, valores):
+    for columna, valor in zip(columnas, valores):
+        columna.append(valor)
+
+def _filas_log(columnas, nombres):
+    for valores in zip(*columnas):
+        fila = dict(zip(nombres, valores))
+        fila['fecha'] = decodificar_fecha(fila['fecha'])
+        yield fila
+
+def abrir_salida(output_file, comprimir=False):
+    """Abre el archivo de salida como texto, comprimido con gzip si se pide."""
+    if comprimir:
+        return gzip.open(output_file, 'wt', encoding='utf-8', newline='')
+    return open(output_file, 'w', encoding='utf-8', newline='')
+
+def escribir_bloques(f, encabezado, filas, tamano_bloque, cierre=";\n\n"):
+    """
+    Escribe las tuplas de texto de `filas` en sentencias de a lo sumo
+    `tamano_bloque` filas: encabezado, tuplas separadas por coma y cierre.
+    
+    Returns:
+        Número de filas escritas
+    """
+    total = 0
+    filas_bloque = 0
+    for fila in filas:
+        f.write(encabezado if filas_bloque == 0 else ",\n")
+        f.write(fila)
+        total += 1
+        filas_bloque += 1
+        if filas_bloque == tamano_bloque:
+            f.write(cierre)
+            filas_bloque = 0
+    if filas_bloque:
+        f.write(cierre)
+    return total
+
+def tupla_sql_matricula(m):
+    """Tupla VALUES de una matrícula (nota_final NULL si no tiene nota)."""
+    nota = f"{m['nota_final']:.2f}" if m['nota_final'] is not None else "NULL"
+    return f"({m['alumno_id']}, {m['curso_ofertado_id']}, '{m['fecha_matricula']}', {nota}, '{m['estado']}')"
+
+def generar_sql_inserts(matriculas, output_file, tamano_bloque=TAMANO_BLOQUE_INSERT, comprimir=False,
+                        reemplazar=True, historial=None, cierre=None):
+    """
+    Genera el archivo SQL con los INSERTs de matrículas.
+    
+    Las matrículas se consumen como flujo (lista o generador) y se escriben
+    a medida que llegan, en sentencias INSERT de a lo sumo `tamano_bloque` filas.
+    Con reemplazar=False (modo incremental) se omiten el TRUNCATE y el reset de
+    créditos: el archivo solo agrega matrículas, después de poner nota a las
+    que estaban en curso (`cierre`, de cerrar_en_curso).
+    
+    Con un HistorialAlumnos el archivo se ejecuta con los triggers de usuario de
+    matricula y alumno desactivados: después de las matrículas se insertan
+    log_creditos y log_ciclo_relativo y se fijan créditos, ciclo y promedio finales.
+    
+    Returns:
+        Número de matrículas escritas
+    """
+    with abrir_salida(output_file, comprimir) as f:
+        if reemplazar:
+            f.write("-- Limpiar datos existentes con TRUNCATE CASCADE\n")
+            f.write("TRUNCATE TABLE log_ciclo_relativo, log_creditos, matricula RESTART IDENTITY CASCADE;\n\n")
             
-            # Curso obligatorio del ciclo actual
-            if tipo_curso == 'O' and ciclo_curso_num == ciclo_actual:
-                cursos_obligatorios_ciclo.append(curso)
+            if historial is not None:
+                f.write("-- Sin triggers: el historial y los agregados de alumno vienen al final del archivo\n")
+                f.write("ALTER TABLE matricula DISABLE TRIGGER USER;\n")
+                f.write("ALTER TABLE alumno DISABLE TRIGGER USER;\n")
+                f.write("UPDATE alumno SET creditos_aprobados = 0, ciclo_relativo = 1, promedio = 0;\n\n")
             else:
-                cursos_otros.append(curso)
+                f.write("-- Resetear créditos de alumnos SIN TRIGGERS (se recalcularán después)\n")
+                f.write("ALTER TABLE alumno DISABLE TRIGGER trigger_actualizar_ciclo_relativo;\n")
+                f.write("UPDATE alumno SET creditos_aprobados = 0, ciclo_relativo = 1, promedio = 0;\n")
+                f.write("ALTER TABLE alumno ENABLE TRIGGER trigger_actualizar_ciclo_relativo;\n\n")
         
-        # SELECCIÓN: Priorizar obligatorios del ciclo actual
-        cursos_seleccionados = []
+        if cierre:
+            escribir_cierre_sql(f, cierre, tamano_bloque)
         
-        # 1. Matricular TODOS los cursos obligatorios del ciclo actual
-        cursos_seleccionados.extend(cursos_obligatorios_ciclo)
+        if historial is not None:
+            matriculas = historial.observar(matriculas)
         
-        # 2. Rellenar con otros cursos hasta alcanzar 5-7 cursos totales
-        num_obligatorios = len(cursos_obligatorios_ciclo)
-        espacios_restantes = CURSOS_POR_SEMESTRE_MAX - num_obligatorios
-        
-        if espacios_restantes > 0 and cursos_otros:
-            # Calcular cuántos cursos adicionales tomar
-            if len(cursos_otros) >= espacios_restantes:
-                num_adicionales = random.randint(
-                    max(1, CURSOS_POR_SEMESTRE_MIN - num_obligatorios),
-                    espacios_restantes
-                )
-            else:
-                # Tomar todos los disponibles si no hay suficientes
-                num_adicionales = len(cursos_otros)
-            
-            if num_adicionales > 0:
-                cursos_adicionales = random.sample(cursos_otros, num_adicionales)
-                cursos_seleccionados.extend(cursos_adicionales)
+        f.write(f"-- Insertar matrículas en bloques de {tamano_bloque}\n")
         
-        # Si no se seleccionó ningún curso, saltar
-        if not cursos_seleccionados:
-            continue
+        total = escribir_bloques(
+            f,
+            f"INSERT INTO matricula ({', '.join(COLUMNAS_MATRICULA)}) VALUES\n",
+            (tupla_sql_matricula(m) for m in matriculas),
+            tamano_bloque
+        )
         
-        # Generar matrículas
-        for curso_ofertado in cursos_seleccionados:
-            curso_id = curso_ofertado['curso_id']
-            curso_ofertado_id = curso_ofertado['id']
-            creditos = curso_ofertado['creditos']
-            popularidad = curso_ofertado['popularidad']
-            
-            # Marcar curso como matriculado en este semestre para evitar duplicados
-            cursos_matriculados_semestre.add(curso_id)
-            
-            # Generar nota (excepto para 2025-2)
-            if semestre == "2025-2":
-                nota_final = None  # Sin nota aún
-                estado = "Matriculado"
-            else:
-                nota_final = generar_nota(popularidad)
-                estado = "Aprobado" if nota_final >= NOTA_APROBATORIA else "Desaprobado"
-                
-                # Si aprobó, actualizar créditos y cursos aprobados
-                if nota_final >= NOTA_APROBATORIA:
-                    creditos_acumulados += creditos
-                    cursos_aprobados.add(curso_id)
-            
-            # Crear registro de matrícula
-            mes = "03" if semestre.endswith('1') else "09"
-            matricula = {
-                'alumno_id': alumno_id,
-                'curso_ofertado_id': curso_ofertado_id,
-                'fecha_matricula': f"{año_semestre}-{mes}-01",
-                'nota_final': nota_final,
-                'estado': estado
-            }
-            matriculas.append(matricula)
-            cursos_matriculados_semestre.add(curso_id)
+        f.write(f"-- Total: {total} matrículas\n")
         
-        # Actualizar ciclo relativo después de cada semestre
-        ciclo_actual = determinar_ciclo_relativo(creditos_acumulados)
+        if historial is not None:
+            escribir_historial_sql(f, historial, tamano_bloque)
     
-    return matriculas
+    print(f"✓ Archivo SQL generado: {output_file}")
+    return total
 
-def generar_sql_inserts(matriculas, output_file):
-    """Genera el archivo SQL con los INSERTs de matrículas."""
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write("-- Limpiar datos existentes con TRUNCATE CASCADE\n")
-        f.write("TRUNCATE TABLE log_ciclo_relativo, log_creditos, matricula RESTART IDENTITY CASCADE;\n\n")
-        
-        f.write("-- Resetear créditos de alumnos SIN TRIGGERS (se recalcularán después)\n")
-        f.write("ALTER TABLE alumno DISABLE TRIGGER trigger_actualizar_ciclo_relativo;\n")
-        f.write("UPDATE alumno SET creditos_aprobados = 0, ciclo_relativo = 1, promedio = 0;\n")
-        f.write("ALTER TABLE alumno ENABLE TRIGGER trigger_actualizar_ciclo_relativo;\n\n")
+def escribir_cierre_sql(f, cierre, tamano_bloque=TAMANO_BLOQUE_INSERT):
+    """Escribe el UPDATE que pone nota a las matrículas en curso cerradas por cerrar_en_curso."""
+    f.write("-- Notas de las matrículas del semestre anterior (los triggers suman los créditos)\n")
+    total = escribir_bloques(
+        f,
+        "UPDATE matricula m\n"
+        "SET nota_final = v.nota_final, estado = v.estado\n"
+        "FROM (VALUES\n",
+        (f"({alumno_id}, {curso_ofertado_id}, {nota:.2f}, '{estado}')"
+         for alumno_id, curso_ofertado_id, nota, estado in cierre),
+        tamano_bloque,
+        cierre="\n) AS v (alumno_id, curso_ofertado_id, nota_final, estado)\n"
+               "WHERE m.alumno_id = v.alumno_id AND m.curso_ofertado_id = v.curso_ofertado_id\n"
+               "  AND m.estado = 'Matriculado';\n\n"
+    )
+    f.write(f"-- Total: {total} matrículas con nota\n\n")
+
+def escribir_historial_sql(f, historial, tamano_bloque=TAMANO_BLOQUE_INSERT):
+    """Escribe los logs y el UPDATE de agregados de un HistorialAlumnos y reactiva los triggers."""
+    for tabla, columnas, filas in historial.tablas_log():
+        total = escribir_bloques(
+            f,
+            f"INSERT INTO {tabla} ({', '.join(columnas)}) VALUES\n",
+            (f"({', '.join(str(fila[c]) for c in columnas[:-1])}, '{fila['fecha']}')" for fila in filas),
+            tamano_bloque
+        )
+        f.write(f"-- Total: {total} filas de {tabla}\n\n")
+    
+    total = escribir_bloques(
+        f,
+        "UPDATE alumno a\n"
+        "SET creditos_aprobados = v.creditos_aprobados, ciclo_relativo = v.ciclo_relativo, promedio = v.promedio\n"
+        "FROM (VALUES\n",
+        (f"({a['id']}, {a['creditos_aprobados']}, {a['ciclo_relativo']}, {a['promedio']})"
+         for a in historial.filas_agregados()),
+        tamano_bloque,
+        cierre=f"\n) AS v ({', '.join(COLUMNAS_AGREGADOS)})\nWHERE a.id = v.id;\n\n"
+    )
+    f.write(f"-- Total: {total} alumnos actualizados\n\n")
+    
+    f.write("ALTER TABLE matricula ENABLE TRIGGER USER;\n")
+    f.write("ALTER TABLE alumno ENABLE TRIGGER USER;\n")
+
+def generar_csv_copy(matriculas, output_file, comprimir=False):
+    """
+    Escribe las matrículas como CSV (con cabecera) para cargarlas con
+    COPY matricula (...) FROM ... WITH (FORMAT csv, HEADER). nota_final vacía = NULL.
+    
+    Returns:
+        Número de matrículas escritas
+    """
+    total = 0
+    with abrir_salida(output_file, comprimir) as f:
+        escritor = csv.writer(f, lineterminator='\n')
+        escritor.writerow(COLUMNAS_MATRICULA)
+        for m in matriculas:
+            nota = f"{m['nota_final']:.2f}" if m['nota_final'] is not None else ''
+            escritor.writerow((m['alumno_id'], m['curso_ofertado_id'], m['fecha_matricula'], nota, m['estado']))
+            total += 1
+    
+    print(f"✓ Archivo CSV generado: {output_file}")
+    return total
+
+def generar_csv_historial(historial, output_file, comprimir=False):
+    """
+    Escribe los logs y los agregados de un HistorialAlumnos en CSV junto al de
+    matrículas (generar_matriculas_log_creditos.csv, ..._alumno.csv) y un script
+    psql que carga todo con los triggers desactivados.
+    
+    Returns:
+        Ruta del script de carga
+    """
+    base = output_file.split('.')[0]
+    extension = '.csv.gz' if comprimir else '.csv'
+    tablas = [(tabla, columnas, filas, f"{base}_{tabla}{extension}")
+              for tabla, columnas, filas in historial.tablas_log()]
+    tablas.append(('alumno_final', COLUMNAS_AGREGADOS, historial.filas_agregados(), f"{base}_alumno{extension}"))
+    
+    for tabla, columnas, filas, archivo in tablas:
+        with abrir_salida(archivo, comprimir) as f:
+            escritor = csv.writer(f, lineterminator='\n')
+            escritor.writerow(columnas)
+            total = 0
+            for fila in filas:
+                escritor.writerow([fila[c] for c in columnas])
+                total += 1
+        print(f"✓ Archivo CSV generado: {archivo} ({total} filas)")
+    
+    def origen(archivo):
+        return f"PROGRAM 'gzip -dc {archivo}'" if comprimir else f"'{archivo}'"
+    
+    script = f"{base}_carga.sql"
+    with open(script, 'w', encoding='utf-8') as f:
+        f.write("-- Carga de matrículas con historial precalculado (generar_matriculas.py --historial)\n")
+        f.write("\\set ON_ERROR_STOP on\n")
+        f.write("BEGIN;\n\n")
+        f.write("TRUNCATE TABLE log_ciclo_relativo, log_creditos, matricula RESTART IDENTITY CASCADE;\n")
+        f.write("ALTER TABLE matricula DISABLE TRIGGER USER;\n")
+        f.write("ALTER TABLE alumno DISABLE TRIGGER USER;\n")
+        f.write("UPDATE alumno SET creditos_aprobados = 0, ciclo_relativo = 1, promedio = 0;\n\n")
+        f.write(f"\\copy matricula ({', '.join(COLUMNAS_MATRICULA)}) FROM {origen(output_file)} "
+                f"WITH (FORMAT csv, HEADER)\n")
+        f.write("CREATE TEMP TABLE alumno_final ON COMMIT DROP AS\n"
+                f"    SELECT {', '.join(COLUMNAS_AGREGADOS)} FROM alumno WITH NO DATA;\n")
+        for tabla, columnas, _, archivo in tablas:
+            f.write(f"\\copy {tabla} ({', '.join(columnas)}) FROM {origen(archivo)} WITH (FORMAT csv, HEADER)\n")
+        f.write("\nUPDATE alumno a\n"
+                "SET creditos_aprobados = f.creditos_aprobados, ciclo_relativo = f.ciclo_relativo, promedio = f.promedio\n"
+                "FROM alumno_final f\n"
+                "WHERE a.id = f.id;\n\n")
+        f.write("ALTER TABLE matricula ENABLE TRIGGER USER;\n")
+        f.write("ALTER TABLE alumno ENABLE TRIGGER USER;\n")
+        f.write("COMMIT;\n")
+    
+    print(f"✓ Script de carga generado: {script}")
+    return script
+
+def preparar_incremental(conn, args, indice_curricular):
+    """
+    Semestre a simular y estado de partida de los alumnos para --incremental.
+    Termina el programa si el semestre no es válido o ya tiene matrículas.
+    """
+    if args.estado and os.path.exists(args.estado):
+        ultimo, estados = cargar_estado_alumnos(args.estado, indice_curricular)
+    else:
+        ultimo = ultimo_semestre_con_matriculas(conn)
+        estados = obtener_estado_alumnos(conn, indice_curricular)
+    
+    if args.incremental == 'siguiente':
+        siguientes = [s for s in SEMESTRES_DISPONIBLES if ultimo is None or s > ultimo]
+        if not siguientes:
+            print(f"✗ No hay semestres en SEMESTRES_DISPONIBLES después de {ultimo}")
+            sys.exit(1)
+        semestre = siguientes[0]
+    else:
+        semestre = args.incremental
+        if semestre not in SEMESTRES_DISPONIBLES:
+            print(f"✗ {semestre} no está en SEMESTRES_DISPONIBLES")
+            sys.exit(1)
+        if ultimo is not None and semestre <= ultimo:
+            print(f"✗ {semestre} no es posterior al último semestre simulado ({ultimo})")
+            sys.exit(1)
+    
+    existentes = contar_matriculas_semestre(conn, semestre)
+    if existentes:
+        print(f"✗ {semestre} ya tiene {existentes} matrículas en la base de datos")
+        sys.exit(1)
+    
+    return semestre, estados
+
+def escribir_matriculas(conn, matriculas, args, sufijo='', reemplazar=True, historial=None, validador=None,
+                        cierre=None):
+    """
+    Carga las matrículas con COPY (--copy) o las escribe en el archivo SQL/CSV.
+    
+    Con `cierre` (modo incremental, ver cerrar_en_curso) antes de agregar las
+    matrículas se pone nota a las que estaban en curso: en la misma transacción
+    que el COPY, al inicio del archivo SQL o, con --formato csv, en un archivo
+    SQL aparte que se ejecuta antes del COPY.
+    
+    Con un HistorialAlumnos (--historial) también se cargan o escriben los logs
+    de créditos y ciclo y los agregados finales de cada alumno.
+    Con un ValidadorMatriculas (--validar) las matrículas se validan mientras
+    pasan; si alguna invariante falla se revierte el COPY o se borra el archivo.
+    """
+    from validar_matriculas import MatriculasInvalidas
+    
+    if validador is not None:
+        matriculas = validador.observar(matriculas)
+    
+    if args.copy:
+        from carga_binaria import cargar_matriculas
         
-        f.write(f"-- Insertar {len(matriculas)} matrículas\n")
-        f.write("INSERT INTO matricula (alumno_id, curso_ofertado_id, fecha_matricula, nota_final, estado) VALUES\n")
+        if cierre:
+            # Sin commit: cargar_matriculas confirma o revierte todo junto con el COPY
+            sentencias = io.StringIO()
+            escribir_cierre_sql(sentencias, cierre)
+            with conn.cursor() as cur:
+                cur.execute(sentencias.getvalue())
+            print(f"✓ {len(cierre)} matrículas en curso con nota")
         
-        values = []
-        for m in matriculas:
-            nota = f"{m['nota_final']:.2f}" if m['nota_final'] is not None else "NULL"
-            value = f"({m['alumno_id']}, {m['curso_ofertado_id']}, '{m['fecha_matricula']}', {nota}, '{m['estado']}')"
-            values.append(value)
+        print("\n📥 Generando y cargando matrículas con COPY binario...")
+        try:
+            filas, segundos = cargar_matriculas(conn, matriculas, reemplazar=reemplazar, historial=historial)
+        except MatriculasInvalidas as e:
+            print(f"✗ Carga revertida: las matrículas no pasaron la validación\n{e}")
+            sys.exit(1)
+        if validador is not None:
+            print(f"✓ Validación: {validador.resumen()}")
+        print(f"✓ {filas} matrículas cargadas en {segundos:.2f}s "
+              f"({filas / max(segundos, 1e-9):,.0f} filas/s)")
+        if historial is not None:
+            print(f"✓ Historial cargado con los triggers desactivados: "
+                  f"{len(historial.log_creditos[0])} log_creditos, "
+                  f"{len(historial.log_ciclo[0])} log_ciclo_relativo, "
+                  f"{len(historial.alumnos)} alumnos actualizados")
         
-        f.write(',\n'.join(values) + ';\n')
+        print("\n" + "=" * 80)
+        print("PROCESO COMPLETADO")
+        print("=" * 80)
+        return
     
-    print(f"✓ Archivo SQL generado: {output_file}")
+    # Generar archivo SQL (o CSV), escribiendo a medida que se generan
+    output_file = f"generar_matriculas{sufijo}.{args.formato}"
+    if args.gzip:
+        output_file += '.gz'
+    try:
+        if args.formato == 'sql':
+            total_matriculas = generar_sql_inserts(
+                matriculas, output_file, args.bloque, comprimir=args.gzip, reemplazar=reemplazar,
+                historial=historial, cierre=cierre
+            )
+        elif historial is not None:
+            total_matriculas = generar_csv_copy(historial.observar(matriculas), output_file, comprimir=args.gzip)
+            script_carga = generar_csv_historial(historial, output_file, comprimir=args.gzip)
+        else:
+            total_matriculas = generar_csv_copy(matriculas, output_file, comprimir=args.gzip)
+    except MatriculasInvalidas as e:
+        os.remove(output_file)
+        print(f"✗ Archivo {output_file} descartado: las matrículas no pasaron la validación\n{e}")
+        sys.exit(1)
+    
+    script_cierre = None
+    if cierre and args.formato == 'csv':
+        script_cierre = f"generar_matriculas{sufijo}_cierre.sql"
+        with open(script_cierre, 'w', encoding='utf-8') as f:
+            escribir_cierre_sql(f, cierre, args.bloque)
+    
+    if validador is not None:
+        print(f"✓ Validación: {validador.resumen()}")
+    print(f"\n✓ Total de matrículas generadas: {total_matriculas}")
+    
+    print("\n" + "=" * 80)
+    print("PROCESO COMPLETADO")
+    print("=" * 80)
+    print(f"📄 Archivo generado: {output_file}")
+    print(f"📊 Total matrículas: {total_matriculas}")
+    print("\nSiguiente paso:")
+    if args.formato == 'sql':
+        print("  Ejecutar el archivo SQL en la base de datos para insertar las matrículas")
+        print(f"  (python ejecutar_sql.py {output_file})")
+    elif historial is not None:
+        print("  Cargar matrículas, historial y agregados (con los triggers desactivados):")
+        print(f"  psql -f {script_carga}")
+    else:
+        if reemplazar:
+            print("  Cargar el CSV con COPY (después del TRUNCATE y reset de créditos):")
+        elif script_cierre:
+            print(f"  Poner nota a las matrículas en curso (python ejecutar_sql.py {script_cierre})")
+            print("  y después agregar las matrículas del CSV con COPY:")
+        else:
+            print("  Agregar las matrículas del CSV con COPY:")
+        origen = f"PROGRAM 'gzip -dc {output_file}'" if args.gzip else f"'{output_file}'"
+        print(f"  \\copy matricula ({', '.join(COLUMNAS_MATRICULA)}) FROM {origen} WITH (FORMAT csv, HEADER)")
+    print("=" * 80)
 
 def main():
     """Función principal."""
+    parser = argparse.ArgumentParser(description="Genera matrículas históricas de Telecomunicaciones")
+    parser.add_argument('--popularidad-historica', action='store_true',
+                        help="Con --incremental, usar la popularidad del profesor calculada con las "
+                             "notas ya cargadas de semestres anteriores")
+    parser.add_argument('--vectorizado', action='store_true',
+                        help="Simular todos los alumnos por lotes con NumPy (simulacion_vectorizada.py)")
+    parser.add_argument('--semilla', type=int, default=None,
+                        help="Semilla aleatoria para reproducir la simulación")
+    parser.add_argument('--procesos', type=int, default=None,
+                        help="Generar en paralelo con N procesos (0 = todos los núcleos)")
+    parser.add_argument('--alumno', default=None, metavar='CODIGO',
+                        help="Regenerar e imprimir solo el historial de un alumno")
+    parser.add_argument('--copy', action='store_true',
+                        help="Cargar las matrículas en la BD con COPY binario en lugar de generar el SQL")
+    parser.add_argument('--formato', choices=('sql', 'csv'), default='sql',
+                        help="Salida: bloques INSERT (sql) o CSV para COPY (csv)")
+    parser.add_argument('--bloque', type=int, default=TAMANO_BLOQUE_INSERT,
+                        help=f"Filas por sentencia INSERT (por defecto {TAMANO_BLOQUE_INSERT})")
+    parser.add_argument('--gzip', action='store_true',
+                        help="Comprimir el archivo generado con gzip")
+    parser.add_argument('--incremental', nargs='?', const='siguiente', default=None, metavar='SEMESTRE',
+                        help="Simular solo SEMESTRE (por defecto el siguiente sin matrículas) "
+                             "y agregar sus matrículas sin borrar la historia")
+    parser.add_argument('--estado', default=None, metavar='ARCHIVO',
+                        help="Snapshot JSON del estado de los alumnos para --incremental "
+                             "(se lee si existe y se actualiza al terminar)")
+    parser.add_argument('--historial', action='store_true',
+                        help="Generar también log_creditos, log_ciclo_relativo y los créditos, ciclo y "
+                             "promedio finales de cada alumno, y cargar con los triggers desactivados")
+    parser.add_argument('--historial-resumido', action='store_true',
+                        help="Con --historial, un solo log_creditos y log_ciclo_relativo por alumno "
+                             "(0 -> total) en lugar de uno por semestre")
+    parser.add_argument('--validar', action='store_true',
+                        help="Validar las matrículas en memoria (duplicados, prerrequisitos, créditos, ...) "
+                             "y bloquear la carga si alguna invariante falla")
+    args = parser.parse_args()
+    
+    if args.incremental is not None and (args.vectorizado or args.procesos is not None or args.alumno):
+        parser.error("--incremental no se puede combinar con --vectorizado, --procesos ni --alumno")
+    if args.estado and args.incremental is None:
+        parser.error("--estado solo se usa con --incremental")
+    if args.popularidad_historica and args.incremental is None:
+        # Sin --incremental las matrículas de la BD se reemplazan en esta misma carga
+        parser.error("--popularidad-historica solo se usa con --incremental")
+    if args.historial and (args.incremental is not None or args.alumno):
+        parser.error("--historial no se puede combinar con --incremental ni --alumno")
+    if args.historial_resumido and not args.historial:
+        parser.error("--historial-resumido solo se usa con --historial")
+    
+    # Los modos por alumno necesitan una semilla explícita para ser reproducibles
+    if args.semilla is None and (args.procesos is not None or args.alumno):
+        args.semilla = random.randrange(2**32)
+        print(f"Semilla: {args.semilla}")
+    
+    if args.semilla is not None:
+        random.seed(args.semilla)
+    
     print("=" * 80)
     print("GENERADOR DE MATRÍCULAS HISTÓRICAS - TELECOMUNICACIONES")
     print("=" * 80)
@@ -477,41 +1336,88 @@ def main():
         alumnos = obtener_alumnos(conn)
         cursos = obtener_cursos(conn)
         prerrequisitos = obtener_prerrequisitos(conn)
-        cursos_ofertados_por_semestre = obtener_cursos_ofertados(conn)
+        indice_curricular = IndiceCurricular([curso['id'] for curso in cursos], prerrequisitos)
+        historial_popularidad = None
+        if args.popularidad_historica:
+            historial_popularidad = HistorialPopularidad.desde_bd(conn)
+            print("✓ Popularidad histórica de profesores calculada")
+        cursos_ofertados_por_semestre = obtener_cursos_ofertados(conn, historial_popularidad)
         
-        print(f"\n🎓 Generando matrículas para {len(alumnos)} alumnos...")
-        print(f"📅 Semestres: {SEMESTRES_DISPONIBLES[0]} a {SEMESTRES_DISPONIBLES[-1]}")
-        print()
+        if args.validar:
+            # Import diferido: validar_matriculas importa este módulo
+            from validar_matriculas import ValidadorMatriculas
         
-        todas_matriculas = []
+        if args.alumno:
+            alumno = next((a for a in alumnos if a['codigo'] == args.alumno), None)
+            if alumno is None:
+                print(f"✗ No existe el alumno {args.alumno}")
+                sys.exit(1)
+            matriculas = generar_matriculas_alumno(
+                alumno, cursos_ofertados_por_semestre, indice_curricular, cursos, conn, semilla=args.semilla
+            )
+            for m in matriculas:
+                print(f"  {m['fecha_matricula']}  curso_ofertado {m['curso_ofertado_id']:>5}  "
+                      f"{m['estado']:<12} {m['nota_final'] if m['nota_final'] is not None else '-'}")
+            print(f"\n✓ {len(matriculas)} matrículas para {args.alumno}")
+            return
         
-        for i, alumno in enumerate(alumnos, 1):
-            if i % 50 == 0:
-                print(f"  Progreso: {i}/{len(alumnos)} alumnos procesados...")
+        if args.incremental is not None:
+            semestre, estados = preparar_incremental(conn, args, indice_curricular)
+            oferta_semestre = cursos_ofertados_por_semestre.get(semestre)
+            if not oferta_semestre:
+                print(f"✗ No hay cursos ofertados para {semestre}")
+                sys.exit(1)
+            # Lo que estaba en curso recibe nota: el semestre simulado pasa a ser el en curso
+            cierre = cerrar_en_curso(estados, cursos_ofertados_por_semestre, indice_curricular, args.semilla)
+            validador = None
+            if args.validar:
+                # Se crea antes de simular: copia el estado inicial de cada alumno
+                validador = ValidadorMatriculas(
+                    cursos_ofertados_por_semestre, indice_curricular, alumnos, estados,
+                    semestre_en_curso=semestre
+                )
             
-            matriculas_alumno = generar_matriculas_alumno(
-                alumno, 
-                cursos_ofertados_por_semestre, 
-                prerrequisitos,
-                cursos,
-                conn
+            print(f"\n🎓 Simulando solo {semestre} para {len(alumnos)} alumnos...")
+            matriculas = iterar_matriculas_semestre(
+                alumnos, semestre, oferta_semestre, estados, indice_curricular, args.semilla
             )
-            todas_matriculas.extend(matriculas_alumno)
+            escribir_matriculas(conn, matriculas, args, sufijo=f"_{semestre}", reemplazar=False,
+                                validador=validador, cierre=cierre)
+            
+            if args.estado:
+                guardar_estado_alumnos(args.estado, semestre, estados, indice_curricular)
+                print(f"💾 Estado de los alumnos guardado en {args.estado}")
+            return
         
-        print(f"\n✓ Total de matrículas generadas: {len(todas_matriculas)}")
+        print(f"\n🎓 Generando matrículas para {len(alumnos)} alumnos...")
+        print(f"📅 Semestres: {SEMESTRES_DISPONIBLES[0]} a {SEMESTRES_DISPONIBLES[-1]}")
+        print()
         
-        # Generar archivo SQL
-        output_file = 'generar_matriculas.sql'
-        generar_sql_inserts(todas_matriculas, output_file)
+        if args.vectorizado:
+            # Import diferido: NumPy solo es necesario para el motor por lotes
+            from simulacion_vectorizada import SimuladorVectorizado
+            
+            simulador = SimuladorVectorizado(
+                alumnos, cursos, indice_curricular, cursos_ofertados_por_semestre, semilla=args.semilla
+            )
+            matriculas = simulador.iterar_matriculas()
+        elif args.procesos is not None:
+            matriculas = generar_matriculas_paralelo(
+                alumnos, cursos_ofertados_por_semestre, indice_curricular, cursos,
+                args.semilla, procesos=args.procesos
+            )
+        else:
+            matriculas = iterar_matriculas(
+                alumnos, cursos_ofertados_por_semestre, indice_curricular, cursos, conn, semilla=args.semilla
+            )
         
-        print("\n" + "=" * 80)
-        print("PROCESO COMPLETADO")
-        print("=" * 80)
-        print(f"📄 Archivo generado: {output_file}")
-        print(f"📊 Total matrículas: {len(todas_matriculas)}")
-        print("\nSiguiente paso:")
-        print("  Ejecutar el archivo SQL en la base de datos para insertar las matrículas")
-        print("=" * 80)
+        historial = HistorialAlumnos(
+            cursos_ofertados_por_semestre, resumido=args.historial_resumido
+        ) if args.historial else None
+        validador = None
+        if args.validar:
+            validador = ValidadorMatriculas(cursos_ofertados_por_semestre, indice_curricular, alumnos)
+        escribir_matriculas(conn, matriculas, args, historial=historial, validador=validador)
         
     finally:
         conn.close()
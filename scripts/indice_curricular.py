@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Índice curricular compilado: prerrequisitos como máscaras de bits.
+
+Cada curso.id ocupa una posición de bit. Los prerrequisitos de cada curso se
+guardan como un entero con los bits de sus prerrequisitos, y los cursos
+aprobados de un alumno también son un entero, de modo que verificar
+prerrequisitos es un único AND + comparación:
+
+    (mascara_aprobados & mascara_prereqs) == mascara_prereqs
+
+El índice se comparte entre scripts: generar_matriculas lo usa para filtrar
+cursos disponibles y elegibilidad/simulacion_vectorizada obtienen de él la
+matriz de prerrequisitos para contar elegibles en lote.
+
+Uso:
+    indice = IndiceCurricular.desde_bd(conn)
+    aprobados = indice.mascara([curso_id_1, curso_id_2])
+    indice.cumple_prerrequisitos(curso_id, aprobados)
+"""
+
+from psycopg2.extras import RealDictCursor
+
+SQL_CURSOS = "SELECT id FROM curso ORDER BY id"
+SQL_PRERREQUISITOS = "SELECT curso_id, prereq_id FROM curso_prerrequisito"
+
+class IndiceCurricular:
+    """Posiciones de bit por curso y máscaras de prerrequisitos."""
+
+    def __init__(self, curso_ids, prerrequisitos):
+        """
+        Args:
+            curso_ids: Ids de curso; definen el orden de las posiciones de bit
+            prerrequisitos: Diccionario curso_id -> [prereq_ids]
+        """
+        self.posicion = {}
+        for curso_id in curso_ids:
+            self.posicion.setdefault(curso_id, len(self.posicion))
+        self.num_cursos = len(self.posicion)
+
+        # Un prerrequisito que no está en el catálogo recibe su propio bit: como
+        # nunca se aprueba, el curso que lo exige nunca queda disponible.
+        for prereq_ids in prerrequisitos.values():
+            for prereq_id in prereq_ids:
+                self.posicion.setdefault(prereq_id, len(self.posicion))
+
+        self.prerrequisitos = {}
+        for curso_id, prereq_ids in prerrequisitos.items():
+            self.prerrequisitos[curso_id] = self.mascara(prereq_ids)
+
+    @classmethod
+    def desde_bd(cls, conn):
+        """Compila el índice a partir de las tablas curso y curso_prerrequisito."""
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(SQL_CURSOS)
+            cursos = cur.fetchall()
+
+            cur.execute(SQL_PRERREQUISITOS)
+            prerrequisitos = cur.fetchall()
+
+        return cls.desde_filas(cursos, prerrequisitos)
+
+    @classmethod
+    def desde_filas(cls, cursos, prerrequisitos):
+        """Compila el índice a partir de las filas de SQL_CURSOS y SQL_PRERREQUISITOS."""
+        por_curso = {}
+        for row in prerrequisitos:
+            por_curso.setdefault(row['curso_id'], []).append(row['prereq_id'])
+        return cls([row['id'] for row in cursos], por_curso)
+
+    def bit(self, curso_id):
+        """Máscara con solo el bit del curso."""
+        return 1 << self.posicion[curso_id]
+
+    def mascara(self, curso_ids):
+        """Máscara con los bits de todos los cursos indicados."""
+        mascara = 0
+        for curso_id in curso_ids:
+            mascara |= 1 << self.posicion[curso_id]
+        return mascara
+
+    def cursos(self, mascara):
+        """Ids de curso cuyos bits están en la máscara (inversa de mascara)."""
+        return [curso_id for curso_id, posicion in self.posicion.items() if mascara >> posicion & 1]
+
+    def aprobado(self, curso_id, mascara_aprobados):
+        """Indica si el curso está en la máscara de aprobados."""
+        return bool(mascara_aprobados >> self.posicion[curso_id] & 1)
+
+    def cumple_prerrequisitos(self, curso_id, mascara_aprobados):
+        """Verifica con un AND si todos los prerrequisitos del curso están aprobados."""
+        requeridos = self.prerrequisitos.get(curso_id, 0)
+        return mascara_aprobados & requeridos == requeridos
+
+    def matriz_prerrequisitos(self):
+        """
+        Versión matricial del índice para verificar muchos alumnos a la vez.
+
+        Returns:
+            (matriz, requeridos): matriz NumPy cursos x cursos (fila = curso,
+            columna = prerrequisito) en el orden de las posiciones de bit, y el
+            número de prerrequisitos de cada curso. Un alumno cumple los
+            prerrequisitos de c si (aprobados @ matriz.T)[c] >= requeridos[c];
+            los prerrequisitos fuera del catálogo cuentan en `requeridos` pero
+            no tienen columna, así que nunca se cumplen.
+        """
+        import numpy as np
+
+        matriz = np.zeros((self.num_cursos, self.num_cursos), dtype=np.float32)
+        requeridos = np.zeros(self.num_cursos, dtype=np.float32)
+        for curso_id, mascara in self.prerrequisitos.items():
+            fila = self.posicion.get(curso_id)
+            if fila is None or fila >= self.num_cursos:
+                continue
+            requeridos[fila] = bin(mascara).count('1')
+            for columna in range(self.num_cursos):
+                if mascara >> columna & 1:
+                    matriz[fila, columna] = 1
+        return matriz, requeridos
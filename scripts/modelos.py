@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tipos compactos del dominio: Alumno, Curso, CursoOfertado y Matricula.
+
+Son clases con __slots__ (sin __dict__ por instancia) en lugar de los dict de
+RealDictCursor. Matricula guarda la fecha como días desde 2000-01-01, la nota
+en centésimas y el estado como un entero pequeño; las propiedades devuelven
+los valores originales ('2023-03-01', 12.5, 'Aprobado').
+
+Para conservar muchas matrículas a la vez, TablaMatriculas las guarda por
+columnas en array (13 bytes por matrícula).
+
+Todos los tipos aceptan acceso por clave (m['estado']) como los dict de
+RealDictCursor, así que el código existente que recibe filas sigue funcionando.
+
+Ver benchmark_memoria.py para la comparación de memoria contra los dict.
+"""
+
+from array import array
+from datetime import date
+from functools import lru_cache
+
+ESTADOS = ('Matriculado', 'Aprobado', 'Desaprobado')
+CODIGO_ESTADO = {estado: codigo for codigo, estado in enumerate(ESTADOS)}
+
+EPOCA = date(2000, 1, 1).toordinal()
+
+# Nota nula en TablaMatriculas
+SIN_NOTA = -1
+
+@lru_cache(maxsize=None)
+def codificar_fecha(fecha):
+    """'YYYY-MM-DD' (o date) -> días desde 2000-01-01."""
+    if isinstance(fecha, str):
+        fecha = date.fromisoformat(fecha)
+    return fecha.toordinal() - EPOCA
+
+@lru_cache(maxsize=None)
+def decodificar_fecha(dias):
+    """Días desde 2000-01-01 -> 'YYYY-MM-DD'."""
+    return date.fromordinal(dias + EPOCA).isoformat()
+
+class _Registro:
+    """Base de los tipos con __slots__: acceso por atributo y por clave."""
+
+    __slots__ = ()
+
+    def __getitem__(self, campo):
+        return getattr(self, campo)
+
+    def get(self, campo, por_defecto=None):
+        return getattr(self, campo, por_defecto)
+
+    def __repr__(self):
+        campos = ', '.join(f"{campo}={getattr(self, campo)!r}" for campo in self.CAMPOS)
+        return f"{type(self).__name__}({campos})"
+
+    @classmethod
+    def desde_fila(cls, fila):
+        """Construye el objeto a partir de una fila de RealDictCursor."""
+        return cls(**{campo: fila[campo] for campo in cls.CAMPOS})
+
+class Alumno(_Registro):
+    __slots__ = ('id', 'codigo', 'nombres', 'apellidos', 'ciclo_relativo', 'creditos_aprobados', 'promedio')
+    CAMPOS = __slots__
+
+    def __init__(self, id, codigo, nombres=None, apellidos=None, ciclo_relativo=None,
+                 creditos_aprobados=None, promedio=None):
+        self.id = id
+        self.codigo = codigo
+        self.nombres = nombres
+        self.apellidos = apellidos
+        self.ciclo_relativo = ciclo_relativo
+        self.creditos_aprobados = creditos_aprobados
+        self.promedio = promedio
+
+class Curso(_Registro):
+    __slots__ = ('id', 'codigo', 'nombre', 'tipo', 'ciclo', 'creditos')
+    CAMPOS = __slots__
+
+    def __init__(self, id, codigo, nombre, tipo, ciclo, creditos):
+        self.id = id
+        self.codigo = codigo
+        self.nombre = nombre
+        self.tipo = tipo
+        self.ciclo = ciclo
+        self.creditos = creditos
+
+class CursoOfertado(_Registro):
+    """Sección ofertada; ciclo_num es el ciclo del curso como entero (0 si no es numérico)."""
+
+    __slots__ = ('id', 'curso_id', 'profesor_id', 'semestre', 'codigo_seccion', 'turno',
+                 'cupos_disponibles', 'curso_codigo', 'curso_nombre', 'ciclo', 'creditos',
+                 'tipo', 'popularidad', 'ciclo_num', 'orden')
+    CAMPOS = __slots__[:-2]
+
+    def __init__(self, id, curso_id, profesor_id, semestre, codigo_seccion, turno, cupos_disponibles,
+                 curso_codigo, curso_nombre, ciclo, creditos, tipo, popularidad, orden=0):
+        self.id = id
+        self.curso_id = curso_id
+        self.profesor_id = profesor_id
+        self.semestre = semestre
+        self.codigo_seccion = codigo_seccion
+        self.turno = turno
+        self.cupos_disponibles = cupos_disponibles
+        self.curso_codigo = curso_codigo
+        self.curso_nombre = curso_nombre
+        self.ciclo = ciclo
+        self.creditos = creditos
+        self.tipo = tipo
+        self.popularidad = popularidad
+        self.ciclo_num = int(ciclo) if ciclo and ciclo.isdigit() else 0
+        self.orden = orden
+
+class Matricula(_Registro):
+    """Matrícula con fecha, nota y estado codificados como enteros."""
+
+    __slots__ = ('alumno_id', 'curso_ofertado_id', '_fecha', '_nota', '_estado')
+    CAMPOS = ('alumno_id', 'curso_ofertado_id', 'fecha_matricula', 'nota_final', 'estado')
+
+    def __init__(self, alumno_id, curso_ofertado_id, fecha_matricula, nota_final, estado):
+        self.alumno_id = alumno_id
+        self.curso_ofertado_id = curso_ofertado_id
+        self._fecha = codificar_fecha(fecha_matricula)
+        self._nota = None if nota_final is None else round(nota_final * 100)
+        self._estado = CODIGO_ESTADO[estado]
+
+    @classmethod
+    def _desde_codigos(cls, alumno_id, curso_ofertado_id, fecha, nota, estado):
+        """Construye la matrícula con los valores ya codificados."""
+        matricula = cls.__new__(cls)
+        matricula.alumno_id = alumno_id
+        matricula.curso_ofertado_id = curso_ofertado_id
+        matricula._fecha = fecha
+        matricula._nota = nota
+        matricula._estado = estado
+        return matricula
+
+    @property
+    def fecha_matricula(self):
+        return decodificar_fecha(self._fecha)
+
+    @property
+    def nota_final(self):
+        return None if self._nota is None else self._nota / 100
+
+    @property
+    def estado(self):
+        return ESTADOS[self._estado]
+
+class TablaMatriculas:
+    """
+    Matrículas guardadas por columnas en array:
+    alumno_id/curso_ofertado_id int32, fecha int16 (días desde 2000-01-01),
+    nota int16 (centésimas, -1 = sin nota) y estado int8.
+    """
+
+    def __init__(self, matriculas=()):
+        self.alumno_id = array('i')
+        self.curso_ofertado_id = array('i')
+        self.fecha = array('h')
+        self.nota = array('h')
+        self.estado = array('b')
+        self.extend(matriculas)
+
+    def agregar(self, matricula):
+        """Agrega una Matricula (o una fila con las mismas claves)."""
+        self.alumno_id.append(matricula['alumno_id'])
+        self.curso_ofertado_id.append(matricula['curso_ofertado_id'])
+        self.fecha.append(codificar_fecha(matricula['fecha_matricula']))
+        nota = matricula['nota_final']
+        self.nota.append(SIN_NOTA if nota is None else round(nota * 100))
+        self.estado.append(CODIGO_ESTADO[matricula['estado']])
+
+    def extend(self, matriculas):
+        for matricula in matriculas:
+            self.agregar(matricula)
+
+    def __len__(self):
+        return len(self.alumno_id)
+
+    def __getitem__(self, i):
+        nota = self.nota[i]
+        return Matricula._desde_codigos(
+            self.alumno_id[i],
+            self.curso_ofertado_id[i],
+            self.fecha[i],
+            None if nota == SIN_NOTA else nota,
+            self.estado[i]
+        )
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def nbytes(self):
+        """Bytes ocupados por las columnas."""
+        return sum(
+            columna.itemsize * len(columna)
+            for columna in (self.alumno_id, self.curso_ofertado_id, self.fecha, self.nota, self.estado)
+        )
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Popularidad de profesores "a la fecha" (point-in-time) por semestre.
+
+La popularidad de un profesor en el semestre S se calcula solo con las notas
+de semestres anteriores a S, para no filtrar notas futuras en filas pasadas.
+
+Se construye en una única pasada cronológica manteniendo, por profesor, la
+suma acumulada de notas y los conteos de aprobados/desaprobados. Al iniciar
+cada semestre se guarda una foto de la popularidad de todos los profesores con
+historial, de modo que cada consulta (profesor, semestre) es O(1).
+
+Uso:
+    historial = HistorialPopularidad.desde_bd(conn)
+    historial.popularidad(profesor_id, '2023-1')
+"""
+
+from bisect import bisect_left
+from collections import defaultdict
+
+from psycopg2.extras import RealDictCursor
+
+POPULARIDAD_POR_DEFECTO = 0.75
+
+# Notas por profesor y semestre; parámetros (hasta_semestre, hasta_semestre)
+SQL_HISTORIAL = """
+    SELECT
+        co.semestre,
+        co.profesor_id,
+        SUM(m.nota_final) as suma_notas,
+        COUNT(CASE WHEN m.estado = 'Aprobado' THEN 1 END) as aprobados,
+        COUNT(CASE WHEN m.estado = 'Desaprobado' THEN 1 END) as desaprobados
+    FROM matricula m
+    JOIN curso_ofertado co ON m.curso_ofertado_id = co.id
+    WHERE m.estado IN ('Aprobado', 'Desaprobado')
+    AND co.profesor_id IS NOT NULL
+    AND (%s IS NULL OR co.semestre < %s)
+    GROUP BY co.semestre, co.profesor_id
+    ORDER BY co.semestre
+"""
+
+def normalizar_popularidad(promedio_notas, tasa_aprobacion):
+    """Convierte nota promedio y tasa de aprobación de un profesor en popularidad (0.5-1.0)."""
+    if promedio_notas is None or tasa_aprobacion is None:
+        return POPULARIDAD_POR_DEFECTO
+
+    # Normalizar: nota promedio (escala 7-16 a 0-1) + tasa aprobación, dividido entre 2
+    nota_norm = (float(promedio_notas) - 7) / 9  # 7-16 -> 0-1
+    popularidad = (nota_norm + float(tasa_aprobacion)) / 2
+
+    return round(max(0.5, min(1.0, popularidad)), 2)
+
+class HistorialPopularidad:
+    """
+    Tabla acumulada de estadísticas por profesor, indexada por semestre.
+
+    Los semestres deben agregarse en orden cronológico con agregar_semestre().
+    """
+
+    def __init__(self):
+        # profesor_id -> [suma_notas, aprobados, desaprobados] acumulados
+        self._acumulado = defaultdict(lambda: [0.0, 0, 0])
+        # Popularidad con todos los semestres registrados hasta ahora
+        self._vigente = {}
+        # semestre -> {profesor_id: popularidad} al inicio del semestre
+        self._fotos = {}
+        self._semestres = []
+
+    @classmethod
+    def desde_bd(cls, conn, hasta_semestre=None):
+        """
+        Construye el historial con una sola consulta agrupada por profesor y semestre.
+
+        Args:
+            conn: Conexión a la base de datos
+            hasta_semestre: Si se indica, ignora semestres >= hasta_semestre
+        """
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(SQL_HISTORIAL, (hasta_semestre, hasta_semestre))
+            return cls.desde_filas(cur.fetchall())
+
+    @classmethod
+    def desde_filas(cls, filas):
+        """Construye el historial a partir de las filas de SQL_HISTORIAL."""
+        por_semestre = defaultdict(list)
+        for row in filas:
+            por_semestre[row['semestre']].append(
+                (row['profesor_id'], row['suma_notas'], row['aprobados'], row['desaprobados'])
+            )
+
+        historial = cls()
+        for semestre in sorted(por_semestre):
+            historial.agregar_semestre(semestre, por_semestre[semestre])
+        return historial
+
+    def agregar_semestre(self, semestre, resultados):
+        """
+        Registra los resultados de un semestre y avanza el acumulado.
+
+        Args:
+            semestre: Semestre 'YYYY-N', posterior a todos los ya registrados
+            resultados: Iterable de (profesor_id, suma_notas, aprobados, desaprobados)
+        """
+        if self._semestres and semestre <= self._semestres[-1]:
+            raise ValueError(f"Semestre {semestre} fuera de orden (último: {self._semestres[-1]})")
+
+        # Foto "a la fecha": solo semestres anteriores
+        self._fotos[semestre] = dict(self._vigente)
+        self._semestres.append(semestre)
+
+        for profesor_id, suma_notas, aprobados, desaprobados in resultados:
+            acumulado = self._acumulado[profesor_id]
+            acumulado[0] += float(suma_notas or 0)
+            acumulado[1] += aprobados
+            acumulado[2] += desaprobados
+
+            evaluados = acumulado[1] + acumulado[2]
+            if evaluados > 0:
+                self._vigente[profesor_id] = normalizar_popularidad(
+                    acumulado[0] / evaluados, acumulado[1] / evaluados
+                )
+
+    def popularidad(self, profesor_id, semestre, por_defecto=POPULARIDAD_POR_DEFECTO):
+        """
+        Popularidad del profesor con las notas de semestres anteriores a `semestre`.
+
+        Devuelve `por_defecto` si el profesor no tiene historial previo.
+        """
+        foto = self._fotos.get(semestre)
+        if foto is None:
+            # Semestre no registrado (p.ej. uno futuro): usar la foto siguiente,
+            # que solo contiene semestres anteriores, o el acumulado vigente
+            posicion = bisect_left(self._semestres, semestre)
+            if posicion == len(self._semestres):
+                foto = self._vigente
+            else:
+                foto = self._fotos[self._semestres[posicion]]
+        return foto.get(profesor_id, por_defecto)
@@ -1,14 +1,113 @@
-import psycopg2
-from psycopg2.extras import RealDictCursor
-
-# Configuración de la base de datos
-DB_CONFIG = {
-    'host': '172.232.188.183',
-    'port': 5435,
-    'user': 'admin',
-    'password': 'admin123',
-    'database': 'schedule_db'
-}
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Recalcula promedio (y en modo incremental créditos y ciclo relativo) de los alumnos.
+
+Por defecto recalcula el promedio de todos los alumnos con un AVG correlacionado.
+
+Con --incremental solo se recalculan los alumnos cuyas matrículas cambiaron:
+triggers por sentencia en matricula anotan sus ids en la tabla
+alumno_recalculo, y un único UPDATE ... FROM agrupado consume esa tabla y
+actualiza promedio, creditos_aprobados y ciclo_relativo (según
+CREDITOS_POR_CICLO de generar_matriculas.py). Los triggers y la tabla se
+crean con --instalar.
+
+No hace falta después de generar_matriculas.py --historial, que ya carga
+créditos, ciclo relativo y promedio finales junto con las matrículas.
+
+Uso:
+    python recalcular_promedios.py                 # todos los alumnos
+    python recalcular_promedios.py --instalar      # tabla y triggers de cambios
+    python recalcular_promedios.py --incremental   # solo alumnos con cambios
+"""
+
+import argparse
+
+from acceso_datos import conectar, describir
+from generar_matriculas import sql_ciclo_por_creditos
+
+# Alumnos con matrículas nuevas, modificadas o eliminadas desde el último recálculo
+SQL_INSTALAR = """
+CREATE TABLE IF NOT EXISTS alumno_recalculo (
+    alumno_id INTEGER PRIMARY KEY
+);
+
+-- Triggers por sentencia con tablas de transición: una inserción por alumno
+-- distinto en cada sentencia, no una por matrícula
+CREATE OR REPLACE FUNCTION fn_marcar_alumno_recalculo() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO alumno_recalculo (alumno_id)
+        SELECT DISTINCT alumno_id FROM nuevas
+        ON CONFLICT DO NOTHING;
+    ELSIF TG_OP = 'UPDATE' THEN
+        INSERT INTO alumno_recalculo (alumno_id)
+        SELECT alumno_id FROM nuevas UNION SELECT alumno_id FROM viejas
+        ON CONFLICT DO NOTHING;
+    ELSE
+        INSERT INTO alumno_recalculo (alumno_id)
+        SELECT DISTINCT alumno_id FROM viejas
+        ON CONFLICT DO NOTHING;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_marcar_alumno_recalculo ON matricula;
+DROP TRIGGER IF EXISTS trigger_marcar_alumno_recalculo_insercion ON matricula;
+DROP TRIGGER IF EXISTS trigger_marcar_alumno_recalculo_actualizacion ON matricula;
+DROP TRIGGER IF EXISTS trigger_marcar_alumno_recalculo_eliminacion ON matricula;
+
+CREATE TRIGGER trigger_marcar_alumno_recalculo_insercion
+    AFTER INSERT ON matricula
+    REFERENCING NEW TABLE AS nuevas
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_marcar_alumno_recalculo();
+CREATE TRIGGER trigger_marcar_alumno_recalculo_actualizacion
+    AFTER UPDATE ON matricula
+    REFERENCING OLD TABLE AS viejas NEW TABLE AS nuevas
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_marcar_alumno_recalculo();
+CREATE TRIGGER trigger_marcar_alumno_recalculo_eliminacion
+    AFTER DELETE ON matricula
+    REFERENCING OLD TABLE AS viejas
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_marcar_alumno_recalculo();
+"""
+
+# Consume alumno_recalculo y actualiza solo las filas que cambian
+SQL_INCREMENTAL = f"""
+WITH pendientes AS (
+    DELETE FROM alumno_recalculo RETURNING alumno_id
+),
+resumen AS (
+    SELECT p.alumno_id,
+           -- Redondeado como alumno.promedio para que IS DISTINCT FROM no vea diferencias falsas
+           COALESCE(ROUND(AVG(m.nota_final) FILTER (WHERE m.estado = 'Aprobado' AND m.nota_final >= 10), 2), 0) as promedio,
+           COALESCE(SUM(c.creditos) FILTER (WHERE m.estado = 'Aprobado'), 0) as creditos
+    FROM pendientes p
+    LEFT JOIN matricula m ON m.alumno_id = p.alumno_id
+    LEFT JOIN curso_ofertado co ON m.curso_ofertado_id = co.id
+    LEFT JOIN curso c ON co.curso_id = c.id
+    GROUP BY p.alumno_id
+),
+nuevos AS (
+    SELECT alumno_id, promedio, creditos, {sql_ciclo_por_creditos('creditos')} as ciclo
+    FROM resumen
+)
+UPDATE alumno a
+SET promedio = n.promedio,
+    creditos_aprobados = n.creditos,
+    ciclo_relativo = n.ciclo
+FROM nuevos n
+WHERE a.id = n.alumno_id
+AND (a.promedio, a.creditos_aprobados, a.ciclo_relativo) IS DISTINCT FROM (n.promedio, n.creditos, n.ciclo)
+"""
+
+parser = argparse.ArgumentParser(description="Recalcula promedios de alumnos")
+modo = parser.add_mutually_exclusive_group()
+modo.add_argument('--instalar', action='store_true',
+                  help="Crear la tabla alumno_recalculo y los triggers que la llenan")
+modo.add_argument('--incremental', action='store_true',
+                  help="Recalcular solo los alumnos con matrículas modificadas")
+args = parser.parse_args()
 
 print("=" * 80)
 print("RECALCULADOR DE PROMEDIOS")
@@ -16,9 +115,9 @@ print("=" * 80)
 print()
 
 # Conectar a la base de datos
-print("🔌 Conectando a la base de datos...")
+print(f"🔌 Conectando a la base de datos ({describir()})...")
 try:
-    conn = psycopg2.connect(**DB_CONFIG, cursor_factory=RealDictCursor)
+    conn = conectar(diccionarios=True)
     cur = conn.cursor()
     print("✓ Conexión exitosa")
 except Exception as e:
@@ -26,23 +125,58 @@ except Exception as e:
     exit(1)
 
 print()
-print("⚙️  Recalculando promedios de todos los alumnos...")
+if args.instalar:
+    print("⚙️  Instalando tabla alumno_recalculo y triggers trigger_marcar_alumno_recalculo_*...")
+    try:
+        cur.execute(SQL_INSTALAR)
+        # Los alumnos con matrículas anteriores al trigger quedan pendientes
+        cur.execute("""
+            INSERT INTO alumno_recalculo (alumno_id)
+            SELECT DISTINCT alumno_id FROM matricula
+            ON CONFLICT DO NOTHING
+        """)
+        conn.commit()
+        print(f"✓ Instalado ({cur.rowcount} alumnos marcados para el primer recálculo)")
+    except Exception as e:
+        conn.rollback()
+        print(f"✗ Error al instalar: {e}")
+        exit(1)
+    finally:
+        cur.close()
+        conn.close()
+    exit(0)
+
+if args.incremental:
+    print("⚙️  Recalculando alumnos con matrículas modificadas...")
+else:
+    print("⚙️  Recalculando promedios de todos los alumnos...")
 
 try:
-    # SQL para actualizar promedios
-    sql = """
-    UPDATE alumno a
-    SET promedio = (
-        SELECT COALESCE(AVG(m.nota_final), 0)
-        FROM matricula m
-        WHERE m.alumno_id = a.id
-        AND m.nota_final >= 10
-        AND m.estado = 'Aprobado'
-    )
-    """
-    cur.execute(sql)
-    conn.commit()
-    print(f"✓ {cur.rowcount} alumnos actualizados")
+    if args.incremental:
+        cur.execute("SELECT to_regclass('alumno_recalculo') IS NOT NULL as instalado")
+        if not cur.fetchone()['instalado']:
+            print("✗ Falta la tabla alumno_recalculo: ejecutar primero con --instalar")
+            exit(1)
+        cur.execute("SELECT COUNT(*) as pendientes FROM alumno_recalculo")
+        pendientes = cur.fetchone()['pendientes']
+        cur.execute(SQL_INCREMENTAL)
+        conn.commit()
+        print(f"✓ {pendientes} alumnos pendientes, {cur.rowcount} actualizados")
+    else:
+        # SQL para actualizar promedios
+        sql = """
+        UPDATE alumno a
+        SET promedio = (
+            SELECT COALESCE(AVG(m.nota_final), 0)
+            FROM matricula m
+            WHERE m.alumno_id = a.id
+            AND m.nota_final >= 10
+            AND m.estado = 'Aprobado'
+        )
+        """
+        cur.execute(sql)
+        conn.commit()
+        print(f"✓ {cur.rowcount} alumnos actualizados")
     
 except Exception as e:
     conn.rollback()
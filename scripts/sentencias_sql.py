@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lectura perezosa de archivos SQL, sentencia por sentencia.
+
+LectorSQL recorre las líneas del archivo y separa sentencias por ';' fuera de
+cadenas ('...', "..."), comentarios (--, /* */) y bloques $$ ... $$, sin leer
+el archivo completo a memoria.
+
+Los INSERT ... VALUES se entregan como InsertValues, cuyas filas también se
+leen de a una: un INSERT con millones de tuplas (como generar_matriculas.sql)
+se puede ejecutar en lotes acotados sin armar nunca la sentencia completa.
+
+Uso:
+    with open('generar_matriculas.sql', encoding='utf-8') as f:
+        for sentencia in LectorSQL(f):
+            if isinstance(sentencia, InsertValues):
+                for lote in sentencia.lotes(1000):
+                    cur.execute(lote)
+            else:
+                cur.execute(sentencia)
+"""
+
+import re
+
+# Inicio de todo lo que puede contener un ';' que no termina la sentencia
+TOKEN = re.compile(r"""[();'"]|--|/\*|\$(?:[A-Za-z_][A-Za-z_0-9]*)?\$""")
+ESPACIOS = re.compile(r'\s+')
+COMENTARIOS = re.compile(r'--[^\n]*|/\*.*?\*/', re.S)
+CABECERA_INSERT = re.compile(r'\s*INSERT\s+INTO\s.+\sVALUES\s*$', re.I | re.S)
+
+class ErrorSQL(ValueError):
+    """El archivo SQL no se puede separar en sentencias."""
+
+def _tiene_contenido(texto):
+    """Indica si el texto tiene algo más que espacios y comentarios."""
+    return bool(COMENTARIOS.sub('', texto).strip())
+
+class InsertValues:
+    """INSERT ... VALUES cuyas filas se leen a medida que se consumen."""
+
+    def __init__(self, cabecera):
+        self.cabecera = cabecera
+        # Texto después de la última fila (ON CONFLICT, RETURNING...); se
+        # conoce recién al terminar de leer las filas
+        self.cola = None
+        self._filas = iter(())
+
+    def filas(self):
+        """Iterador de las tuplas '(...)' en el orden del archivo."""
+        return self._filas
+
+    def lotes(self, tamano):
+        """
+        Sentencias INSERT con a lo sumo `tamano` filas cada una.
+
+        Raises:
+            ErrorSQL: si el INSERT tiene cláusulas después de VALUES y no cabe
+                en un solo lote (los lotes anteriores ya se enviaron sin ellas)
+        """
+        lote = []
+        enviados = 0
+        for fila in self._filas:
+            if len(lote) == tamano:
+                yield self._sentencia(lote)
+                enviados += 1
+                lote = []
+            lote.append(fila)
+
+        if self.cola and enviados:
+            raise ErrorSQL(f"No se puede dividir en lotes un INSERT con '{self.cola[:40]}' después de VALUES")
+        if lote:
+            yield self._sentencia(lote)
+
+    def _sentencia(self, filas):
+        sentencia = self.cabecera + '\n' + ',\n'.join(filas)
+        if self.cola:
+            sentencia += '\n' + self.cola
+        return sentencia
+
+class LectorSQL:
+    """Iterador de sentencias (str) e InsertValues a partir de líneas de texto SQL."""
+
+    def __init__(self, lineas):
+        self._lineas = iter(lineas)
+        self._texto = ''
+        self._pos = 0
+
+    def _leer_linea(self):
+        linea = next(self._lineas, None)
+        if linea is None:
+            return False
+        self._texto += linea
+        return True
+
+    def _descartar(self):
+        """Libera el texto ya consumido."""
+        self._texto = self._texto[self._pos:]
+        self._pos = 0
+
+    def _buscar(self, cadena, desde, contexto):
+        """Posición de `cadena` a partir de `desde`, leyendo más líneas si hace falta."""
+        while True:
+            posicion = self._texto.find(cadena, desde)
+            if posicion >= 0:
+                return posicion
+            desde = max(desde, len(self._texto) - len(cadena) + 1)
+            if not self._leer_linea():
+                raise ErrorSQL(f"Fin de archivo dentro de {contexto}")
+
+    def _fin_de(self, token, desde):
+        """Posición siguiente al cierre de la cadena, comentario o bloque $$ que abre `token`."""
+        if token in ("'", '"'):
+            while True:
+                posicion = self._buscar(token, desde, "una cadena")
+                if posicion + 1 == len(self._texto):
+                    self._leer_linea()
+                # Comilla duplicada = comilla escapada
+                if self._texto.startswith(token, posicion + 1):
+                    desde = posicion + 2
+                    continue
+                return posicion + 1
+        if token == '--':
+            posicion = self._texto.find('\n', desde)
+            return len(self._texto) if posicion < 0 else posicion + 1
+        if token == '/*':
+            return self._buscar('*/', desde, "un comentario") + 2
+        return self._buscar(token, desde, f"un bloque {token}") + len(token)
+
+    def _siguiente_token(self):
+        """Avanza hasta el próximo '(', ')' o ';' de código; None al final del archivo."""
+        while True:
+            m = TOKEN.search(self._texto, self._pos)
+            if m is None:
+                self._pos = len(self._texto)
+                if not self._leer_linea():
+                    return None
+                continue
+            token = m.group()
+            if token in ('(', ')', ';'):
+                self._pos = m.end()
+                return token, m.start()
+            self._pos = self._fin_de(token, m.end())
+
+    def _saltar_espacios(self):
+        """Salta espacios y comentarios; devuelve el siguiente carácter o None al final."""
+        while True:
+            m = ESPACIOS.match(self._texto, self._pos)
+            if m:
+                self._pos = m.end()
+            if self._pos >= len(self._texto):
+                if not self._leer_linea():
+                    return None
+                continue
+            if self._texto.startswith('--', self._pos) or self._texto.startswith('/*', self._pos):
+                token = self._texto[self._pos:self._pos + 2]
+                self._pos = self._fin_de(token, self._pos + 2)
+                continue
+            return self._texto[self._pos]
+
+    def _filas_values(self, insert):
+        """Genera las tuplas de un INSERT ... VALUES y deja su cola en insert.cola."""
+        caracter = self._saltar_espacios()
+        while caracter == '(':
+            inicio = self._pos
+            self._pos += 1
+            profundidad = 1
+            while profundidad:
+                resultado = self._siguiente_token()
+                if resultado is None:
+                    raise ErrorSQL("Fin de archivo dentro de una fila de VALUES")
+                if resultado[0] == '(':
+                    profundidad += 1
+                elif resultado[0] == ')':
+                    profundidad -= 1
+            yield self._texto[inicio:self._pos]
+            self._descartar()
+
+            caracter = self._saltar_espacios()
+            if caracter != ',':
+                break
+            self._pos += 1
+            caracter = self._saltar_espacios()
+
+        # Cola: lo que sigue a la última fila hasta el ';'
+        inicio = self._pos
+        profundidad = 0
+        while True:
+            resultado = self._siguiente_token()
+            if resultado is None:
+                fin = len(self._texto)
+                break
+            token, posicion = resultado
+            if token == '(':
+                profundidad += 1
+            elif token == ')':
+                profundidad -= 1
+            elif profundidad == 0:
+                fin = posicion
+                break
+        cola = self._texto[inicio:fin]
+        insert.cola = cola.strip() if _tiene_contenido(cola) else ''
+        self._descartar()
+
+    def __iter__(self):
+        profundidad = 0
+        while True:
+            resultado = self._siguiente_token()
+            if resultado is None:
+                if _tiene_contenido(self._texto):
+                    yield self._texto.strip()
+                return
+            token, posicion = resultado
+
+            if token == '(':
+                cabecera = self._texto[:posicion]
+                if profundidad == 0 and CABECERA_INSERT.match(COMENTARIOS.sub('', cabecera)):
+                    insert = InsertValues(cabecera.strip())
+                    self._pos = posicion
+                    insert._filas = self._filas_values(insert)
+                    yield insert
+                    # Si no se consumieron todas las filas, se descartan
+                    for _ in insert._filas:
+                        pass
+                    continue
+                profundidad += 1
+            elif token == ')':
+                profundidad = max(0, profundidad - 1)
+            elif profundidad == 0:
+                sentencia = self._texto[:posicion]
+                self._descartar()
+                if _tiene_contenido(sentencia):
+                    yield sentencia.strip()
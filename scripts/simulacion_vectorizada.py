@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Motor vectorizado (NumPy) de simulación de matrículas, semestre a semestre.
+
+Aplica las mismas reglas que generar_matriculas_alumno, pero en lugar de
+simular un alumno a la vez mantiene el estado de todos los alumnos en arreglos:
+- aprobados: matriz booleana alumnos x cursos
+- creditos / ciclo: vectores por alumno
+- ingreso: índice del primer semestre disponible en el que el alumno ya ingresó
+
+En cada semestre se avanza a todos los alumnos activos a la vez: elegibilidad
+(prerrequisitos por producto matricial, reglas de ciclo y electivos), selección
+de 5-7 cursos priorizando obligatorios del ciclo, y notas de generar_nota.
+Los datos generados son estadísticamente equivalentes a los del generador
+por alumno, aunque no idénticos fila a fila (el orden de sorteo es otro).
+
+Uso:
+    indice = IndiceCurricular([curso['id'] for curso in cursos], prerrequisitos)
+    simulador = SimuladorVectorizado(alumnos, cursos, indice,
+                                     cursos_ofertados_por_semestre, semilla=42)
+    matriculas = simulador.generar_matriculas()
+"""
+
+from bisect import bisect_left
+
+import numpy as np
+
+from elegibilidad import semestre_de_ingreso
+from modelos import Matricula
+from generar_matriculas import (
+    SEMESTRES_DISPONIBLES,
+    SEMESTRE_EN_CURSO,
+    CURSOS_POR_SEMESTRE_MIN,
+    CURSOS_POR_SEMESTRE_MAX,
+    TASA_APROBACION_BASE,
+    NOTA_APROBATORIA,
+    determinar_ciclo_relativo,
+)
+
+CREDITOS_EGRESO = 208
+
+class SimuladorVectorizado:
+    """Simulación por lotes de todos los alumnos, un semestre a la vez."""
+
+    def __init__(self, alumnos, cursos, indice_curricular, cursos_ofertados_por_semestre, semilla=None):
+        """
+        Args:
+            alumnos: Filas de alumno (id, codigo)
+            cursos: Filas de curso (id, ciclo, tipo, creditos)
+            indice_curricular: IndiceCurricular construido con los ids de `cursos`
+                en el mismo orden
+            cursos_ofertados_por_semestre: Índice de oferta de obtener_cursos_ofertados
+            semilla: Semilla del generador aleatorio
+        """
+        self.rng = np.random.default_rng(semilla)
+
+        # Cursos
+        self.indice_curso = {curso['id']: indice_curricular.posicion[curso['id']] for curso in cursos}
+        ciclos = [str(curso['ciclo'] or '') for curso in cursos]
+        self.ciclo_es_numero = np.array([ciclo.isdigit() for ciclo in ciclos])
+        self.ciclo_curso = np.array([int(ciclo) if ciclo.isdigit() else 0 for ciclo in ciclos], dtype=np.int16)
+        self.creditos_curso = np.array([curso['creditos'] for curso in cursos], dtype=np.int32)
+        self.es_obligatorio = np.array([curso['tipo'] == 'O' for curso in cursos])
+        self.es_electivo = np.array([curso['tipo'] == 'E' for curso in cursos])
+
+        num_cursos = len(cursos)
+        self.matriz_prereq, self.num_prereqs = indice_curricular.matriz_prerrequisitos()
+
+        # Oferta por semestre: una sección por curso (la primera, como el generador original)
+        self.ofertas = {}
+        for semestre, por_ciclo in cursos_ofertados_por_semestre.items():
+            seccion_id = np.zeros(num_cursos, dtype=np.int64)
+            popularidad = np.full(num_cursos, 0.5)
+            ofertado = np.zeros(num_cursos, dtype=bool)
+            for por_tipo in por_ciclo.values():
+                for por_curso in por_tipo.values():
+                    for curso_id, secciones in por_curso.items():
+                        c = self.indice_curso.get(curso_id)
+                        if c is None:
+                            continue
+                        ofertado[c] = True
+                        seccion_id[c] = secciones[0]['id']
+                        if secciones[0]['popularidad'] is not None:
+                            popularidad[c] = float(secciones[0]['popularidad'])
+            self.ofertas[semestre] = (ofertado, seccion_id, popularidad)
+
+        # Ciclo relativo por créditos (tabla precalculada con las mismas reglas)
+        self.tabla_ciclos = np.array(
+            [determinar_ciclo_relativo(creditos) for creditos in range(CREDITOS_EGRESO + 1)], dtype=np.int16
+        )
+
+        # Alumnos
+        self.alumno_ids = np.array([alumno['id'] for alumno in alumnos], dtype=np.int64)
+        codigos = [alumno['codigo'] for alumno in alumnos]
+        self.año_ingreso = np.array([int(codigo[:4]) for codigo in codigos], dtype=np.int32)
+        self.ingreso = np.array(
+            [bisect_left(SEMESTRES_DISPONIBLES, semestre_de_ingreso(codigo)) for codigo in codigos], dtype=np.int16
+        )
+
+        self._inicializar_estado()
+
+    def _ciclo(self, creditos):
+        return self.tabla_ciclos[np.minimum(creditos, CREDITOS_EGRESO)]
+
+    def _inicializar_estado(self):
+        """Créditos iniciales y cursos "ya aprobados" de alumnos anteriores a 2020-2."""
+        num_alumnos = len(self.alumno_ids)
+        num_cursos = len(self.creditos_curso)
+
+        # Igual que calcular_creditos_iniciales: ~22 créditos por semestre cursado ±15%
+        año_inicio, periodo_inicio = (int(x) for x in SEMESTRES_DISPONIBLES[0].split('-'))
+        semestres_cursados = (año_inicio - self.año_ingreso) * 2 + (1 if periodo_inicio == 2 else 0)
+        variacion = self.rng.uniform(0.85, 1.15, size=num_alumnos)
+        creditos = np.minimum((semestres_cursados * 22 * variacion).astype(np.int32), 206)
+        self.creditos = np.where(semestres_cursados > 0, creditos, 0).astype(np.int32)
+        self.ciclo = self._ciclo(self.creditos)
+
+        # Cursos de ciclos anteriores en orden aleatorio hasta cubrir los créditos iniciales
+        candidatos = (
+            self.ciclo_es_numero[None, :]
+            & (self.ciclo_curso[None, :] < self.ciclo[:, None])
+            & (self.creditos[:, None] > 0)
+        )
+        claves = self.rng.random((num_alumnos, num_cursos))
+        claves[~candidatos] = 2.0
+        orden = np.argsort(claves, axis=1)
+        candidatos_ordenados = np.take_along_axis(candidatos, orden, axis=1)
+        creditos_ordenados = self.creditos_curso[orden] * candidatos_ordenados
+        acumulado_previo = np.cumsum(creditos_ordenados, axis=1) - creditos_ordenados
+        incluir = candidatos_ordenados & (acumulado_previo < self.creditos[:, None])
+
+        self.aprobados = np.zeros((num_alumnos, num_cursos), dtype=bool)
+        np.put_along_axis(self.aprobados, orden, incluir, axis=1)
+
+    def _cursos_elegibles(self, activos, ofertado):
+        """Matriz activos x cursos con los cursos que cada alumno puede tomar."""
+        aprobados = self.aprobados[activos]
+        ciclo = self.ciclo[activos][:, None]
+
+        prereqs_cumplidos = (aprobados.astype(np.float32) @ self.matriz_prereq.T) >= self.num_prereqs
+        por_ciclo = np.where(
+            ciclo < 6,
+            (self.ciclo_curso > 0) & (self.ciclo_curso <= ciclo),
+            (self.ciclo_curso <= ciclo) | self.es_electivo
+        )
+        return ofertado & ~aprobados & prereqs_cumplidos & por_ciclo
+
+    def _seleccionar(self, activos, elegibles):
+        """Todos los obligatorios del ciclo + un sorteo de otros cursos hasta 5-7."""
+        ciclo = self.ciclo[activos][:, None]
+        obligatorios = elegibles & self.es_obligatorio & (self.ciclo_curso == ciclo)
+        otros = elegibles & ~obligatorios
+
+        num_obligatorios = obligatorios.sum(axis=1)
+        num_otros = otros.sum(axis=1)
+        espacios = CURSOS_POR_SEMESTRE_MAX - num_obligatorios
+
+        minimo = np.maximum(1, CURSOS_POR_SEMESTRE_MIN - num_obligatorios)
+        sorteo = self.rng.integers(minimo, np.maximum(espacios, minimo) + 1)
+        adicionales = np.where(num_otros >= espacios, sorteo, num_otros)
+        adicionales = np.where((espacios > 0) & (num_otros > 0), adicionales, 0)
+
+        # Muestra uniforme sin reemplazo: los `adicionales` otros con menor clave aleatoria
+        claves = self.rng.random(otros.shape)
+        claves[~otros] = 2.0
+        rango = np.argsort(np.argsort(claves, axis=1), axis=1)
+        return obligatorios | (otros & (rango < adicionales[:, None]))
+
+    def _generar_notas(self, popularidad):
+        """Vectorización de generar_nota para un arreglo de popularidades."""
+        probabilidad_aprobar = np.clip(TASA_APROBACION_BASE + (popularidad - 0.5) * 0.2, 0.6, 0.95)
+        n = len(popularidad)
+        aprueba = self.rng.random(n) < probabilidad_aprobar
+        nota_baja = self.rng.random(n) < 0.7
+        nota = np.where(
+            aprueba,
+            np.where(nota_baja, self.rng.uniform(10.0, 12.5, n), self.rng.uniform(12.5, 16.0, n)),
+            self.rng.uniform(7.0, 9.9, n)
+        )
+        return np.round(nota, 2)
+
+    def simular_semestres(self):
+        """
+        Avanza a todos los alumnos semestre a semestre.
+
+        Genera tuplas (semestre, alumno_idx, curso_ofertado_id, nota_final) con
+        arreglos alineados; nota_final es NaN en el semestre en curso.
+        """
+        for t, semestre in enumerate(SEMESTRES_DISPONIBLES):
+            if semestre not in self.ofertas:
+                continue
+            ofertado, seccion_id, popularidad = self.ofertas[semestre]
+
+            activos = np.flatnonzero((self.ingreso <= t) & (self.creditos < CREDITOS_EGRESO))
+            if len(activos) == 0:
+                continue
+
+            seleccion = self._seleccionar(activos, self._cursos_elegibles(activos, ofertado))
+            filas, cursos = np.nonzero(seleccion)
+            alumno_idx = activos[filas]
+
+            if semestre == SEMESTRE_EN_CURSO:
+                notas = np.full(len(cursos), np.nan)
+            else:
+                notas = self._generar_notas(popularidad[cursos])
+                aprobado = notas >= NOTA_APROBATORIA
+                np.add.at(self.creditos, alumno_idx[aprobado], self.creditos_curso[cursos[aprobado]])
+                self.aprobados[alumno_idx[aprobado], cursos[aprobado]] = True
+
+            # Actualizar ciclo relativo después de cada semestre
+            self.ciclo = self._ciclo(self.creditos)
+
+            yield semestre, alumno_idx, seccion_id[cursos], notas
+
+    def iterar_matriculas(self):
+        """
+        Matrículas con el formato de generar_matriculas_alumno, entregadas como
+        flujo semestre a semestre (sin acumularlas).
+        """
+        for semestre, alumno_idx, curso_ofertado_ids, notas in self.simular_semestres():
+            año, periodo = semestre.split('-')
+            fecha = f"{año}-{'03' if periodo == '1' else '09'}-01"
+            for idx, curso_ofertado_id, nota in zip(alumno_idx.tolist(), curso_ofertado_ids.tolist(), notas.tolist()):
+                if nota != nota:  # NaN: semestre en curso, sin nota
+                    nota_final, estado = None, "Matriculado"
+                else:
+                    nota_final = nota
+                    estado = "Aprobado" if nota >= NOTA_APROBATORIA else "Desaprobado"
+                yield Matricula(int(self.alumno_ids[idx]), curso_ofertado_id, fecha, nota_final, estado)
+
+    def generar_matriculas(self):
+        """Ejecuta la simulación y devuelve las matrículas agrupadas por alumno."""
+        matriculas = list(self.iterar_matriculas())
+
+        # Agrupar por alumno como el generador original (orden estable por semestre)
+        orden_alumno = {alumno_id: i for i, alumno_id in enumerate(self.alumno_ids.tolist())}
+        matriculas.sort(key=lambda m: orden_alumno[m.alumno_id])
+        return matriculas
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""Pruebas de los codificadores binarios de COPY (carga_binaria.py)."""
+
+import struct
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from carga_binaria import NULO, _fecha, _numeric, _timestamp
+
+def decodificar_numeric(datos):
+    """(valor, escala) de un numeric en formato binario de COPY (con su longitud)."""
+    longitud, num_digitos, peso, signo, escala = struct.unpack('>ihhHH', datos[:12])
+    assert longitud == len(datos) - 4
+    digitos = struct.unpack(f'>{num_digitos}h', datos[12:])
+    assert all(0 <= d < 10000 for d in digitos)
+    valor = sum(Decimal(d) * Decimal(10000) ** (peso - i) for i, d in enumerate(digitos))
+    if signo == 0x4000:
+        valor = -valor
+    else:
+        assert signo == 0x0000
+    return valor, escala
+
+@pytest.mark.parametrize('escala, valor', [
+    (2, '12.50'),
+    (2, '0.05'),
+    (2, '20.00'),
+    (2, '-7.25'),
+    (0, '10000'),
+    (0, '123456789'),
+    (1, '9999.9'),
+    (4, '12345.6789'),
+    (5, '0.00001'),
+    (6, '-1.000001'),
+    (8, '10000.00000001'),
+])
+def test_numeric_ida_y_vuelta(escala, valor):
+    decodificado, escala_decodificada = decodificar_numeric(_numeric(escala)(valor))
+    assert decodificado == Decimal(valor)
+    assert escala_decodificada == escala
+
+def test_numeric_bytes_de_una_nota():
+    # 12.50 como numeric(4,2): dos grupos base 10000 (12 y 5000), peso 0
+    assert _numeric(2)(12.5) == struct.pack('>ihhHHhh', 12, 2, 0, 0x0000, 2, 12, 5000)
+
+def test_numeric_cero_sin_digitos_ni_signo():
+    for valor in (0, 0.0, '-0.00', 0.001):
+        assert _numeric(2)(valor) == struct.pack('>ihhHH', 8, 0, 0, 0x0000, 2)
+
+def test_numeric_redondea_a_la_escala():
+    assert decodificar_numeric(_numeric(2)(10.456))[0] == Decimal('10.46')
+    # Mitad hacia arriba en decimal, como numeric de PostgreSQL
+    assert decodificar_numeric(_numeric(0)(2.5))[0] == Decimal('3')
+    assert decodificar_numeric(_numeric(0)(-2.5))[0] == Decimal('-3')
+    assert decodificar_numeric(_numeric(2)(10.455))[0] == Decimal('10.46')
+    assert decodificar_numeric(_numeric(2)(Decimal('10.445')))[0] == Decimal('10.45')
+
+def test_numeric_grupos_alineados_al_punto():
+    # 1.5 con escala 1: la fracción ocupa el grupo 5000, no 0005
+    datos = _numeric(1)(1.5)
+    assert struct.unpack('>hh', datos[12:]) == (1, 5000)
+    # Ceros intermedios: 10000.0001 -> grupos 1, 0, 1 con peso 1
+    datos = _numeric(4)('10000.0001')
+    assert struct.unpack('>hhHH', datos[4:12]) == (3, 1, 0x0000, 4)
+    assert struct.unpack('>hhh', datos[12:]) == (1, 0, 1)
+
+@pytest.mark.parametrize('valor, dias', [
+    ('2000-01-01', 0),
+    ('2000-01-02', 1),
+    ('1999-12-31', -1),
+    ('2023-03-01', (date(2023, 3, 1) - date(2000, 1, 1)).days),
+    (date(2025, 9, 1), (date(2025, 9, 1) - date(2000, 1, 1)).days),
+])
+def test_fecha(valor, dias):
+    assert _fecha(valor) == struct.pack('>ii', 4, dias)
+
+def test_timestamp():
+    assert _timestamp('2000-01-01 00:00:01') == struct.pack('>iq', 8, 1_000_000)
+    assert _timestamp(date(2000, 1, 2)) == struct.pack('>iq', 8, 86_400_000_000)
+    assert _timestamp(datetime(1999, 12, 31, 23, 59, 59, 500000)) == struct.pack('>iq', 8, -500_000)
+
+def test_nulo():
+    assert NULO == struct.pack('>i', -1)
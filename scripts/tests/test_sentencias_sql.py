@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""Pruebas de LectorSQL e InsertValues (sentencias_sql.py)."""
+
+import io
+
+import pytest
+
+from sentencias_sql import ErrorSQL, InsertValues, LectorSQL
+
+def leer(texto):
+    """Sentencias del texto, con las filas de cada InsertValues ya consumidas."""
+    resultado = []
+    for sentencia in LectorSQL(io.StringIO(texto)):
+        if isinstance(sentencia, InsertValues):
+            resultado.append((sentencia.cabecera, list(sentencia.filas()), sentencia.cola))
+        else:
+            resultado.append(sentencia)
+    return resultado
+
+def test_separa_por_punto_y_coma():
+    assert leer("SELECT 1;\nSELECT 2;\n") == ["SELECT 1", "SELECT 2"]
+
+def test_ultima_sentencia_sin_punto_y_coma():
+    assert leer("SELECT 1;\nSELECT 2\n") == ["SELECT 1", "SELECT 2"]
+
+def test_punto_y_coma_dentro_de_cadenas():
+    texto = "SELECT 'a;b', 'it''s;';\nSELECT \"col;umna\" FROM t;\n"
+    assert leer(texto) == ["SELECT 'a;b', 'it''s;'", 'SELECT "col;umna" FROM t']
+
+def test_punto_y_coma_en_comentarios():
+    texto = "-- comentario; sin sentencia\nSELECT 1 /* otro; */;\n/* solo; comentario */\n"
+    assert leer(texto) == ["-- comentario; sin sentencia\nSELECT 1 /* otro; */"]
+
+def test_bloques_dollar_quoted():
+    funcion = (
+        "CREATE FUNCTION f() RETURNS trigger AS $$\n"
+        "BEGIN\n    UPDATE t SET x = 1;\n    RETURN NULL;\nEND;\n$$ LANGUAGE plpgsql"
+    )
+    etiquetado = "DO $cuerpo$ BEGIN PERFORM 1; END $cuerpo$"
+    assert leer(f"{funcion};\n{etiquetado};\nSELECT 2;\n") == [funcion, etiquetado, "SELECT 2"]
+
+def test_cadena_sin_cerrar():
+    with pytest.raises(ErrorSQL):
+        leer("SELECT 'sin cerrar;\n")
+
+def test_cadenas_y_bloques_de_varias_lineas():
+    texto = "SELECT 'primera;\nsegunda';\nSELECT $$\n;\n$$;\nINSERT INTO t (a) VALUES\n('x\n;y');\n"
+    assert leer(texto) == [
+        "SELECT 'primera;\nsegunda'",
+        "SELECT $$\n;\n$$",
+        ("INSERT INTO t (a) VALUES", ["('x\n;y')"], ''),
+    ]
+
+def test_insert_values_filas_y_cabecera():
+    texto = (
+        "INSERT INTO matricula (alumno_id, estado) VALUES\n"
+        "(1, 'Aprobado'),\n"
+        "(2, 'con ) y , y ;'),\n"
+        "(3, lower('X'));\n"
+        "SELECT 1;\n"
+    )
+    assert leer(texto) == [
+        ("INSERT INTO matricula (alumno_id, estado) VALUES",
+         ["(1, 'Aprobado')", "(2, 'con ) y , y ;')", "(3, lower('X'))"], ''),
+        "SELECT 1",
+    ]
+
+def test_insert_values_con_cola():
+    texto = "INSERT INTO t (a) VALUES (1), (2)\nON CONFLICT (a) DO NOTHING;\nSELECT 1;\n"
+    assert leer(texto) == [
+        ("INSERT INTO t (a) VALUES", ["(1)", "(2)"], "ON CONFLICT (a) DO NOTHING"),
+        "SELECT 1",
+    ]
+
+def test_insert_sin_consumir_no_desordena_el_resto():
+    texto = "INSERT INTO t (a) VALUES (1), (2);\nSELECT 1;\n"
+    sentencias = list(LectorSQL(io.StringIO(texto)))
+    assert isinstance(sentencias[0], InsertValues)
+    assert sentencias[1:] == ["SELECT 1"]
+
+def test_insert_select_no_es_insert_values():
+    assert leer("INSERT INTO t (a) SELECT (1);\n") == ["INSERT INTO t (a) SELECT (1)"]
+
+def test_lotes():
+    texto = "INSERT INTO t (a) VALUES (1), (2), (3);\n"
+    insert = next(iter(LectorSQL(io.StringIO(texto))))
+    assert list(insert.lotes(2)) == [
+        "INSERT INTO t (a) VALUES\n(1),\n(2)",
+        "INSERT INTO t (a) VALUES\n(3)",
+    ]
+
+def test_lotes_con_cola_en_un_solo_lote():
+    texto = "INSERT INTO t (a) VALUES (1), (2) RETURNING a;\n"
+    insert = next(iter(LectorSQL(io.StringIO(texto))))
+    assert list(insert.lotes(10)) == ["INSERT INTO t (a) VALUES\n(1),\n(2)\nRETURNING a"]
+
+def test_lotes_con_cola_que_no_cabe_en_un_lote():
+    texto = "INSERT INTO t (a) VALUES (1), (2), (3) ON CONFLICT DO NOTHING;\n"
+    insert = next(iter(LectorSQL(io.StringIO(texto))))
+    with pytest.raises(ErrorSQL):
+        list(insert.lotes(2))
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Universidad sintética a gran escala (varias carreras) para pruebas de carga.
+
+Genera N carreras, cada una con su propio plan de estudios (ciclos 1-10 con
+6 obligatorios, electivos de ciclos 6-9 y de ciclo 'E'), un DAG de
+prerrequisitos hacia ciclos anteriores, profesores, oferta por semestre,
+alumnos e historial de matrículas.
+
+Las reglas son las de los generadores existentes:
+- Códigos de alumno de generar_alumnos_masivo (únicos por construcción) y
+  el reparto Ordinario/CEPRE/Top 2 de generar_alumnos.MODALIDADES
+- Historial de cada alumno con generar_matriculas_alumno (créditos iniciales,
+  CREDITOS_POR_CICLO, priorización de obligatorios, generar_nota...), usando
+  flujos aleatorios por alumno: el resultado es el mismo con cualquier --procesos
+
+El esquema no tiene tabla de carreras: cada carrera se distingue por el prefijo
+de sus códigos de curso (U001-0103, U002-E1...) y los alumnos solo se
+matriculan en cursos de su carrera. carreras.csv resume los rangos de ids.
+
+La salida es un directorio con un CSV por tabla (ids explícitos, en el orden
+de las claves foráneas) y cargar.sql, que reemplaza el contenido de la BD con
+\\copy. Usar solo en una base de datos de pruebas.
+
+Uso:
+    python universo_sintetico.py [--carreras N] [--alumnos-por-semestre N]
+                                 [--profesores N] [--semilla S] [--procesos N]
+                                 [--salida DIR] [--gzip]
+
+Ejemplo (≈100k alumnos, ≈3M matrículas):
+    python universo_sintetico.py --carreras 10 --alumnos-por-semestre 600 --procesos 0
+    cd universo_sintetico && psql -d schedule_db -f cargar.sql
+"""
+
+import argparse
+import csv
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from generar_alumnos import SEMESTRES as SEMESTRES_INGRESO, NOMBRES, APELLIDOS
+from generar_alumnos_masivo import asignar_codigos, codigo_alumno, sortear_nombres
+from generar_matriculas import (
+    SEMESTRES_DISPONIBLES,
+    COLUMNAS_MATRICULA,
+    LOTES_EN_VUELO_POR_PROCESO,
+    abrir_salida,
+    generar_csv_copy,
+    generar_matriculas_alumno,
+    indexar_cursos_ofertados,
+    resultados_en_ventana,
+)
+from indice_curricular import IndiceCurricular
+from modelos import Alumno, Curso, CursoOfertado
+
+# Estructura del plan de estudios de cada carrera (como Telecomunicaciones)
+CICLOS = 10
+OBLIGATORIOS_POR_CICLO = 6
+CREDITOS_OBLIGATORIO = (3, 3, 4, 4, 5)
+ELECTIVOS_POR_CICLO = {6: 2, 7: 1, 8: 1, 9: 2, 'E': 2}
+CREDITOS_ELECTIVO = 3
+
+# Prerrequisitos: probabilidad de depender de un curso del ciclo anterior
+# y, además, de uno de dos ciclos antes
+PROB_PRERREQUISITO = 0.8
+PROB_PRERREQUISITO_LEJANO = 0.3
+
+SECCIONES = ('A', 'B')
+PROB_SEGUNDA_SECCION = 0.5
+TURNOS = ('Mañana', 'Tarde', 'Noche')
+CUPOS = (35, 40, 45)
+
+# Alumnos por tarea enviada al pool de procesos
+TAMANO_LOTE_ALUMNOS = 500
+
+COLUMNAS = {
+    'profesor': ('id', 'nombre', 'popularidad'),
+    'curso': ('id', 'codigo', 'nombre', 'tipo', 'ciclo', 'creditos'),
+    'curso_prerrequisito': ('curso_id', 'prereq_id'),
+    'curso_ofertado': ('id', 'curso_id', 'profesor_id', 'semestre', 'codigo_seccion', 'turno', 'cupos_disponibles'),
+    'alumno': ('id', 'codigo', 'nombres', 'apellidos', 'ciclo_relativo', 'creditos_aprobados', 'promedio', 'estado'),
+    'matricula': COLUMNAS_MATRICULA,
+}
+
+class Carrera:
+    """Plan de estudios, profesores y oferta de una carrera sintética."""
+
+    def __init__(self, numero, nombre):
+        self.numero = numero
+        self.nombre = nombre
+        self.prefijo = f"U{numero:03d}"
+        self.cursos = []             # Curso
+        self.prerrequisitos = {}     # curso_id -> [prereq_id]
+        self.profesores = []         # (id, nombre, popularidad)
+        self.cursos_ofertados = []   # CursoOfertado
+        self.alumnos = []            # Alumno
+
+    def indice_curricular(self):
+        return IndiceCurricular([curso.id for curso in self.cursos], self.prerrequisitos)
+
+    def oferta_indexada(self):
+        """Índice de oferta con el mismo orden que obtener_cursos_ofertados (semestre, ciclo, código)."""
+        ordenados = sorted(self.cursos_ofertados, key=lambda co: (co.semestre, co.ciclo, co.curso_codigo))
+        for orden, co in enumerate(ordenados):
+            co.orden = orden
+        return indexar_cursos_ofertados(ordenados)
+
+def generar_plan(carrera, rng, siguiente_curso_id):
+    """
+    Cursos y prerrequisitos de la carrera. Cada curso de ciclo n depende de
+    cursos de los ciclos n-1 y n-2, así que el grafo es acíclico.
+
+    Returns:
+        Siguiente id de curso libre
+    """
+    por_ciclo = {}
+    for ciclo in range(1, CICLOS + 1):
+        por_ciclo[ciclo] = []
+        for i in range(OBLIGATORIOS_POR_CICLO):
+            curso = Curso(
+                siguiente_curso_id,
+                f"{carrera.prefijo}-{ciclo:02d}{i}",
+                f"{carrera.nombre} - Curso {ciclo}-{i}",
+                'O',
+                str(ciclo),
+                rng.choice(CREDITOS_OBLIGATORIO)
+            )
+            siguiente_curso_id += 1
+            carrera.cursos.append(curso)
+            por_ciclo[ciclo].append(curso)
+
+            prereqs = set()
+            if ciclo > 1 and rng.random() < PROB_PRERREQUISITO:
+                prereqs.add(rng.choice(por_ciclo[ciclo - 1]).id)
+            if ciclo > 2 and rng.random() < PROB_PRERREQUISITO_LEJANO:
+                prereqs.add(rng.choice(por_ciclo[ciclo - 2]).id)
+            if prereqs:
+                carrera.prerrequisitos[curso.id] = sorted(prereqs)
+
+    for ciclo, cantidad in ELECTIVOS_POR_CICLO.items():
+        for i in range(cantidad):
+            curso = Curso(
+                siguiente_curso_id,
+                f"{carrera.prefijo}-{ciclo}{i}" if ciclo == 'E' else f"{carrera.prefijo}-{ciclo:02d}E{i}",
+                f"{carrera.nombre} - Electivo {ciclo}-{i}",
+                'E',
+                str(ciclo),
+                CREDITOS_ELECTIVO
+            )
+            siguiente_curso_id += 1
+            carrera.cursos.append(curso)
+            # Electivos numerados: un prerrequisito del ciclo anterior
+            if ciclo != 'E':
+                carrera.prerrequisitos[curso.id] = [rng.choice(por_ciclo[ciclo - 1]).id]
+
+    return siguiente_curso_id
+
+def generar_profesores(carrera, rng, cantidad, siguiente_profesor_id):
+    for _ in range(cantidad):
+        nombre = f"{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)}"
+        carrera.profesores.append((siguiente_profesor_id, nombre, round(rng.uniform(0.4, 0.95), 2)))
+        siguiente_profesor_id += 1
+    return siguiente_profesor_id
+
+def generar_oferta(carrera, rng, semestre, siguiente_oferta_id):
+    """Una o dos secciones de cada curso de la carrera en el semestre."""
+    for curso in carrera.cursos:
+        num_secciones = 2 if rng.random() < PROB_SEGUNDA_SECCION else 1
+        for seccion in SECCIONES[:num_secciones]:
+            profesor_id, _, popularidad = rng.choice(carrera.profesores)
+            carrera.cursos_ofertados.append(CursoOfertado(
+                siguiente_oferta_id, curso.id, profesor_id, semestre, seccion,
+                rng.choice(TURNOS), rng.choice(CUPOS),
+                curso.codigo, curso.nombre, curso.ciclo, curso.creditos, curso.tipo, popularidad
+            ))
+            siguiente_oferta_id += 1
+    return siguiente_oferta_id
+
+def asignar_alumnos(carreras, por_semestre, semilla):
+    """
+    Alumnos de todas las carreras: códigos de generar_alumnos_masivo para
+    por_semestre x carreras alumnos por semestre de ingreso, repartidos entre
+    las carreras en turno rotativo.
+    """
+    rng = np.random.default_rng(semilla)
+    alumno_id = 1
+    for _, año, digito, inicio, cantidad in asignar_codigos(SEMESTRES_INGRESO, por_semestre * len(carreras)):
+        nombres, apellidos = sortear_nombres(rng, cantidad)
+        for secuencia, nombre, apellido in zip(range(inicio, inicio + cantidad), nombres, apellidos):
+            carrera = carreras[(alumno_id - 1) % len(carreras)]
+            carrera.alumnos.append(Alumno(alumno_id, codigo_alumno(año, digito, secuencia), nombre, apellido, 1, 0, 0))
+            alumno_id += 1
+
+def generar_universo(num_carreras, por_semestre, profesores_por_carrera, semilla):
+    """Catálogo completo (carreras, cursos, profesores, oferta y alumnos), sin matrículas."""
+    rng = random.Random(semilla)
+    carreras = [Carrera(numero, f"Carrera {numero}") for numero in range(1, num_carreras + 1)]
+
+    siguiente_curso_id = 1
+    siguiente_profesor_id = 1
+    for carrera in carreras:
+        siguiente_curso_id = generar_plan(carrera, rng, siguiente_curso_id)
+        siguiente_profesor_id = generar_profesores(carrera, rng, profesores_por_carrera, siguiente_profesor_id)
+
+    siguiente_oferta_id = 1
+    for semestre in SEMESTRES_DISPONIBLES:
+        for carrera in carreras:
+            siguiente_oferta_id = generar_oferta(carrera, rng, semestre, siguiente_oferta_id)
+
+    asignar_alumnos(carreras, por_semestre, semilla)
+    return carreras
+
+# Planes de cada carrera en cada proceso del pool (se cargan una vez por proceso)
+_contexto_proceso = {}
+
+def _inicializar_proceso(carreras, semilla):
+    _contexto_proceso['semilla'] = semilla
+    _contexto_proceso['planes'] = {
+        carrera.numero: (carrera.oferta_indexada(), carrera.indice_curricular(), carrera.cursos)
+        for carrera in carreras
+    }
+
+def _simular_lote(tarea):
+    """Historial de matrículas de un lote de alumnos de una carrera."""
+    numero_carrera, alumnos = tarea
+    oferta, indice_curricular, cursos = _contexto_proceso['planes'][numero_carrera]
+    matriculas = []
+    for alumno in alumnos:
+        matriculas.extend(generar_matriculas_alumno(
+            alumno, oferta, indice_curricular, cursos, None,
+            semilla=_contexto_proceso['semilla'], mostrar_progreso=False
+        ))
+    return len(alumnos), matriculas
+
+def iterar_matriculas(carreras, semilla, procesos=None):
+    """
+    Matrículas de todas las carreras como flujo, carrera por carrera y en el
+    orden de sus alumnos. Con `procesos` los lotes se simulan en paralelo,
+    con a lo sumo LOTES_EN_VUELO_POR_PROCESO lotes por proceso en vuelo.
+    """
+    tareas = [
+        (carrera.numero, carrera.alumnos[i:i + TAMANO_LOTE_ALUMNOS])
+        for carrera in carreras
+        for i in range(0, len(carrera.alumnos), TAMANO_LOTE_ALUMNOS)
+    ]
+    total_alumnos = sum(len(carrera.alumnos) for carrera in carreras)
+    # Los procesos solo necesitan los planes: se envían sin la lista de alumnos
+    carreras_sin_alumnos = [_sin_alumnos(carrera) for carrera in carreras]
+
+    if procesos is None:
+        _inicializar_proceso(carreras_sin_alumnos, semilla)
+        resultados = map(_simular_lote, tareas)
+        executor = None
+    else:
+        procesos = procesos or os.cpu_count()
+        executor = ProcessPoolExecutor(
+            max_workers=procesos,
+            initializer=_inicializar_proceso,
+            initargs=(carreras_sin_alumnos, semilla)
+        )
+        resultados = resultados_en_ventana(
+            executor, _simular_lote, tareas, procesos * LOTES_EN_VUELO_POR_PROCESO
+        )
+
+    try:
+        procesados = 0
+        for num_alumnos, matriculas in resultados:
+            procesados += num_alumnos
+            print(f"  Progreso: {procesados:,}/{total_alumnos:,} alumnos simulados...")
+            yield from matriculas
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+def _sin_alumnos(carrera):
+    """Copia de la carrera sin su lista de alumnos, para enviarla a los procesos."""
+    copia = Carrera(carrera.numero, carrera.nombre)
+    copia.cursos = carrera.cursos
+    copia.prerrequisitos = carrera.prerrequisitos
+    copia.cursos_ofertados = carrera.cursos_ofertados
+    return copia
+
+def escribir_csv(ruta, columnas, filas, comprimir=False):
+    """CSV con cabecera para COPY; devuelve el número de filas escritas."""
+    total = 0
+    with abrir_salida(ruta, comprimir) as f:
+        escritor = csv.writer(f)
+        escritor.writerow(columnas)
+        for fila in filas:
+            escritor.writerow(fila)
+            total += 1
+    return total
+
+def escribir_script_carga(directorio, archivos):
+    """cargar.sql: reemplaza las tablas con los CSV generados (psql, desde el directorio de salida)."""
+    with open(os.path.join(directorio, 'cargar.sql'), 'w', encoding='utf-8') as f:
+        f.write("-- Universo sintético generado por universo_sintetico.py\n")
+        f.write("-- REEMPLAZA todos los datos académicos: usar solo en una BD de pruebas\n")
+        f.write("\\set ON_ERROR_STOP on\n")
+        f.write("BEGIN;\n\n")
+        f.write("TRUNCATE TABLE log_ciclo_relativo, log_creditos, matricula, curso_ofertado, "
+                "curso_prerrequisito, curso, profesor, alumno RESTART IDENTITY CASCADE;\n\n")
+        for tabla, archivo in archivos.items():
+            origen = f"PROGRAM 'gzip -dc {archivo}'" if archivo.endswith('.gz') else f"'{archivo}'"
+            f.write(f"\\copy {tabla} ({', '.join(COLUMNAS[tabla])}) FROM {origen} WITH (FORMAT csv, HEADER)\n")
+        f.write("\n")
+        for tabla in archivos:
+            if 'id' in COLUMNAS[tabla]:
+                f.write(f"SELECT setval(pg_get_serial_sequence('{tabla}', 'id'), "
+                        f"(SELECT COALESCE(MAX(id), 1) FROM {tabla}));\n")
+        f.write("\nCOMMIT;\n")
+
+def main():
+    """Función principal."""
+    parser = argparse.ArgumentParser(description="Genera una universidad sintética de varias carreras")
+    parser.add_argument('--carreras', type=int, default=5,
+                        help="Número de carreras (por defecto 5)")
+    parser.add_argument('--alumnos-por-semestre', type=int, default=30,
+                        help="Alumnos por carrera y semestre de ingreso (por defecto 30)")
+    parser.add_argument('--profesores', type=int, default=25,
+                        help="Profesores por carrera (por defecto 25)")
+    parser.add_argument('--semilla', type=int, default=None,
+                        help="Semilla para reproducir el universo completo")
+    parser.add_argument('--procesos', type=int, default=None,
+                        help="Simular las matrículas con N procesos (0 = todos los núcleos)")
+    parser.add_argument('--salida', default='universo_sintetico',
+                        help="Directorio de salida (por defecto universo_sintetico)")
+    parser.add_argument('--gzip', action='store_true',
+                        help="Comprimir los CSV con gzip")
+    args = parser.parse_args()
+
+    # Los historiales por alumno necesitan una semilla explícita para ser reproducibles
+    if args.semilla is None:
+        args.semilla = random.randrange(2**32)
+        print(f"Semilla: {args.semilla}")
+
+    print("=" * 80)
+    print("UNIVERSIDAD SINTÉTICA - PRUEBAS DE CARGA")
+    print("=" * 80)
+    print()
+
+    inicio = time.perf_counter()
+    carreras = generar_universo(args.carreras, args.alumnos_por_semestre, args.profesores, args.semilla)
+    total_alumnos = sum(len(carrera.alumnos) for carrera in carreras)
+    print(f"✓ {len(carreras)} carreras, {sum(len(c.cursos) for c in carreras):,} cursos, "
+          f"{sum(len(c.profesores) for c in carreras):,} profesores, "
+          f"{sum(len(c.cursos_ofertados) for c in carreras):,} secciones, {total_alumnos:,} alumnos")
+
+    os.makedirs(args.salida, exist_ok=True)
+    extension = '.csv.gz' if args.gzip else '.csv'
+    archivos = {tabla: f"{tabla}{extension}" for tabla in COLUMNAS}
+    ruta = {tabla: os.path.join(args.salida, archivo) for tabla, archivo in archivos.items()}
+
+    print("\n📄 Escribiendo catálogo...")
+    escribir_csv(ruta['profesor'], COLUMNAS['profesor'],
+                 (profesor for carrera in carreras for profesor in carrera.profesores), args.gzip)
+    escribir_csv(ruta['curso'], COLUMNAS['curso'],
+                 ([curso[columna] for columna in COLUMNAS['curso']] for carrera in carreras for curso in carrera.cursos),
+                 args.gzip)
+    escribir_csv(ruta['curso_prerrequisito'], COLUMNAS['curso_prerrequisito'],
+                 ((curso_id, prereq_id) for carrera in carreras
+                  for curso_id, prereqs in carrera.prerrequisitos.items() for prereq_id in prereqs),
+                 args.gzip)
+    escribir_csv(ruta['curso_ofertado'], COLUMNAS['curso_ofertado'],
+                 ([co[columna] for columna in COLUMNAS['curso_ofertado']]
+                  for co in sorted((co for carrera in carreras for co in carrera.cursos_ofertados),
+                                   key=lambda co: co.id)),
+                 args.gzip)
+    escribir_csv(ruta['alumno'], COLUMNAS['alumno'],
+                 ((alumno.id, alumno.codigo, alumno.nombres, alumno.apellidos, 1, 0, 0.00, 'A')
+                  for alumno in sorted((a for carrera in carreras for a in carrera.alumnos), key=lambda a: a.id)),
+                 args.gzip)
+    escribir_csv(os.path.join(args.salida, 'carreras.csv'),
+                 ('carrera', 'prefijo', 'nombre', 'primer_curso_id', 'ultimo_curso_id', 'alumnos'),
+                 ((c.numero, c.prefijo, c.nombre, c.cursos[0].id, c.cursos[-1].id, len(c.alumnos)) for c in carreras))
+
+    print(f"\n🎓 Simulando matrículas de {total_alumnos:,} alumnos...")
+    matriculas = iterar_matriculas(carreras, args.semilla, args.procesos)
+    total_matriculas = generar_csv_copy(matriculas, ruta['matricula'], comprimir=args.gzip)
+
+    escribir_script_carga(args.salida, archivos)
+    segundos = time.perf_counter() - inicio
+
+    print("\n" + "=" * 80)
+    print("PROCESO COMPLETADO")
+    print("=" * 80)
+    print(f"📁 Directorio: {args.salida}")
+    print(f"📊 Total matrículas: {total_matriculas:,} ({segundos:.1f}s)")
+    print("\nSiguiente paso (BD de pruebas, reemplaza los datos):")
+    print(f"  cd {args.salida} && psql -d <base_de_datos> -f cargar.sql")
+    print("=" * 80)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Validación en memoria de las matrículas generadas, antes de cargarlas.
+
+En lugar de cargar el SQL y revisar después con verificar_duplicados.py o
+verificar_datos.py, el validador recorre el flujo de matrículas una sola vez
+(lista, generador o TablaMatriculas) con índices hash sobre la oferta y los
+alumnos y las máscaras de prerrequisitos de IndiceCurricular:
+
+- oferta / alumno: curso_ofertado_id y alumno_id existentes
+- duplicado: el mismo curso dos veces en un semestre
+- orden: semestres de cada alumno en orden y no anteriores a su ingreso
+- nota: estado coherente con nota_final (Matriculado solo en el semestre en curso)
+- fecha: fecha_matricula en el año del semestre
+- carga: más de CURSOS_POR_SEMESTRE_MAX cursos en un semestre
+- prerrequisito / repetido: curso sin los prerrequisitos aprobados en
+  semestres anteriores, o ya aprobado antes
+- creditos: créditos aprobados por encima del total del plan
+
+El estado por alumno es constante (semestre actual, máscaras de aprobados y
+cursos del semestre), así que la memoria no crece con el número de
+matrículas. Prerrequisitos y repetidos solo se comprueban para alumnos cuya
+historia completa está en el flujo: los que ingresaron después del año de
+SEMESTRES_DISPONIBLES[0] (los anteriores empiezan con cursos "ya aprobados"
+que no tienen matrícula) o aquellos cuyo estado inicial se pasa (modo
+incremental).
+
+Si alguna invariante falla, observar() lanza MatriculasInvalidas al terminar
+el flujo: dentro de carga_binaria.cargar_matriculas esto revierte el COPY.
+
+Uso:
+    from validar_matriculas import ValidadorMatriculas, MatriculasInvalidas
+    validador = ValidadorMatriculas(cursos_ofertados_por_semestre, indice, alumnos)
+    for m in validador.observar(matriculas):   # lanza MatriculasInvalidas
+        ...
+    validador.validar(tabla_matriculas)          # sin lanzar; devuelve True/False
+"""
+
+from collections import Counter
+
+from generar_matriculas import (
+    CURSOS_POR_SEMESTRE_MAX, NOTA_APROBATORIA, SEMESTRE_EN_CURSO, SEMESTRES_DISPONIBLES,
+    secciones_ofertadas, semestre_de_ingreso
+)
+
+INVARIANTES = {
+    'oferta': "curso_ofertado_id inexistente",
+    'alumno': "alumno_id inexistente",
+    'duplicado': "mismo curso dos veces en el semestre",
+    'orden': "semestre fuera de orden o anterior al ingreso",
+    'nota': "nota_final y estado inconsistentes",
+    'fecha': "fecha_matricula fuera del año del semestre",
+    'carga': f"más de {CURSOS_POR_SEMESTRE_MAX} cursos en el semestre",
+    'prerrequisito': "prerrequisitos no aprobados en semestres anteriores",
+    'repetido': "curso ya aprobado en un semestre anterior",
+    'creditos': "créditos aprobados por encima del total del plan",
+}
+
+# Año desde el cual los alumnos no reciben créditos iniciales (ver calcular_creditos_iniciales)
+AÑO_SIN_CREDITOS_INICIALES = int(SEMESTRES_DISPONIBLES[0][:4]) + 1
+
+class MatriculasInvalidas(Exception):
+    """Las matrículas no cumplen alguna invariante: la carga se bloquea."""
+
+    def __init__(self, validador):
+        self.validador = validador
+        super().__init__(validador.resumen())
+
+class _SeguimientoAlumno:
+    """Estado del alumno durante el recorrido."""
+
+    __slots__ = ('semestre', 'aprobados', 'aprobados_semestre', 'cursos_semestre', 'creditos', 'verificable')
+
+    def __init__(self, aprobados=0, creditos=0, verificable=False):
+        self.semestre = None
+        self.aprobados = aprobados            # Máscara de cursos aprobados en semestres anteriores
+        self.aprobados_semestre = 0           # Aprobados en el semestre actual
+        self.cursos_semestre = set()
+        self.creditos = creditos
+        self.verificable = verificable
+
+class ValidadorMatriculas:
+    """Comprueba las invariantes de las matrículas en una pasada lineal."""
+
+    def __init__(self, cursos_ofertados_por_semestre, indice_curricular, alumnos=None, estados=None,
+                 max_ejemplos=10, semestre_en_curso=SEMESTRE_EN_CURSO):
+        """
+        Args:
+            cursos_ofertados_por_semestre: Índice de obtener_cursos_ofertados
+            indice_curricular: IndiceCurricular con los prerrequisitos
+            alumnos: Alumnos con 'id' y 'codigo' (opcional: sin ellos no se
+                comprueban existencia ni semestre de ingreso)
+            estados: {alumno_id: EstadoAlumno} al empezar el flujo (modo
+                incremental); se copian, así que la simulación puede modificarlos
+            max_ejemplos: Matrículas de ejemplo que se guardan por invariante
+            semestre_en_curso: Único semestre con matrículas sin nota (en modo
+                incremental, el semestre que se simula)
+        """
+        self.indice = indice_curricular
+        self.secciones = {co.id: co for co in secciones_ofertadas(cursos_ofertados_por_semestre)}
+        creditos_por_curso = {co.curso_id: co.creditos for co in self.secciones.values()}
+        self.creditos_plan = sum(creditos_por_curso.values())
+
+        self.ingresos = None
+        if alumnos is not None:
+            self.ingresos = {a['id']: semestre_de_ingreso(a['codigo']) for a in alumnos}
+        self.iniciales = {
+            alumno_id: (estado.mascara_aprobados, estado.creditos)
+            for alumno_id, estado in (estados or {}).items()
+        }
+
+        self.max_ejemplos = max_ejemplos
+        self.semestre_en_curso = semestre_en_curso
+        self.alumnos = {}
+        self.matriculas = 0
+        self.violaciones = Counter()
+        self.ejemplos = {}
+
+    def _registrar(self, invariante, m):
+        self.violaciones[invariante] += 1
+        ejemplos = self.ejemplos.setdefault(invariante, [])
+        if len(ejemplos) < self.max_ejemplos:
+            ejemplos.append({campo: m[campo] for campo in ('alumno_id', 'curso_ofertado_id', 'fecha_matricula',
+                                                         'nota_final', 'estado')})
+
+    def _seguimiento(self, alumno_id):
+        if alumno_id in self.iniciales:
+            aprobados, creditos = self.iniciales[alumno_id]
+            return _SeguimientoAlumno(aprobados, creditos, verificable=True)
+        ingreso = self.ingresos.get(alumno_id) if self.ingresos is not None else None
+        verificable = ingreso is not None and int(ingreso[:4]) >= AÑO_SIN_CREDITOS_INICIALES
+        return _SeguimientoAlumno(verificable=verificable)
+
+    def _validar(self, m):
+        self.matriculas += 1
+        co = self.secciones.get(m['curso_ofertado_id'])
+        if co is None:
+            self._registrar('oferta', m)
+            return
+        alumno_id = m['alumno_id']
+        if self.ingresos is not None and alumno_id not in self.ingresos:
+            self._registrar('alumno', m)
+
+        s = self.alumnos.get(alumno_id)
+        if s is None:
+            s = self.alumnos[alumno_id] = self._seguimiento(alumno_id)
+            ingreso = self.ingresos.get(alumno_id) if self.ingresos is not None else None
+            if ingreso is not None and co.semestre < ingreso:
+                self._registrar('orden', m)
+
+        # Semestre nuevo: lo aprobado en el anterior habilita prerrequisitos
+        if s.semestre is None or co.semestre > s.semestre:
+            s.semestre = co.semestre
+            s.aprobados |= s.aprobados_semestre
+            s.aprobados_semestre = 0
+            s.cursos_semestre = set()
+        elif co.semestre < s.semestre:
+            self._registrar('orden', m)
+            return
+
+        if co.curso_id in s.cursos_semestre:
+            self._registrar('duplicado', m)
+        s.cursos_semestre.add(co.curso_id)
+        if len(s.cursos_semestre) == CURSOS_POR_SEMESTRE_MAX + 1:
+            self._registrar('carga', m)
+
+        nota, estado = m['nota_final'], m['estado']
+        if estado == 'Matriculado':
+            nota_valida = nota is None and co.semestre == self.semestre_en_curso
+        else:
+            nota_valida = nota is not None and 0 <= nota <= 20 and \
+                (estado == 'Aprobado') == (nota >= NOTA_APROBATORIA)
+        if not nota_valida:
+            self._registrar('nota', m)
+
+        if str(m['fecha_matricula'])[:4] != co.semestre[:4]:
+            self._registrar('fecha', m)
+
+        if s.verificable:
+            if not self.indice.cumple_prerrequisitos(co.curso_id, s.aprobados):
+                self._registrar('prerrequisito', m)
+            if self.indice.aprobado(co.curso_id, s.aprobados):
+                self._registrar('repetido', m)
+
+        if estado == 'Aprobado':
+            s.aprobados_semestre |= self.indice.bit(co.curso_id)
+            s.creditos += co.creditos
+            if s.creditos > self.creditos_plan and s.creditos - co.creditos <= self.creditos_plan:
+                self._registrar('creditos', m)
+
+    def observar(self, matriculas, bloquear=True):
+        """
+        Valida las matrículas a medida que pasan (se devuelven sin cambios).
+        Al terminar el flujo lanza MatriculasInvalidas si hubo violaciones y bloquear=True.
+        """
+        for m in matriculas:
+            self._validar(m)
+            yield m
+        if bloquear and not self.valido:
+            raise MatriculasInvalidas(self)
+
+    def validar(self, matriculas):
+        """Valida una colección completa sin lanzar; devuelve True si cumple todas las invariantes."""
+        for m in matriculas:
+            self._validar(m)
+        return self.valido
+
+    @property
+    def valido(self):
+        return not self.violaciones
+
+    def resumen(self):
+        """Texto con las violaciones por invariante y un ejemplo de cada una."""
+        if self.valido:
+            return f"{self.matriculas} matrículas válidas"
+        lineas = [f"{sum(self.violaciones.values())} violaciones en {self.matriculas} matrículas:"]
+        for invariante, cantidad in self.violaciones.most_common():
+            lineas.append(f"  - {invariante} ({INVARIANTES[invariante]}): {cantidad}, "
+                          f"ej. {self.ejemplos[invariante][0]}")
+        return "\n".join(lineas)
@@ -1,15 +1,8 @@
-import psycopg2
 from psycopg2.extras import RealDictCursor
 
-DB_CONFIG = {
-    'host': '172.232.188.183',
-    'port': 5435,
-    'database': 'schedule_db',
-    'user': 'admin',
-    'password': 'admin123'
-}
+from acceso_datos import conectar
 
-conn = psycopg2.connect(**DB_CONFIG)
+conn = conectar()
 
 print("=" * 80)
 print("ANÁLISIS DE BFI01")
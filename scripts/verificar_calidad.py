@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Verificación de calidad de datos en una sola pasada.
+
+Reúne en un registro de verificaciones lo que revisaban por separado
+verificar_datos.py, verificar_duplicados.py, verificar_bfi01.py,
+verificar_cobertura_bfi01.py, verificar_triggers.py y analizar_2022.py:
+
+- duplicados: mismo alumno, mismo curso y mismo semestre
+- consistencia: créditos aprobados y ciclo relativo de alumno contra sus
+  matrículas aprobadas y CREDITOS_POR_CICLO, por cohorte (año de ingreso)
+- cohortes: distribución de ciclo/créditos por cohorte y alumnos sin matrículas
+- cobertura: secciones sin alumnos y alumnos de ciclo 1 sin CURSO_COBERTURA
+- triggers: triggers de créditos y ciclo presentes y habilitados, sin que los
+  por fila y los por sentencia (verificar_triggers.py) sumen dos veces
+
+Todas las consultas ven la misma instantánea: la conexión principal exporta
+su snapshot (REPEATABLE READ) y las conexiones de trabajo lo importan, así
+que las verificaciones independientes corren en paralelo (un hilo por
+conexión del pool de acceso_datos.py) sobre datos consistentes aunque haya
+una carga en curso.
+Los agregados que usan varias verificaciones (resumen por alumno con un solo
+GROUP BY, alumnos por sección) se calculan una vez y se comparten.
+
+El resultado se imprime y, con --json, se guarda como reporte con el estado
+(ok / aviso / error), el detalle y los segundos de cada verificación.
+Termina con código 1 si alguna verificación da error.
+
+Uso:
+    python verificar_calidad.py [--solo NOMBRE ...] [--hilos N] [--json ARCHIVO]
+"""
+
+import argparse
+import json
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import psycopg2
+
+from acceso_datos import POOL_MAX, conectar
+from generar_matriculas import SEMESTRE_EN_CURSO, determinar_ciclo_relativo
+from verificar_triggers import TRIGGERS_LOTE, obtener_triggers
+
+# Curso de primer ciclo que deberían llevar todos los alumnos de ciclo 1
+CURSO_COBERTURA = 'BFI01'
+
+# Filas de ejemplo que se guardan en el detalle de cada verificación
+MAX_EJEMPLOS = 20
+
+VERIFICACIONES = {}
+AGREGADOS = {}
+
+def verificacion(nombre, descripcion):
+    """Registra una verificación: función(contexto) -> (estado, resumen, detalle)."""
+    def registrar(funcion):
+        VERIFICACIONES[nombre] = (descripcion, funcion)
+        return funcion
+    return registrar
+
+def agregado(nombre):
+    """Registra un agregado compartido: función(contexto) -> valor (se calcula una vez)."""
+    def registrar(funcion):
+        AGREGADOS[nombre] = funcion
+        return funcion
+    return registrar
+
+class Instantanea:
+    """
+    Conexiones de solo lectura que comparten un mismo snapshot.
+
+    La conexión principal abre una transacción REPEATABLE READ y exporta su
+    snapshot con pg_export_snapshot(); cada conexión de trabajo lo importa con
+    SET TRANSACTION SNAPSHOT. La principal debe seguir abierta mientras tanto.
+    """
+
+    def __init__(self, conexiones):
+        self.principal = self._conectar()
+        with self.principal.cursor() as cur:
+            cur.execute("SELECT pg_export_snapshot() as snapshot")
+            self.snapshot = cur.fetchone()['snapshot']
+
+        self._libres = queue.Queue()
+        self._todas = [self.principal]
+        for _ in range(conexiones):
+            conn = self._conectar()
+            with conn.cursor() as cur:
+                cur.execute("SET TRANSACTION SNAPSHOT %s", (self.snapshot,))
+            self._todas.append(conn)
+            self._libres.put(conn)
+
+    @staticmethod
+    def _conectar():
+        conn = conectar(diccionarios=True)
+        conn.set_session(isolation_level='REPEATABLE READ', readonly=True)
+        return conn
+
+    def tomar(self):
+        return self._libres.get()
+
+    def devolver(self, conn):
+        self._libres.put(conn)
+
+    def cerrar(self):
+        for conn in self._todas:
+            conn.rollback()
+            conn.close()
+
+class Contexto:
+    """Acceso de las verificaciones a la BD (conexión del hilo) y a los agregados."""
+
+    def __init__(self, instantanea):
+        self.instantanea = instantanea
+        self._local = threading.local()
+        self._agregados = {}
+        self._candados = {nombre: threading.Lock() for nombre in AGREGADOS}
+        self.tiempos_agregados = {}
+
+    def consultar(self, sql, params=None):
+        """Filas (diccionarios) de una consulta con la conexión del hilo."""
+        with self._local.conn.cursor() as cur:
+            cur.execute(sql, params)
+            return cur.fetchall()
+
+    def cursor(self):
+        """Cursor de tuplas sobre la conexión del hilo (para funciones de otros scripts)."""
+        return self._local.conn.cursor(cursor_factory=psycopg2.extensions.cursor)
+
+    def agregado(self, nombre):
+        """
+        Valor del agregado `nombre`. El primer hilo que lo pide lo calcula con
+        su propia conexión; los demás esperan al candado y reusan el resultado.
+        """
+        with self._candados[nombre]:
+            if nombre not in self._agregados:
+                inicio = time.perf_counter()
+                self._agregados[nombre] = AGREGADOS[nombre](self)
+                self.tiempos_agregados[nombre] = round(time.perf_counter() - inicio, 4)
+            return self._agregados[nombre]
+
+    def ejecutar(self, nombre):
+        """Ejecuta una verificación con una conexión libre; devuelve su entrada del reporte."""
+        descripcion, funcion = VERIFICACIONES[nombre]
+        conn = self.instantanea.tomar()
+        self._local.conn = conn
+        inicio = time.perf_counter()
+        try:
+            estado, resumen, detalle = funcion(self)
+        except Exception as e:
+            conn.rollback()
+            # Tras el error la transacción se pierde: se vuelve a importar el snapshot
+            with conn.cursor() as cur:
+                cur.execute("SET TRANSACTION SNAPSHOT %s", (self.instantanea.snapshot,))
+            estado, resumen, detalle = 'error', f"Falló la verificación: {str(e).splitlines()[0]}", []
+        finally:
+            self.instantanea.devolver(conn)
+        return {
+            'nombre': nombre,
+            'descripcion': descripcion,
+            'estado': estado,
+            'resumen': resumen,
+            'detalle': detalle,
+            'segundos': round(time.perf_counter() - inicio, 4),
+        }
+
+# ---------------------------------------------------------------------------
+# Agregados compartidos
+# ---------------------------------------------------------------------------
+
+@agregado('resumen_alumnos')
+def resumen_alumnos(ctx):
+    """Matrículas, aprobadas y créditos aprobados por alumno (un GROUP BY en lugar de subconsultas)."""
+    return ctx.consultar("""
+        SELECT a.id, a.codigo, LEFT(a.codigo, 4) as cohorte,
+               a.ciclo_relativo, a.creditos_aprobados,
+               COUNT(m.id) as matriculas,
+               COUNT(m.id) FILTER (WHERE m.estado = 'Aprobado') as aprobadas,
+               COALESCE(SUM(c.creditos) FILTER (WHERE m.estado = 'Aprobado'), 0) as creditos_matriculas
+        FROM alumno a
+        LEFT JOIN matricula m ON m.alumno_id = a.id
+        LEFT JOIN curso_ofertado co ON m.curso_ofertado_id = co.id
+        LEFT JOIN curso c ON co.curso_id = c.id
+        GROUP BY a.id
+        ORDER BY a.codigo
+    """)
+
+@agregado('alumnos_por_seccion')
+def alumnos_por_seccion(ctx):
+    """Alumnos matriculados en cada sección ofertada."""
+    return ctx.consultar("""
+        SELECT co.id, co.semestre, co.codigo_seccion, c.codigo as curso_codigo, c.ciclo,
+               COUNT(m.id) as alumnos
+        FROM curso_ofertado co
+        JOIN curso c ON co.curso_id = c.id
+        LEFT JOIN matricula m ON m.curso_ofertado_id = co.id
+        GROUP BY co.id, c.codigo, c.ciclo
+        ORDER BY co.semestre, c.codigo, co.codigo_seccion
+    """)
+
+# ---------------------------------------------------------------------------
+# Verificaciones
+# ---------------------------------------------------------------------------
+
+@verificacion('duplicados', "Mismo alumno matriculado dos veces en un curso en el mismo semestre")
+def verificar_duplicados(ctx):
+    duplicados = ctx.consultar("""
+        SELECT a.codigo, co.semestre, c.codigo as codigo_curso, COUNT(*) as veces
+        FROM matricula m
+        JOIN alumno a ON m.alumno_id = a.id
+        JOIN curso_ofertado co ON m.curso_ofertado_id = co.id
+        JOIN curso c ON co.curso_id = c.id
+        GROUP BY a.codigo, co.semestre, c.codigo
+        HAVING COUNT(*) > 1
+        ORDER BY veces DESC, a.codigo
+    """)
+    if duplicados:
+        return 'error', f"{len(duplicados)} matrículas duplicadas", duplicados[:MAX_EJEMPLOS]
+    return 'ok', "Sin duplicados de curso en el mismo semestre", []
+
+@verificacion('consistencia', "Créditos y ciclo relativo de alumno contra sus matrículas aprobadas")
+def verificar_consistencia(ctx):
+    por_cohorte = {}
+    ejemplos = []
+    for r in ctx.agregado('resumen_alumnos'):
+        cohorte = por_cohorte.setdefault(r['cohorte'], {'cohorte': r['cohorte'], 'alumnos': 0,
+                                                        'creditos_distintos': 0, 'ciclo_distinto': 0})
+        cohorte['alumnos'] += 1
+        creditos_ok = r['creditos_aprobados'] == r['creditos_matriculas']
+        ciclo_ok = r['ciclo_relativo'] == determinar_ciclo_relativo(r['creditos_aprobados'])
+        if not creditos_ok:
+            cohorte['creditos_distintos'] += 1
+        if not ciclo_ok:
+            cohorte['ciclo_distinto'] += 1
+        if not (creditos_ok and ciclo_ok) and len(ejemplos) < MAX_EJEMPLOS:
+            ejemplos.append({k: r[k] for k in ('codigo', 'ciclo_relativo', 'creditos_aprobados',
+                                               'creditos_matriculas')})
+
+    cohortes = [c for c in por_cohorte.values() if c['creditos_distintos'] or c['ciclo_distinto']]
+    if not cohortes:
+        return 'ok', f"{sum(c['alumnos'] for c in por_cohorte.values())} alumnos consistentes", []
+    creditos = sum(c['creditos_distintos'] for c in cohortes)
+    ciclo = sum(c['ciclo_distinto'] for c in cohortes)
+    return 'error', f"{creditos} alumnos con créditos distintos, {ciclo} con ciclo distinto", \
+        {'por_cohorte': cohortes, 'ejemplos': ejemplos}
+
+@verificacion('cohortes', "Distribución de ciclo y créditos por cohorte y alumnos sin matrículas")
+def verificar_cohortes(ctx):
+    año_en_curso = SEMESTRE_EN_CURSO.split('-')[0]
+    por_cohorte = {}
+    for r in ctx.agregado('resumen_alumnos'):
+        por_cohorte.setdefault(r['cohorte'], []).append(r)
+
+    detalle = []
+    sin_matriculas = 0
+    for cohorte, alumnos in sorted(por_cohorte.items()):
+        ciclos = [a['ciclo_relativo'] for a in alumnos]
+        creditos = [a['creditos_aprobados'] for a in alumnos]
+        vacios = sum(1 for a in alumnos if a['matriculas'] == 0)
+        # Las cohortes anteriores al año en curso deberían tener historia
+        if cohorte < año_en_curso:
+            sin_matriculas += vacios
+        detalle.append({
+            'cohorte': cohorte,
+            'alumnos': len(alumnos),
+            'ciclo': [min(ciclos), max(ciclos), round(sum(ciclos) / len(ciclos), 1)],
+            'creditos': [min(creditos), max(creditos), round(sum(creditos) / len(creditos), 1)],
+            'sin_matriculas': vacios,
+        })
+
+    if sin_matriculas:
+        return 'aviso', f"{sin_matriculas} alumnos de cohortes anteriores a {año_en_curso} sin matrículas", detalle
+    return 'ok', f"{len(detalle)} cohortes", detalle
+
+@verificacion('cobertura', f"Secciones sin alumnos y alumnos de ciclo 1 sin {CURSO_COBERTURA}")
+def verificar_cobertura(ctx):
+    secciones = [s for s in ctx.agregado('alumnos_por_seccion') if s['semestre'] < SEMESTRE_EN_CURSO]
+    vacias = {}
+    for s in secciones:
+        if s['alumnos'] == 0:
+            vacias[s['curso_codigo']] = vacias.get(s['curso_codigo'], 0) + 1
+
+    con_curso = {r['alumno_id'] for r in ctx.consultar("""
+        SELECT DISTINCT m.alumno_id
+        FROM matricula m
+        JOIN curso_ofertado co ON m.curso_ofertado_id = co.id
+        JOIN curso c ON co.curso_id = c.id
+        WHERE c.codigo = %s
+    """, (CURSO_COBERTURA,))}
+    ciclo1 = [r for r in ctx.agregado('resumen_alumnos') if r['ciclo_relativo'] == 1]
+    sin_curso = [r['codigo'] for r in ciclo1 if r['id'] not in con_curso]
+
+    detalle = {
+        'secciones': len(secciones),
+        'secciones_sin_alumnos': sum(vacias.values()),
+        'secciones_sin_alumnos_por_curso': dict(sorted(vacias.items(), key=lambda x: -x[1])[:MAX_EJEMPLOS]),
+        'alumnos_ciclo1': len(ciclo1),
+        f'ciclo1_sin_{CURSO_COBERTURA}': len(sin_curso),
+        'ejemplos': sin_curso[:MAX_EJEMPLOS],
+    }
+    cobertura = 100 * (len(ciclo1) - len(sin_curso)) / len(ciclo1) if ciclo1 else 100.0
+    resumen = f"Cobertura de {CURSO_COBERTURA} en ciclo 1: {cobertura:.1f}%, " \
+              f"{sum(vacias.values())} secciones sin alumnos"
+    return ('aviso' if sin_curso or vacias else 'ok'), resumen, detalle
+
+@verificacion('triggers', "Triggers de créditos y ciclo relativo presentes y habilitados")
+def verificar_estado_triggers(ctx):
+    with ctx.cursor() as cur:
+        por_tabla = {tabla: obtener_triggers(cur, tabla) for tabla in ('alumno', 'matricula')}
+
+    detalle = [
+        {'tabla': tabla, 'nombre': nombre, 'funcion': funcion, 'por_fila': por_fila,
+         'eventos': eventos, 'habilitado': habilitado}
+        for tabla, triggers in por_tabla.items()
+        for nombre, funcion, por_fila, eventos, _, habilitado in triggers
+    ]
+    problemas = []
+
+    ciclo = [t for t in detalle if t['tabla'] == 'alumno' and t['nombre'] == 'trigger_actualizar_ciclo_relativo']
+    if not ciclo or not ciclo[0]['habilitado']:
+        problemas.append("alumno.trigger_actualizar_ciclo_relativo no instalado o desactivado")
+
+    # Triggers de créditos: el juego por sentencia o los por fila, pero no ambos
+    lote = {nombre for tabla, nombre in TRIGGERS_LOTE if tabla == 'matricula'}
+    creditos = [t for t in detalle if t['tabla'] == 'matricula' and t['habilitado']
+                and 'INSERT' in t['eventos'] and 'creditos' in t['funcion']]
+    por_sentencia = [t for t in creditos if t['nombre'] in lote]
+    por_fila = [t for t in creditos if t['nombre'] not in lote and t['por_fila']]
+    if not creditos:
+        problemas.append("matricula no tiene un trigger de créditos habilitado")
+    elif por_sentencia and por_fila:
+        problemas.append("triggers de créditos por fila y por sentencia habilitados a la vez "
+                         f"({', '.join(t['nombre'] for t in por_fila)})")
+
+    if problemas:
+        return 'error', '; '.join(problemas), detalle
+    nivel = "por sentencia" if por_sentencia else "por fila"
+    return 'ok', f"Triggers de créditos {nivel} habilitados", detalle
+
+# ---------------------------------------------------------------------------
+
+def ejecutar_verificaciones(nombres, hilos):
+    """
+    Ejecuta las verificaciones `nombres` en paralelo sobre una misma instantánea.
+    Los hilos se limitan a POOL_MAX - 1 (la conexión principal también es del pool).
+
+    Returns:
+        Reporte (diccionario serializable a JSON)
+    """
+    inicio = time.perf_counter()
+    hilos = min(hilos, len(nombres), POOL_MAX - 1)
+    instantanea = Instantanea(hilos)
+    try:
+        contexto = Contexto(instantanea)
+        with ThreadPoolExecutor(max_workers=hilos) as executor:
+            resultados = list(executor.map(contexto.ejecutar, nombres))
+    finally:
+        instantanea.cerrar()
+
+    return {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'snapshot': instantanea.snapshot,
+        'segundos': round(time.perf_counter() - inicio, 4),
+        'agregados': contexto.tiempos_agregados,
+        'verificaciones': resultados,
+    }
+
+def imprimir_reporte(reporte):
+    """Resumen legible del reporte."""
+    iconos = {'ok': '✅', 'aviso': '⚠️ ', 'error': '❌'}
+    for r in reporte['verificaciones']:
+        print(f"{iconos[r['estado']]} {r['nombre']:<14} {r['segundos']:>8.3f}s  {r['resumen']}")
+    print()
+    for nombre, segundos in reporte['agregados'].items():
+        print(f"   agregado {nombre}: {segundos:.3f}s")
+    print(f"   Total: {reporte['segundos']:.3f}s (snapshot {reporte['snapshot']})")
+
+def main():
+    """Función principal."""
+    parser = argparse.ArgumentParser(description="Verifica la calidad de los datos en una sola pasada")
+    parser.add_argument('--solo', nargs='+', choices=list(VERIFICACIONES), default=None, metavar='NOMBRE',
+                        help=f"Ejecutar solo estas verificaciones ({', '.join(VERIFICACIONES)})")
+    parser.add_argument('--hilos', type=int, default=4,
+                        help="Verificaciones en paralelo (una conexión por hilo, por defecto 4)")
+    parser.add_argument('--json', default=None, metavar='ARCHIVO',
+                        help="Guardar el reporte en ARCHIVO ('-' para imprimirlo en stdout)")
+    args = parser.parse_args()
+
+    nombres = args.solo or list(VERIFICACIONES)
+
+    if args.json != '-':
+        print("=" * 80)
+        print("VERIFICACIÓN DE CALIDAD DE DATOS")
+        print("=" * 80)
+        print()
+
+    try:
+        reporte = ejecutar_verificaciones(nombres, max(1, args.hilos))
+    except psycopg2.Error as e:
+        print(f"✗ Error al conectar a la base de datos: {e}")
+        sys.exit(1)
+
+    if args.json == '-':
+        json.dump(reporte, sys.stdout, ensure_ascii=False, indent=2, default=str)
+        print()
+    else:
+        imprimir_reporte(reporte)
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(reporte, f, ensure_ascii=False, indent=2, default=str)
+            print(f"📄 Reporte guardado en {args.json}")
+        print("=" * 80)
+
+    if any(r['estado'] == 'error' for r in reporte['verificaciones']):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -1,23 +1,14 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import psycopg2
-from psycopg2.extras import RealDictCursor
-
-DB_CONFIG = {
-    'host': '172.232.188.183',
-    'port': 5435,
-    'database': 'schedule_db',
-    'user': 'admin',
-    'password': 'admin123'
-}
+from acceso_datos import conectar
 
 print("=" * 80)
 print("VERIFICACIÓN DE DUPLICADOS - MISMO CURSO EN MISMO SEMESTRE")
 print("=" * 80)
 
 try:
-    conn = psycopg2.connect(**DB_CONFIG, cursor_factory=RealDictCursor)
+    conn = conectar(diccionarios=True)
     cur = conn.cursor()
     
     # Buscar duplicados: mismo alumno, mismo curso_id, mismo semestre
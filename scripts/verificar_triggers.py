@@ -1,48 +1,402 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+"""
+Verifica (e instala) los triggers de alumno y matricula.
+
+Sin argumentos lista los triggers de ambas tablas (nivel fila/sentencia,
+tablas de transición y estado) y comprueba si está instalado el juego de
+triggers por sentencia para cargas masivas:
+
+- trigger_matricula_creditos_{insercion,actualizacion,eliminacion}: con
+  REFERENCING NEW/OLD TABLE suman los créditos aprobados netos de cada alumno
+  una sola vez por sentencia (un UPDATE de alumno por alumno, no por matrícula)
+- trigger_actualizar_ciclo_relativo: mismo nombre que el trigger por fila que
+  reemplaza (la carga lo sigue desactivando alrededor del reset de créditos);
+  registra en log_creditos / log_ciclo_relativo los cambios de la sentencia y
+  actualiza ciclo_relativo según CREDITOS_POR_CICLO
+
+Con un INSERT masivo, log_creditos recibe una fila por alumno con el total de
+la sentencia en lugar de una fila por matrícula aprobada.
+
+Uso:
+    python verificar_triggers.py                               # listar y verificar
+    python verificar_triggers.py --instalar [--desactivar-por-fila]
+    python verificar_triggers.py --probar                      # prueba en una transacción revertida
+
+--instalar se detiene si matricula tiene otros triggers por fila (por ejemplo
+el trigger de créditos anterior), porque sumarían los créditos dos veces; con
+--desactivar-por-fila se desactivan (ALTER TABLE ... DISABLE TRIGGER).
+"""
+
+import argparse
+import sys
 
 import psycopg2
 
-DB_CONFIG = {
-    'host': '172.232.188.183',
-    'port': 5435,
-    'database': 'schedule_db',
-    'user': 'admin',
-    'password': 'admin123'
-}
-
-print("=" * 80)
-print("TRIGGERS EN TABLA ALUMNO")
-print("=" * 80)
-
-try:
-    conn = psycopg2.connect(**DB_CONFIG)
-    cur = conn.cursor()
-    
-    # Consultar triggers
-    cur.execute("""
-        SELECT tgname, proname as function_name, tgenabled
+from acceso_datos import conectar
+from generar_matriculas import determinar_ciclo_relativo, sql_ciclo_por_creditos
+
+# Triggers por sentencia que instala --instalar: (tabla, nombre)
+TRIGGERS_LOTE = [
+    ('matricula', 'trigger_matricula_creditos_insercion'),
+    ('matricula', 'trigger_matricula_creditos_actualizacion'),
+    ('matricula', 'trigger_matricula_creditos_eliminacion'),
+    ('alumno', 'trigger_actualizar_ciclo_relativo'),
+]
+
+# Créditos de las matrículas aprobadas de una tabla de transición, por alumno
+_CREDITOS_APROBADOS = """
+    SELECT t.alumno_id, {signo}c.creditos as creditos
+    FROM {tabla} t
+    JOIN curso_ofertado co ON t.curso_ofertado_id = co.id
+    JOIN curso c ON co.curso_id = c.id
+    WHERE t.estado = 'Aprobado'
+"""
+
+SQL_FUNCIONES = f"""
+CREATE OR REPLACE FUNCTION fn_matricula_creditos_lote() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE alumno a
+        SET creditos_aprobados = a.creditos_aprobados + d.creditos
+        FROM (
+            SELECT alumno_id, SUM(creditos) as creditos
+            FROM ({_CREDITOS_APROBADOS.format(signo='', tabla='nuevas')}) x
+            GROUP BY alumno_id
+        ) d
+        WHERE a.id = d.alumno_id;
+    ELSIF TG_OP = 'UPDATE' THEN
+        UPDATE alumno a
+        SET creditos_aprobados = a.creditos_aprobados + d.creditos
+        FROM (
+            SELECT alumno_id, SUM(creditos) as creditos
+            FROM ({_CREDITOS_APROBADOS.format(signo='', tabla='nuevas')}
+                  UNION ALL
+                  {_CREDITOS_APROBADOS.format(signo='-', tabla='viejas')}) x
+            GROUP BY alumno_id
+            HAVING SUM(creditos) <> 0
+        ) d
+        WHERE a.id = d.alumno_id;
+    ELSE
+        UPDATE alumno a
+        SET creditos_aprobados = a.creditos_aprobados - d.creditos
+        FROM (
+            SELECT alumno_id, SUM(creditos) as creditos
+            FROM ({_CREDITOS_APROBADOS.format(signo='', tabla='viejas')}) x
+            GROUP BY alumno_id
+        ) d
+        WHERE a.id = d.alumno_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION fn_actualizar_ciclo_relativo_lote() RETURNS trigger AS $$
+BEGIN
+    -- Los triggers por sentencia se disparan aunque la sentencia no cambie
+    -- filas: sin cambios de créditos no hay nada que registrar (esto corta
+    -- también la recursión del UPDATE de ciclo_relativo de más abajo)
+    IF NOT EXISTS (
+        SELECT 1
+        FROM nuevos n
+        JOIN viejos v ON v.id = n.id
+        WHERE n.creditos_aprobados IS DISTINCT FROM v.creditos_aprobados
+    ) THEN
+        RETURN NULL;
+    END IF;
+
+    INSERT INTO log_creditos (alumno_id, creditos_anteriores, creditos_nuevos)
+    SELECT n.id, v.creditos_aprobados, n.creditos_aprobados
+    FROM nuevos n
+    JOIN viejos v ON v.id = n.id
+    WHERE n.creditos_aprobados IS DISTINCT FROM v.creditos_aprobados;
+
+    WITH ciclos AS (
+        SELECT n.id, v.ciclo_relativo as ciclo_anterior,
+               {sql_ciclo_por_creditos('n.creditos_aprobados')} as ciclo_nuevo
+        FROM nuevos n
+        JOIN viejos v ON v.id = n.id
+        WHERE n.creditos_aprobados IS DISTINCT FROM v.creditos_aprobados
+    ),
+    actualizados AS (
+        UPDATE alumno a
+        SET ciclo_relativo = c.ciclo_nuevo
+        FROM ciclos c
+        WHERE a.id = c.id
+        AND a.ciclo_relativo IS DISTINCT FROM c.ciclo_nuevo
+    )
+    INSERT INTO log_ciclo_relativo (alumno_id, ciclo_anterior, ciclo_nuevo)
+    SELECT id, ciclo_anterior, ciclo_nuevo
+    FROM ciclos
+    WHERE ciclo_anterior IS DISTINCT FROM ciclo_nuevo;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+SQL_TRIGGERS = """
+DROP TRIGGER IF EXISTS trigger_matricula_creditos_insercion ON matricula;
+DROP TRIGGER IF EXISTS trigger_matricula_creditos_actualizacion ON matricula;
+DROP TRIGGER IF EXISTS trigger_matricula_creditos_eliminacion ON matricula;
+DROP TRIGGER IF EXISTS trigger_actualizar_ciclo_relativo ON alumno;
+
+CREATE TRIGGER trigger_matricula_creditos_insercion
+    AFTER INSERT ON matricula
+    REFERENCING NEW TABLE AS nuevas
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_matricula_creditos_lote();
+CREATE TRIGGER trigger_matricula_creditos_actualizacion
+    AFTER UPDATE ON matricula
+    REFERENCING OLD TABLE AS viejas NEW TABLE AS nuevas
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_matricula_creditos_lote();
+CREATE TRIGGER trigger_matricula_creditos_eliminacion
+    AFTER DELETE ON matricula
+    REFERENCING OLD TABLE AS viejas
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_matricula_creditos_lote();
+
+CREATE TRIGGER trigger_actualizar_ciclo_relativo
+    AFTER UPDATE ON alumno
+    REFERENCING OLD TABLE AS viejos NEW TABLE AS nuevos
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_actualizar_ciclo_relativo_lote();
+"""
+
+# Bits de pg_trigger.tgtype
+TIPO_FILA = 1
+EVENTOS = ((4, 'INSERT'), (8, 'DELETE'), (16, 'UPDATE'), (32, 'TRUNCATE'))
+
+def obtener_triggers(cur, tabla):
+    """
+    Triggers no internos de la tabla: (nombre, función, por_fila, eventos, transición, habilitado).
+    La consulta se prepara una vez por conexión y se reutiliza para cada tabla.
+    """
+    cur.connection.ejecutar_preparada(cur, """
+        SELECT tgname, proname as function_name, tgtype, tgoldtable, tgnewtable, tgenabled
         FROM pg_trigger t
         JOIN pg_proc p ON t.tgfoid = p.oid
-        WHERE tgrelid = 'alumno'::regclass
+        WHERE tgrelid = %s::regclass
         AND tgisinternal = false
         ORDER BY tgname
-    """)
-    
-    triggers = cur.fetchall()
-    
-    if triggers:
-        print(f"\n✓ {len(triggers)} triggers encontrados:\n")
-        for tgname, func, enabled in triggers:
-            status = "ENABLED" if enabled == 'O' else "DISABLED"
-            print(f"  • {tgname}")
-            print(f"    Función: {func}")
-            print(f"    Estado: {status}\n")
+    """, (tabla,))
+    triggers = []
+    for tgname, func, tgtype, tabla_vieja, tabla_nueva, enabled in cur.fetchall():
+        eventos = [nombre for bit, nombre in EVENTOS if tgtype & bit]
+        transicion = [f"{tipo} TABLE {nombre}" for tipo, nombre in (('OLD', tabla_vieja), ('NEW', tabla_nueva)) if nombre]
+        triggers.append((tgname, func, bool(tgtype & TIPO_FILA), eventos, transicion, enabled != 'D'))
+    return triggers
+
+def listar_triggers(cur):
+    """Imprime los triggers de alumno y matricula; devuelve {tabla: triggers}."""
+    por_tabla = {}
+    for tabla in ('alumno', 'matricula'):
+        print("=" * 80)
+        print(f"TRIGGERS EN TABLA {tabla.upper()}")
+        print("=" * 80)
+
+        triggers = obtener_triggers(cur, tabla)
+        por_tabla[tabla] = triggers
+
+        if triggers:
+            print(f"\n✓ {len(triggers)} triggers encontrados:\n")
+            for tgname, func, por_fila, eventos, transicion, habilitado in triggers:
+                status = "ENABLED" if habilitado else "DISABLED"
+                nivel = "FOR EACH ROW" if por_fila else "FOR EACH STATEMENT"
+                print(f"  • {tgname}")
+                print(f"    Función: {func}")
+                print(f"    Eventos: {' OR '.join(eventos)} ({nivel})")
+                if transicion:
+                    print(f"    Transición: {', '.join(transicion)}")
+                print(f"    Estado: {status}\n")
+        else:
+            print(f"\n⚠️  No se encontraron triggers en la tabla {tabla}\n")
+    return por_tabla
+
+def triggers_por_fila_ajenos(por_tabla):
+    """Triggers por fila habilitados en matricula que no son parte del juego por sentencia."""
+    propios = {nombre for _, nombre in TRIGGERS_LOTE}
+    return [
+        tgname for tgname, _, por_fila, _, _, habilitado in por_tabla['matricula']
+        if por_fila and habilitado and tgname not in propios
+    ]
+
+def verificar_instalacion(por_tabla):
+    """Comprueba que el juego de triggers por sentencia esté instalado y habilitado."""
+    print("=" * 80)
+    print("TRIGGERS POR SENTENCIA PARA CARGAS MASIVAS")
+    print("=" * 80)
+    print()
+
+    correcto = True
+    for tabla, nombre in TRIGGERS_LOTE:
+        trigger = next((t for t in por_tabla[tabla] if t[0] == nombre), None)
+        if trigger is None:
+            print(f"  ✗ {tabla}.{nombre}: no instalado")
+            correcto = False
+        elif trigger[2]:
+            print(f"  ✗ {tabla}.{nombre}: es por fila (versión anterior)")
+            correcto = False
+        elif not trigger[5]:
+            print(f"  ⚠️  {tabla}.{nombre}: desactivado")
+            correcto = False
+        else:
+            print(f"  ✓ {tabla}.{nombre}")
+
+    for tgname in triggers_por_fila_ajenos(por_tabla):
+        print(f"  ⚠️  matricula.{tgname}: trigger por fila habilitado (costo por matrícula)")
+
+    print()
+    if correcto:
+        print("✓ Triggers por sentencia instalados")
     else:
-        print("\n⚠️  No se encontraron triggers en la tabla alumno\n")
-    
-    cur.close()
-    conn.close()
-    
-except Exception as e:
-    print(f"\n❌ Error: {e}\n")
+        print("Instalar con: python verificar_triggers.py --instalar")
+    return correcto
+
+def instalar(conn, desactivar_por_fila=False):
+    """Instala el juego de triggers por sentencia en una sola transacción."""
+    try:
+        with conn.cursor() as cur:
+            por_fila = triggers_por_fila_ajenos({'matricula': obtener_triggers(cur, 'matricula')})
+            if por_fila and not desactivar_por_fila:
+                print("✗ matricula tiene triggers por fila que duplicarían los créditos:")
+                for tgname in por_fila:
+                    print(f"    • {tgname}")
+                print("  Volver a ejecutar con --desactivar-por-fila para desactivarlos")
+                conn.rollback()
+                return False
+
+            for tgname in por_fila:
+                cur.execute(f'ALTER TABLE matricula DISABLE TRIGGER "{tgname}"')
+                print(f"✓ Desactivado matricula.{tgname}")
+
+            cur.execute(SQL_FUNCIONES)
+            cur.execute(SQL_TRIGGERS)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    print("✓ Triggers por sentencia instalados")
+    return True
+
+def probar(conn):
+    """
+    Inserta, aprueba y elimina matrículas de prueba en una transacción que se
+    revierte, y comprueba créditos, ciclo relativo y logs.
+    """
+    errores = []
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT a.id, a.creditos_aprobados
+            FROM alumno a
+            WHERE a.creditos_aprobados < 150
+            ORDER BY a.id
+            LIMIT 2
+        """)
+        alumnos = cur.fetchall()
+        cur.execute("""
+            SELECT co.id, c.creditos
+            FROM curso_ofertado co
+            JOIN curso c ON co.curso_id = c.id
+            ORDER BY co.id
+            LIMIT 3
+        """)
+        ofertas = cur.fetchall()
+        if len(alumnos) < 2 or len(ofertas) < 3:
+            print("⚠️  No hay datos suficientes para la prueba")
+            return False
+
+        (a1, creditos_a1), (a2, creditos_a2) = alumnos
+        (o1, c1), (o2, c2), (o3, c3) = ofertas
+
+        def estado_alumno(alumno_id):
+            cur.execute("""
+                SELECT a.creditos_aprobados, a.ciclo_relativo,
+                       (SELECT COUNT(*) FROM log_creditos WHERE alumno_id = a.id),
+                       (SELECT COUNT(*) FROM log_ciclo_relativo WHERE alumno_id = a.id)
+                FROM alumno a WHERE a.id = %s
+            """, (alumno_id,))
+            return cur.fetchone()
+
+        try:
+            antes_a1, antes_a2 = estado_alumno(a1), estado_alumno(a2)
+
+            # Una sola sentencia: dos aprobadas para a1, una aprobada y una matriculada para a2
+            cur.execute("""
+                INSERT INTO matricula (alumno_id, curso_ofertado_id, fecha_matricula, nota_final, estado)
+                VALUES (%s, %s, CURRENT_DATE, 14, 'Aprobado'),
+                       (%s, %s, CURRENT_DATE, 12, 'Aprobado'),
+                       (%s, %s, CURRENT_DATE, 11, 'Aprobado'),
+                       (%s, %s, CURRENT_DATE, NULL, 'Matriculado')
+                RETURNING id
+            """, (a1, o1, a1, o2, a2, o1, a2, o3))
+            ids = [fila[0] for fila in cur.fetchall()]
+
+            despues_a1, despues_a2 = estado_alumno(a1), estado_alumno(a2)
+            if despues_a1[0] != creditos_a1 + c1 + c2:
+                errores.append(f"INSERT: créditos de {a1} = {despues_a1[0]}, esperado {creditos_a1 + c1 + c2}")
+            if despues_a2[0] != creditos_a2 + c1:
+                errores.append(f"INSERT: créditos de {a2} = {despues_a2[0]}, esperado {creditos_a2 + c1}")
+            if despues_a1[2] - antes_a1[2] != 1 or despues_a2[2] - antes_a2[2] != 1:
+                errores.append("INSERT: se esperaba una fila de log_creditos por alumno")
+            if despues_a1[1] != determinar_ciclo_relativo(despues_a1[0]):
+                errores.append(f"INSERT: ciclo_relativo de {a1} = {despues_a1[1]}, "
+                               f"esperado {determinar_ciclo_relativo(despues_a1[0])}")
+            esperados_log_ciclo = int(despues_a1[1] != antes_a1[1])
+            if despues_a1[3] - antes_a1[3] != esperados_log_ciclo:
+                errores.append("INSERT: log_ciclo_relativo no coincide con el cambio de ciclo")
+
+            # Publicar nota de la matrícula pendiente
+            cur.execute("UPDATE matricula SET nota_final = 13, estado = 'Aprobado' WHERE id = %s", (ids[3],))
+            if estado_alumno(a2)[0] != creditos_a2 + c1 + c3:
+                errores.append(f"UPDATE: créditos de {a2} no suman la nota publicada")
+
+            # Eliminar todo lo insertado devuelve los créditos originales
+            cur.execute("DELETE FROM matricula WHERE id = ANY(%s)", (ids,))
+            if estado_alumno(a1)[0] != creditos_a1 or estado_alumno(a2)[0] != creditos_a2:
+                errores.append("DELETE: los créditos no volvieron a su valor inicial")
+        finally:
+            conn.rollback()
+
+    if errores:
+        for error in errores:
+            print(f"  ✗ {error}")
+        return False
+    print("✓ Prueba de triggers por sentencia correcta (cambios revertidos)")
+    return True
+
+def main():
+    """Función principal."""
+    parser = argparse.ArgumentParser(description="Verifica e instala los triggers de alumno y matricula")
+    parser.add_argument('--instalar', action='store_true',
+                        help="Instalar los triggers por sentencia para cargas masivas")
+    parser.add_argument('--desactivar-por-fila', action='store_true',
+                        help="Con --instalar, desactivar los triggers por fila de matricula")
+    parser.add_argument('--probar', action='store_true',
+                        help="Probar los triggers con matrículas de prueba (se revierte)")
+    args = parser.parse_args()
+
+    try:
+        conn = conectar()
+
+        if args.instalar and not instalar(conn, args.desactivar_por_fila):
+            conn.close()
+            sys.exit(1)
+
+        with conn.cursor() as cur:
+            por_tabla = listar_triggers(cur)
+        conn.rollback()
+        correcto = verificar_instalacion(por_tabla)
+
+        if args.probar:
+            print()
+            correcto = probar(conn) and correcto
+
+        conn.close()
+        if not correcto:
+            sys.exit(1)
+
+    except psycopg2.Error as e:
+        print(f"\n❌ Error: {e}\n")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()